@@ -0,0 +1,68 @@
+import math
+
+MASK64 = (1 << 64) - 1
+
+def mix64(value):
+    """Espalha os bits de um hash de 64 bits (finalizador do splitmix64)"""
+    value = (value ^ (value >> 30)) * 0xBF58476D1CE4E5B9 & MASK64
+    value = (value ^ (value >> 27)) * 0x94D049BB133111EB & MASK64
+    return value ^ (value >> 31)
+
+class BloomFilter:
+    """Filtro de Bloom sobre hashes de 64 bits.
+
+    Responde "certamente não está" ou "talvez esteja": um resultado
+    negativo dispensa a consulta aos índices exatos. As posições dos bits
+    vêm de hashing duplo (h1 + i*h2) a partir de um único hash, então cada
+    sonda custa apenas aritmética de inteiros. `bits` pode ser um bytearray
+    ou uma visão somente leitura do arquivo compilado.
+    """
+    def __init__(self, bits, num_bits, num_hashes):
+        self.bits = bits
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+
+    @staticmethod
+    def parameters(count, fp_rate=0.01, max_bytes=None):
+        """(bits, funções de hash) para `count` chaves com a taxa de falsos positivos pedida"""
+        count = max(1, count)
+        num_bits = math.ceil(-count * math.log(fp_rate) / (math.log(2) ** 2))
+        if max_bytes:
+            # O limite de memória vence: a taxa real de falsos positivos sobe
+            num_bits = min(num_bits, max_bytes * 8)
+        num_bits = max(64, num_bits)
+        num_hashes = max(1, round(num_bits / count * math.log(2)))
+        return num_bits, num_hashes
+
+    @classmethod
+    def build(cls, hashes, fp_rate=0.01, max_bytes=None):
+        hashes = list(hashes)
+        num_bits, num_hashes = cls.parameters(len(hashes), fp_rate, max_bytes)
+        bloom = cls(bytearray((num_bits + 7) // 8), num_bits, num_hashes)
+        for value in hashes:
+            bloom.add(value)
+        return bloom
+
+    def add(self, value):
+        value = mix64(value)
+        h1 = value & 0xFFFFFFFF
+        h2 = (value >> 32) | 1
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % self.num_bits
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, value):
+        value = mix64(value)
+        h1 = value & 0xFFFFFFFF
+        h2 = (value >> 32) | 1
+        bits = self.bits
+        num_bits = self.num_bits
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % num_bits
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def false_positive_rate(self, count):
+        """Taxa de falsos positivos esperada com `count` chaves inseridas"""
+        return (1 - math.exp(-self.num_hashes * count / self.num_bits)) ** self.num_hashes
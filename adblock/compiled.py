@@ -0,0 +1,352 @@
+"""Formato binário pré-compilado das listas de filtros, aberto com mmap.
+
+Layout (little-endian):
+
+    cabeçalho   magic (8 bytes), versão (u32), nº de seções (u32),
+                impressão digital das listas de origem (32 bytes)
+    tabela      para cada seção: deslocamento (u64) e tamanho em bytes (u64)
+    seções      alinhadas em 8 bytes, na ordem de SECTIONS
+
+Cada índice (hosts, regras por host, regras por token, sites liberados) é
+um par de arrays paralelos: hashes de 64 bits ordenados e o número da
+regra correspondente. A consulta faz busca binária direto no arquivo
+mapeado e só interpreta o texto da regra quando o hash bate, então abrir
+o arquivo custa o mesmo para uma lista de 10 ou de 100 mil regras.
+Um filtro de Bloom sobre todas as chaves dos índices fica na frente das
+buscas binárias: a maioria das requisições não casa com nada e é liberada
+só com algumas sondas de bits.
+"""
+import os
+import sys
+import mmap
+import zlib
+import struct
+import bisect
+import hashlib
+from array import array
+from adblock.filters import parse_filter
+from adblock.engine import FilterEngine, RuleSet
+from adblock.bloom import BloomFilter
+
+MAGIC = b"NVGFLT\x00\x00"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<8sII32s")
+SECTION = struct.Struct("<QQ")
+SIDES = ("block", "allow", "important")
+INDEXES = ("hosts", "host_rules", "tokens")
+SECTIONS = (
+    ["rule_offsets", "rule_text"] +
+    [f"{side}.{index}.{part}" for side in SIDES for index in INDEXES
+     for part in ("hashes", "rules")] +
+    [f"{side}.generic" for side in SIDES] +
+    ["allowed_sites.hashes", "allowed_sites.rules", "bloom.params", "bloom.bits"]
+)
+# Taxa de falsos positivos padrão do filtro de Bloom
+BLOOM_FP_RATE = 0.01
+# Quantidade máxima de hashes de tokens/hosts guardados em cache
+HASH_CACHE_SIZE = 100_000
+
+def fingerprint(paths, fp_rate=BLOOM_FP_RATE, bloom_max_bytes=None):
+    """Identifica as listas de origem (caminho, tamanho, data) e os parâmetros do Bloom"""
+    digest = hashlib.sha256(f"{FORMAT_VERSION}|{fp_rate}|{bloom_max_bytes}\n".encode())
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            digest.update(f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+        except OSError:
+            digest.update(f"{os.path.abspath(path)}|-\n".encode())
+    return digest.digest()
+
+def hash64(text):
+    data = text.encode("utf-8")
+    return (zlib.crc32(data) << 32) | zlib.adler32(data)
+
+_hash_cache = {}
+
+def cached_hash64(text):
+    """hash64 com cache: os mesmos hosts e tokens se repetem o tempo todo"""
+    value = _hash_cache.get(text)
+    if value is None:
+        if len(_hash_cache) >= HASH_CACHE_SIZE:
+            _hash_cache.clear()
+        value = _hash_cache[text] = hash64(text)
+    return value
+
+def _le(values):
+    """Bytes little-endian de um array, qualquer que seja a máquina"""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class _Writer:
+    def __init__(self):
+        self.texts = []
+        self.sections = {name: b"" for name in SECTIONS}
+        # Hashes de todas as chaves de hosts e tokens, para o filtro de Bloom
+        self.keys = set()
+
+    def rule(self, text):
+        self.texts.append(text)
+        return len(self.texts) - 1
+
+    def index(self, name, entries):
+        """Grava um índice a partir de pares (chave, texto da regra)"""
+        pairs = sorted((hash64(key), self.rule(text)) for key, text in entries)
+        if not name.startswith("allowed_sites"):
+            self.keys.update(h for h, _ in pairs)
+        self.sections[name + ".hashes"] = _le(array('Q', (h for h, _ in pairs)))
+        self.sections[name + ".rules"] = _le(array('I', (r for _, r in pairs)))
+
+    def ruleset(self, side, rules):
+        self.index(f"{side}.hosts", ((host, f"||{host}^") for host in rules.hosts))
+        self.index(f"{side}.host_rules", (
+            (host, rule.text) for host, items in rules.host_rules.items() for rule in items))
+        self.index(f"{side}.tokens", (
+            (token, rule.text) for token, items in rules.token_rules.items() for rule in items))
+        self.sections[f"{side}.generic"] = _le(array('I', (self.rule(r.text) for r in rules.generic)))
+
+    def finish(self, engine, fp_rate, bloom_max_bytes):
+        for side in SIDES:
+            self.ruleset(side, getattr(engine, side))
+        self.index("allowed_sites", ((host, host) for host in engine.allowed_sites))
+        offsets = array('I', [0])
+        blob = bytearray()
+        for text in self.texts:
+            blob += text.encode("utf-8")
+            offsets.append(len(blob))
+        self.sections["rule_offsets"] = _le(offsets)
+        self.sections["rule_text"] = bytes(blob)
+        bloom = BloomFilter.build(self.keys, fp_rate, bloom_max_bytes)
+        self.sections["bloom.params"] = _le(array('Q', [bloom.num_bits, bloom.num_hashes]))
+        self.sections["bloom.bits"] = bytes(bloom.bits)
+
+
+def compile_lists(paths, output, fp_rate=BLOOM_FP_RATE, bloom_max_bytes=None):
+    """Compila as listas de filtros `paths` no arquivo binário `output`.
+
+    `fp_rate` é a taxa de falsos positivos desejada para o filtro de Bloom
+    e `bloom_max_bytes` um teto opcional para o tamanho dele.
+    """
+    # Calculada antes da leitura: uma lista alterada durante a compilação força outra
+    source = fingerprint(paths, fp_rate, bloom_max_bytes)
+    engine = FilterEngine.from_files(paths)
+    writer = _Writer()
+    writer.finish(engine, fp_rate, bloom_max_bytes)
+    table_size = HEADER.size + SECTION.size * len(SECTIONS)
+    offset = (table_size + 7) & ~7
+    table = []
+    for name in SECTIONS:
+        data = writer.sections[name]
+        table.append((offset, len(data)))
+        offset = (offset + len(data) + 7) & ~7
+    tmp_file = output + ".tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(SECTIONS), source))
+        for entry in table:
+            f.write(SECTION.pack(*entry))
+        for name, (start, _) in zip(SECTIONS, table):
+            f.write(b"\x00" * (start - f.tell()))
+            f.write(writer.sections[name])
+    os.replace(tmp_file, output)
+    return engine.rule_count
+
+
+class _Rules:
+    """Texto das regras no arquivo mapeado, interpretado sob demanda"""
+    def __init__(self, offsets, text):
+        self.offsets = offsets
+        self.text = text
+        self.cache = {}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def text_of(self, index):
+        return bytes(self.text[self.offsets[index]:self.offsets[index + 1]]).decode("utf-8")
+
+    def get(self, index):
+        rule = self.cache.get(index)
+        if rule is None:
+            rule = self.cache[index] = parse_filter(self.text_of(index))
+        return rule
+
+
+class _HashIndex:
+    """Par de arrays (hashes ordenados, regras) lido direto do mmap"""
+    def __init__(self, hashes, rules):
+        self.hashes = hashes
+        self.rules = rules
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def lookup(self, key_hash):
+        """Números das regras cuja chave tem esse hash (quase sempre nenhuma)"""
+        hashes = self.hashes
+        i = bisect.bisect_left(hashes, key_hash)
+        if i == len(hashes) or hashes[i] != key_hash:
+            return ()
+        found = []
+        while i < len(hashes) and hashes[i] == key_hash:
+            found.append(self.rules[i])
+            i += 1
+        return found
+
+
+class _HostSet:
+    """Conjunto de hosts (||host^ ou sites liberados) com verificação do texto"""
+    def __init__(self, index, rules, template):
+        self.index = index
+        self.rules = rules
+        self.template = template
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, host):
+        for index in self.index.lookup(cached_hash64(host)):
+            # Hashes podem colidir: confere o texto guardado
+            if self.rules.text_of(index) == self.template.format(host):
+                return True
+        return False
+
+
+class CompiledRuleSet(RuleSet):
+    """RuleSet cujos índices ficam no arquivo compilado"""
+    def __init__(self, rules, hosts, host_rules, tokens, generic):
+        self.rules = rules
+        self.hosts = _HostSet(hosts, rules, "||{}^")
+        self.host_index = host_rules
+        self.token_index = tokens
+        self.generic_rules = generic
+        self._generic = None
+
+    def __len__(self):
+        return (len(self.hosts) + len(self.host_index) + len(self.token_index) +
+                len(self.generic_rules))
+
+    def add(self, rule):
+        raise TypeError("Listas compiladas são somente leitura")
+
+    @property
+    def generic(self):
+        if self._generic is None:
+            self._generic = [r for r in map(self.rules.get, self.generic_rules) if r is not None]
+        return self._generic
+
+    def match(self, url, url_lower, suffixes, tokens, resource_type, third_party, source_host):
+        """Texto da primeira regra que casa com a requisição, ou None"""
+        rules = self.rules
+        hash_of = cached_hash64
+        for suffix in suffixes:
+            if suffix in self.hosts:
+                return "||" + suffix + "^"
+            for index in self.host_index.lookup(hash_of(suffix)):
+                rule = rules.get(index)
+                # Hashes podem colidir: confere o host da regra
+                if (rule is not None and rule.host == suffix and
+                        rule.matches(url, url_lower, resource_type, third_party, source_host)):
+                    return rule.text
+        for token in tokens:
+            for index in self.token_index.lookup(hash_of(token)):
+                rule = rules.get(index)
+                if rule is not None and rule.matches(url, url_lower, resource_type,
+                                                     third_party, source_host):
+                    return rule.text
+        for rule in self.generic:
+            if rule.matches(url, url_lower, resource_type, third_party, source_host):
+                return rule.text
+        return None
+
+
+class CompiledFilterEngine(FilterEngine):
+    """FilterEngine que consulta um arquivo compilado mapeado em memória"""
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, self.fingerprint = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION or count != len(SECTIONS):
+            self._mmap.close()
+            raise ValueError(f"Arquivo de filtros incompatível: {path}")
+        view = memoryview(self._mmap)
+        # Visões sobre o mmap, liberadas (na ordem inversa) em close()
+        self._views = [view]
+        sections = {}
+        for i, name in enumerate(SECTIONS):
+            start, size = SECTION.unpack_from(self._mmap, HEADER.size + i * SECTION.size)
+            data = view[start:start + size]
+            self._views.append(data)
+            if name in ("rule_text", "bloom.bits"):
+                sections[name] = data
+            else:
+                typecode = 'Q' if name.endswith(("hashes", "params")) else 'I'
+                if sys.byteorder == "big":
+                    values = array(typecode, data.tobytes())
+                    values.byteswap()
+                    sections[name] = values
+                else:
+                    sections[name] = data.cast(typecode)
+                    self._views.append(sections[name])
+        rules = _Rules(sections["rule_offsets"], sections["rule_text"])
+        self.rule_count = len(rules)
+        for side in SIDES:
+            indexes = [_HashIndex(sections[f"{side}.{index}.hashes"],
+                                  sections[f"{side}.{index}.rules"]) for index in INDEXES]
+            setattr(self, side, CompiledRuleSet(rules, *indexes,
+                                                sections[f"{side}.generic"]))
+        self.allowed_sites = _HostSet(_HashIndex(sections["allowed_sites.hashes"],
+                                                 sections["allowed_sites.rules"]),
+                                      rules, "{}")
+        num_bits, num_hashes = sections["bloom.params"]
+        self.bloom = BloomFilter(sections["bloom.bits"], num_bits, num_hashes)
+        self._verdicts = {}
+
+    def close(self):
+        """Desfaz o mapeamento (necessário antes de substituir o arquivo no Windows)"""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def add_rule(self, line):
+        raise TypeError("Listas compiladas são somente leitura")
+
+    def maybe_indexed(self, key):
+        """Veredito do filtro de Bloom para um host ou token, guardado em cache"""
+        verdict = self._verdicts.get(key)
+        if verdict is None:
+            if len(self._verdicts) >= HASH_CACHE_SIZE:
+                self._verdicts.clear()
+            verdict = self._verdicts[key] = cached_hash64(key) in self.bloom
+        return verdict
+
+    def prefilter(self, suffixes, tokens):
+        """Mantém só os sufixos e tokens que o filtro de Bloom não descarta"""
+        maybe_indexed = self.maybe_indexed
+        return ([s for s in suffixes if maybe_indexed(s)],
+                [t for t in set(tokens) if maybe_indexed(t)])
+
+
+def load_filter_engine(paths, compiled_file, compile_if_stale=True,
+                       fp_rate=BLOOM_FP_RATE, bloom_max_bytes=None):
+    """Abre `compiled_file` se ele corresponde às listas `paths`.
+
+    Se estiver desatualizado ou ausente, recompila (ou retorna None quando
+    `compile_if_stale` é falso, para o chamador compilar em segundo plano).
+    """
+    expected = fingerprint(paths, fp_rate, bloom_max_bytes)
+    if os.path.exists(compiled_file):
+        try:
+            engine = CompiledFilterEngine(compiled_file)
+            if engine.fingerprint == expected:
+                return engine
+            engine.close()
+        except Exception as e:
+            print(f"Erro ao abrir filtros compilados: {e}")
+    if not compile_if_stale:
+        return None
+    compile_lists(paths, compiled_file, fp_rate, bloom_max_bytes)
+    return CompiledFilterEngine(compiled_file)
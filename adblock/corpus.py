@@ -0,0 +1,117 @@
+import os
+import gzip
+import json
+import datetime
+import threading
+
+# Registros acumulados antes de cada escrita no arquivo comprimido
+FLUSH_EVERY = 256
+# Limite de registros por arquivo (protege o disco em sessões longas)
+MAX_RECORDS = 1_000_000
+
+class RequestRecorder:
+    """Grava as requisições vistas pelo interceptador em JSONL comprimido (gzip).
+
+    Cada linha tem "url", "first_party" e "type" (tipo ABP), o suficiente
+    para reproduzir as decisões do filtro fora do navegador com
+    benchmarks.adblock_benchmark. `record` roda na thread de IO do
+    interceptador e só acumula a requisição numa lista; uma thread própria
+    serializa, comprime e grava os lotes de FLUSH_EVERY registros, de modo
+    que o interceptador nunca espera pelo disco. `close` grava o que
+    restou e espera a thread terminar; nada é registrado depois.
+    """
+    def __init__(self, path, max_records=MAX_RECORDS):
+        self.path = path
+        self.max_records = max_records
+        self.count = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flush_requested = False
+        self._closing = False
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+        self._writer = threading.Thread(target=self._run, daemon=True)
+        self._writer.start()
+
+    @classmethod
+    def in_directory(cls, directory, max_records=MAX_RECORDS):
+        """Novo arquivo com data e hora no nome dentro de `directory`"""
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        return cls(os.path.join(directory, f"requests_{stamp}.jsonl.gz"), max_records)
+
+    def record(self, url, first_party, resource_type):
+        with self._lock:
+            if self._closing or self.count >= self.max_records:
+                return
+            self.count += 1
+            self._buffer.append((url, first_party, resource_type))
+            if len(self._buffer) == FLUSH_EVERY:
+                self._wakeup.notify()
+
+    def flush(self):
+        """Pede a gravação do que está acumulado (sem esperar)"""
+        with self._lock:
+            self._flush_requested = True
+            self._wakeup.notify()
+
+    def _run(self):
+        """Thread de gravação: espera um lote completo, um flush ou o fechamento"""
+        while True:
+            with self._lock:
+                while (len(self._buffer) < FLUSH_EVERY and not self._flush_requested
+                       and not self._closing):
+                    self._wakeup.wait()
+                buffer, self._buffer = self._buffer, []
+                self._flush_requested = False
+                closing = self._closing
+            self._write(buffer)
+            if closing:
+                try:
+                    self._file.close()
+                except Exception as e:
+                    print(f"Erro ao gravar requisições: {e}")
+                return
+
+    def _write(self, buffer):
+        if not buffer:
+            return
+        try:
+            self._file.write("".join(
+                json.dumps({"url": url, "first_party": first_party, "type": resource_type},
+                           ensure_ascii=False) + "\n"
+                for url, first_party, resource_type in buffer
+            ))
+            # Sync flush do gzip: o que já foi gravado sobrevive a um fechamento abrupto
+            self._file.flush()
+        except Exception as e:
+            print(f"Erro ao gravar requisições: {e}")
+
+    def close(self):
+        """Grava o restante, fecha o arquivo e espera a thread de gravação"""
+        with self._lock:
+            self._closing = True
+            self._wakeup.notify()
+        self._writer.join()
+
+
+def read_corpus(path):
+    """Lê um corpus gravado (comprimido ou não): gera (url, first_party, tipo)"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        try:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Última linha cortada se o navegador foi encerrado no meio da escrita
+                    continue
+                yield record["url"], record.get("first_party", ""), record.get("type", "other")
+        except EOFError:
+            # Arquivo gzip não finalizado: aproveita o que foi gravado
+            return
@@ -0,0 +1,165 @@
+from collections import OrderedDict
+from adblock.filters import host_suffixes, HOST_RE
+
+# Extensões procedurais do uBlock/AdGuard: não são CSS válido e ficam de fora
+PROCEDURAL_MARKERS = (":has-text(", ":-abp-", ":matches-css", ":xpath(", ":upward(",
+                      ":remove(", ":style(", ":min-text-length(", ":watch-attr(",
+                      ":matches-path(", ":others(", ":if(", ":if-not(", ":nth-ancestor(")
+# Seletores por regra CSS: um seletor inválido descarta só o próprio bloco
+SELECTORS_PER_RULE = 64
+# Hosts com CSS já montado mantidos em cache
+CSS_CACHE_SIZE = 512
+HIDE_DECLARATION = "{display:none!important}"
+
+def parse_cosmetic(line):
+    """Interpreta "dominios##seletor" ou "dominios#@#seletor".
+
+    Retorna (exceção, domínios incluídos, domínios excluídos, seletor) ou
+    None se a linha não for uma regra de ocultação suportada.
+    """
+    line = line.strip()
+    if not line or line.startswith("!"):
+        return None
+    exception = False
+    pos = line.find("#@#")
+    if pos >= 0:
+        exception = True
+        selector = line[pos + 3:].strip()
+    else:
+        pos = line.find("##")
+        if pos < 0:
+            return None
+        selector = line[pos + 2:].strip()
+    if not selector or any(marker in selector for marker in PROCEDURAL_MARKERS):
+        return None
+    if "{" in selector or "}" in selector:
+        # Impediria o isolamento da declaração display:none
+        return None
+    include, exclude = [], []
+    for domain in line[:pos].lower().split(","):
+        domain = domain.strip()
+        negated = domain.startswith("~")
+        if negated:
+            domain = domain[1:]
+        if not domain:
+            continue
+        if not HOST_RE.match(domain):
+            # Curingas de TLD (exemplo.*) e afins: fora do escopo
+            return None
+        (exclude if negated else include).append(domain)
+    return exception, include, exclude, selector
+
+def build_css(selectors):
+    """Folha de estilo que oculta os seletores, em blocos de SELECTORS_PER_RULE"""
+    selectors = list(selectors)
+    return "\n".join(
+        ",".join(selectors[i:i + SELECTORS_PER_RULE]) + HIDE_DECLARATION
+        for i in range(0, len(selectors), SELECTORS_PER_RULE)
+    )
+
+
+class CosmeticFilter:
+    """Regras cosméticas (##seletor) das listas Adblock Plus/EasyList.
+
+    - `generic`: seletores válidos em todos os sites; viram uma única folha
+      de estilo compartilhada.
+    - `specific`: domínio -> [(seletor, domínios excluídos)].
+    - `exceptions`: domínio -> seletores liberados (#@#) naquele domínio.
+
+    Os sites com exceções a seletores genéricos ficam fora da folha
+    genérica (`generic_excluded_hosts`) e recebem a sua própria, já sem os
+    seletores liberados. O CSS de cada host é montado uma vez e guardado
+    em cache.
+    """
+    def __init__(self):
+        self.generic = {}
+        self.specific = {}
+        self.exceptions = {}
+        self.rule_count = 0
+        self._css_cache = OrderedDict()
+
+    def add_rule(self, line):
+        rule = parse_cosmetic(line)
+        if rule is None:
+            return False
+        exception, include, exclude, selector = rule
+        if exception:
+            if include:
+                for domain in include:
+                    self.exceptions.setdefault(domain, set()).add(selector)
+            else:
+                # #@#seletor sem domínio desativa o seletor em todo lugar
+                self.generic.pop(selector, None)
+        elif include:
+            excluded = frozenset(exclude) if exclude else None
+            for domain in include:
+                self.specific.setdefault(domain, []).append((selector, excluded))
+        else:
+            self.generic[selector] = None
+            # ~dominio##seletor: genérico, exceto nesses domínios
+            for domain in exclude:
+                self.exceptions.setdefault(domain, set()).add(selector)
+        self.rule_count += 1
+        self._css_cache.clear()
+        return True
+
+    def add_rules(self, lines):
+        """Adiciona as regras cosméticas de um iterável de linhas; retorna quantas entraram"""
+        return sum(1 for line in lines if "#" in line and self.add_rule(line))
+
+    def load_file(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                return self.add_rules(f)
+        except Exception as e:
+            print(f"Erro ao carregar regras cosméticas {path}: {e}")
+            return 0
+
+    @classmethod
+    def from_files(cls, paths):
+        cosmetic = cls()
+        for path in paths:
+            cosmetic.load_file(path)
+        return cosmetic
+
+    def generic_css(self):
+        return build_css(self.generic)
+
+    def generic_excluded_hosts(self):
+        """Domínios que liberam algum seletor genérico (recebem folha própria)"""
+        generic = self.generic
+        return sorted(domain for domain, selectors in self.exceptions.items()
+                      if any(selector in generic for selector in selectors))
+
+    def _exceptions_for(self, suffixes):
+        allowed = set()
+        for suffix in suffixes:
+            selectors = self.exceptions.get(suffix)
+            if selectors:
+                allowed |= selectors
+        return allowed
+
+    def css_for_host(self, host):
+        """CSS específico de um host ("" se a folha genérica já basta)"""
+        css = self._css_cache.get(host)
+        if css is not None:
+            self._css_cache.move_to_end(host)
+            return css
+        suffixes = host_suffixes(host)
+        allowed = self._exceptions_for(suffixes)
+        selectors = {}
+        if allowed and any(selector in self.generic for selector in allowed):
+            # Este host não recebe a folha genérica: repõe o que não foi liberado
+            selectors.update((s, None) for s in self.generic if s not in allowed)
+        for suffix in suffixes:
+            for selector, excluded in self.specific.get(suffix, ()):
+                if selector in allowed:
+                    continue
+                if excluded and any(s in excluded for s in suffixes):
+                    continue
+                selectors[selector] = None
+        css = build_css(selectors)
+        self._css_cache[host] = css
+        if len(self._css_cache) > CSS_CACHE_SIZE:
+            self._css_cache.popitem(last=False)
+        return css
@@ -0,0 +1,198 @@
+import os
+from adblock.filters import TOKEN_RE, COMMON_TOKENS, parse_filter, host_suffixes
+
+# Segundos níveis genéricos: em "exemplo.com.br" o site é "exemplo.com.br"
+GENERIC_SLDS = {"com", "net", "org", "gov", "edu", "co", "ac", "mil", "nom", "blog"}
+
+def url_host(url):
+    """Host em minúsculas de uma URL, sem credenciais nem porta"""
+    start = url.find("://")
+    if start < 0:
+        return ""
+    start += 3
+    end = len(url)
+    for sep in "/?#":
+        pos = url.find(sep, start)
+        if 0 <= pos < end:
+            end = pos
+    host = url[start:end]
+    at = host.rfind("@")
+    if at >= 0:
+        host = host[at + 1:]
+    if host.startswith("["):
+        return host[1:host.find("]")].lower()
+    colon = host.find(":")
+    if colon >= 0:
+        host = host[:colon]
+    return host.lower().rstrip(".")
+
+def site_of(host):
+    """Domínio registrável aproximado (sem lista pública de sufixos)"""
+    parts = host.split(".")
+    if len(parts) > 2 and len(parts[-1]) == 2 and parts[-2] in GENERIC_SLDS:
+        return ".".join(parts[-3:])
+    return ".".join(parts[-2:])
+
+
+class RuleSet:
+    """Regras de um mesmo lado (bloqueio ou exceção) organizadas para consulta.
+
+    - `hosts`: conjunto de hosts das regras ||host^ sem opções; a consulta
+      percorre só os sufixos do host da requisição.
+    - `host_rules`: regras ancoradas em um host que têm opções ou caminho.
+    - `token_rules`: demais regras, indexadas por um token do padrão que
+      obrigatoriamente aparece na URL; só são testadas as regras dos
+      tokens presentes na requisição.
+    - `generic`: regras sem nenhum token utilizável (testadas sempre).
+    """
+    def __init__(self):
+        self.hosts = set()
+        self.host_rules = {}
+        self.token_rules = {}
+        self.generic = []
+
+    def __len__(self):
+        return (len(self.hosts) + sum(map(len, self.host_rules.values())) +
+                sum(map(len, self.token_rules.values())) + len(self.generic))
+
+    def add(self, rule):
+        if rule.host_only:
+            self.hosts.add(rule.host)
+        elif rule.host is not None:
+            self.host_rules.setdefault(rule.host, []).append(rule)
+        else:
+            tokens = rule.tokens()
+            if not tokens:
+                self.generic.append(rule)
+                return
+            # O token menos usado (e não genérico demais) espalha melhor as regras
+            token = min(tokens, key=lambda t: (t in COMMON_TOKENS,
+                                               len(self.token_rules.get(t, ())), -len(t)))
+            self.token_rules.setdefault(token, []).append(rule)
+
+    def match(self, url, url_lower, suffixes, tokens, resource_type, third_party, source_host):
+        """Texto da primeira regra que casa com a requisição, ou None"""
+        hosts = self.hosts
+        host_rules = self.host_rules
+        for suffix in suffixes:
+            if suffix in hosts:
+                return "||" + suffix + "^"
+            rules = host_rules.get(suffix)
+            if rules:
+                for rule in rules:
+                    if rule.matches(url, url_lower, resource_type, third_party, source_host):
+                        return rule.text
+        token_rules = self.token_rules
+        for token in tokens:
+            rules = token_rules.get(token)
+            if rules:
+                for rule in rules:
+                    if rule.matches(url, url_lower, resource_type, third_party, source_host):
+                        return rule.text
+        for rule in self.generic:
+            if rule.matches(url, url_lower, resource_type, third_party, source_host):
+                return rule.text
+        return None
+
+
+class FilterEngine:
+    """Motor de filtros de rede no formato Adblock Plus/EasyList.
+
+    As listas são compiladas uma vez em conjuntos de hosts e índices por
+    token (RuleSet), de modo que cada requisição testa apenas as poucas
+    regras que podem casar com ela. Exceções (@@) só são consultadas quando
+    alguma regra de bloqueio casou; regras $important ignoram exceções e
+    @@||site^$document libera tudo nas páginas daquele site.
+    """
+    def __init__(self):
+        self.block = RuleSet()
+        self.allow = RuleSet()
+        self.important = RuleSet()
+        self.allowed_sites = set()
+        self.rule_count = 0
+
+    def add_rule(self, line):
+        rule = parse_filter(line)
+        if rule is None:
+            return False
+        if rule.document:
+            if rule.host is not None and not rule.pattern:
+                self.allowed_sites.add(rule.host)
+            else:
+                return False
+        elif rule.exception:
+            self.allow.add(rule)
+        elif rule.important:
+            self.important.add(rule)
+        else:
+            self.block.add(rule)
+        self.rule_count += 1
+        return True
+
+    def add_rules(self, lines):
+        """Adiciona as regras de rede de um iterável de linhas; retorna quantas entraram"""
+        return sum(1 for line in lines if self.add_rule(line))
+
+    def load_file(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                return self.add_rules(f)
+        except Exception as e:
+            print(f"Erro ao carregar lista de filtros {path}: {e}")
+            return 0
+
+    @classmethod
+    def from_files(cls, paths):
+        engine = cls()
+        for path in paths:
+            engine.load_file(path)
+        return engine
+
+    def match(self, url, source_url="", resource_type="other"):
+        """Decide uma requisição: retorna o texto da regra de bloqueio que casou ou None.
+
+        `source_url` é a página que originou a requisição (primeira parte) e
+        `resource_type` um dos tipos do ABP ("script", "image", "subdocument"...).
+        """
+        host = url_host(url)
+        url_lower = url.lower()
+        suffixes, tokens = self.prefilter(host_suffixes(host), TOKEN_RE.findall(url_lower))
+        if not suffixes and not tokens and not (self.block.generic or self.important.generic):
+            # Caso comum: nenhum host ou token da URL aparece em regra alguma
+            return None
+        source_host = url_host(source_url) if source_url else ""
+        if self.allowed_sites and source_host:
+            for suffix in host_suffixes(source_host):
+                if suffix in self.allowed_sites:
+                    return None
+        third_party = bool(source_host) and site_of(host) != site_of(source_host)
+        args = (url, url_lower, suffixes, tokens, resource_type, third_party, source_host)
+        rule = self.important.match(*args)
+        if rule is not None:
+            return rule
+        rule = self.block.match(*args)
+        if rule is None or self.allow.match(*args) is not None:
+            return None
+        return rule
+
+    def prefilter(self, suffixes, tokens):
+        """Descarta sufixos e tokens que não podem estar em nenhum índice.
+
+        Aqui os índices já são conjuntos em memória; o motor compilado
+        usa um filtro de Bloom para evitar buscas no arquivo.
+        """
+        return suffixes, tokens
+
+    def should_block(self, url, source_url="", resource_type="other"):
+        return self.match(url, source_url, resource_type) is not None
+
+
+def default_filter_lists(user_dir=None):
+    """Lista embutida mais os arquivos .txt que o usuário colocar em `user_dir`"""
+    paths = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "lists", "default.txt")]
+    if user_dir and os.path.isdir(user_dir):
+        paths.extend(
+            os.path.join(user_dir, name) for name in sorted(os.listdir(user_dir))
+            if name.endswith(".txt")
+        )
+    return paths
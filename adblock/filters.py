@@ -0,0 +1,238 @@
+import re
+
+# Tipos de recurso reconhecidos nas opções das regras (sintaxe Adblock Plus)
+RESOURCE_TYPES = {
+    "script", "image", "stylesheet", "object", "xmlhttprequest", "subdocument",
+    "ping", "media", "font", "websocket", "other", "document"
+}
+# Sinônimos aceitos pelo EasyList/uBlock
+TYPE_ALIASES = {
+    "xhr": "xmlhttprequest",
+    "css": "stylesheet",
+    "frame": "subdocument",
+    "object-subrequest": "object",
+    "background": "image"
+}
+# Opções que não mudam a decisão de bloquear (são aceitas e ignoradas)
+IGNORED_OPTIONS = {"collapse", "~collapse"}
+# Caracteres que podem formar um token de URL
+TOKEN_RE = re.compile(r"[a-z0-9%]+")
+# Caracteres válidos em um host da regra ||host^
+HOST_RE = re.compile(r"^[a-z0-9.-]+$")
+# Tokens presentes em quase toda URL: ruins para o índice
+COMMON_TOKENS = {"http", "https", "www", "com", "net", "org", "js", "html", "php"}
+
+class NetworkFilter:
+    """Regra de rede do Adblock Plus/EasyList já interpretada.
+
+    `host` é preenchido nas regras ancoradas no domínio (||host^); quando o
+    restante do padrão é vazio a regra casa apenas pelo host. As demais
+    regras usam `pattern`, convertido em expressão regular só na primeira
+    vez que precisa ser testado.
+    """
+    __slots__ = ("text", "exception", "important", "host", "pattern", "anchor_host",
+                 "anchor_start", "anchor_end", "match_case", "types", "excluded_types",
+                 "third_party", "include_domains", "exclude_domains", "document", "_regex")
+
+    def __init__(self, text):
+        self.text = text
+        self.exception = False
+        self.important = False
+        self.host = None
+        self.pattern = ""
+        self.anchor_host = False
+        self.anchor_start = False
+        self.anchor_end = False
+        self.match_case = False
+        self.types = None
+        self.excluded_types = None
+        self.third_party = None
+        self.include_domains = None
+        self.exclude_domains = None
+        self.document = False
+        self._regex = None
+
+    @property
+    def host_only(self):
+        """Regra do tipo ||host^ sem opções: entra no conjunto de hosts"""
+        return (self.host is not None and not self.pattern and self.types is None
+                and self.excluded_types is None and self.third_party is None
+                and self.include_domains is None and self.exclude_domains is None
+                and not self.important and not self.document)
+
+    def regex(self):
+        if self._regex is None:
+            parts = []
+            for char in self.pattern:
+                if char == "*":
+                    parts.append(".*")
+                elif char == "^":
+                    parts.append(r"(?:[^\w.%-]|$)")
+                else:
+                    parts.append(re.escape(char))
+            body = "".join(parts)
+            if self.anchor_host:
+                body = r"^[a-z][a-z0-9+.-]*://(?:[^/?#]*\.)?" + body
+            elif self.anchor_start:
+                body = "^" + body
+            if self.anchor_end:
+                body += "$"
+            self._regex = re.compile(body, 0 if self.match_case else re.IGNORECASE)
+        return self._regex
+
+    def tokens(self):
+        """Tokens do padrão que certamente aparecem inteiros na URL"""
+        pattern = self.pattern
+        if not self.match_case:
+            pattern = pattern.lower()
+        anchored = self.anchor_host or self.anchor_start
+        result = []
+        for match in TOKEN_RE.finditer(pattern):
+            start, end = match.span()
+            if start == 0 and not anchored:
+                continue
+            if start > 0 and pattern[start - 1] == "*":
+                continue
+            if end == len(pattern) and not self.anchor_end:
+                continue
+            if end < len(pattern) and pattern[end] == "*":
+                continue
+            result.append(match.group())
+        return result
+
+    def matches_options(self, resource_type, third_party, source_host):
+        """Verifica tipo de recurso, terceiros e domínio da página de origem"""
+        if self.types is not None and resource_type not in self.types:
+            return False
+        if self.excluded_types is not None and resource_type in self.excluded_types:
+            return False
+        if self.third_party is not None and self.third_party != third_party:
+            return False
+        if self.include_domains is not None or self.exclude_domains is not None:
+            suffixes = host_suffixes(source_host)
+            if self.exclude_domains and any(s in self.exclude_domains for s in suffixes):
+                return False
+            if self.include_domains and not any(s in self.include_domains for s in suffixes):
+                return False
+        return True
+
+    def matches(self, url, url_lower, resource_type, third_party, source_host):
+        if not self.matches_options(resource_type, third_party, source_host):
+            return False
+        if self.host is not None and not self.pattern:
+            # ||host^: o host já foi conferido pelo índice
+            return True
+        return self.regex().search(url if self.match_case else url_lower) is not None
+
+
+def host_suffixes(host):
+    """Sufixos de um host: ads.exemplo.com -> ads.exemplo.com, exemplo.com, com"""
+    suffixes = []
+    while host:
+        suffixes.append(host)
+        dot = host.find(".")
+        if dot < 0:
+            break
+        host = host[dot + 1:]
+    return suffixes
+
+def parse_filter(line):
+    """Interpreta uma linha de lista de filtros; retorna None se não for regra de rede"""
+    line = line.strip()
+    if not line or line.startswith("!") or line.startswith("["):
+        return None
+    if "##" in line or "#@#" in line or "#?#" in line or "#$#" in line:
+        # Regras cosméticas são tratadas à parte
+        return None
+    rule = NetworkFilter(line)
+    if line.startswith("@@"):
+        rule.exception = True
+        line = line[2:]
+    dollar = line.rfind("$")
+    if dollar >= 0 and "/" not in line[dollar:]:
+        if not _parse_options(rule, line[dollar + 1:]):
+            return None
+        line = line[:dollar]
+
+    if line.startswith("/") and line.endswith("/") and len(line) > 2:
+        # Expressão regular literal: sem padrão, não entra no índice de tokens
+        try:
+            rule._regex = re.compile(line[1:-1], 0 if rule.match_case else re.IGNORECASE)
+        except re.error:
+            return None
+        return rule
+
+    if line.startswith("||"):
+        rule.anchor_host = True
+        line = line[2:]
+    elif line.startswith("|"):
+        rule.anchor_start = True
+        line = line[1:]
+    if line.endswith("|"):
+        rule.anchor_end = True
+        line = line[:-1]
+    # Curingas nas pontas não restringem nada
+    line = line.strip("*") if not rule.anchor_host else line.rstrip("*")
+    if not line and not rule.document:
+        return None
+    if not rule.match_case:
+        line = line.lower()
+
+    if rule.anchor_host:
+        end = len(line)
+        for i, char in enumerate(line):
+            if char in "/^*?|:":
+                end = i
+                break
+        host = line[:end]
+        if host and HOST_RE.match(host) and "*" not in line[:end]:
+            rest = line[end:]
+            if rest in ("", "^") and not rule.anchor_end:
+                rule.host = host
+                return rule
+            if rest.startswith(("/", "^")):
+                rule.host = host
+                rule.pattern = line
+                return rule
+    rule.pattern = line
+    return rule
+
+def _parse_options(rule, options):
+    """Aplica as opções "$..." à regra; False se houver opção não suportada"""
+    for option in options.split(","):
+        option = option.strip().lower()
+        negated = option.startswith("~")
+        name = option[1:] if negated else option
+        name = TYPE_ALIASES.get(name, name)
+        if name in RESOURCE_TYPES:
+            if name == "document" and not negated:
+                if rule.exception:
+                    # @@...$document libera todas as requisições da página
+                    rule.document = True
+                    continue
+                rule.types = (rule.types or set()) | {name}
+            elif negated:
+                rule.excluded_types = (rule.excluded_types or set()) | {name}
+            else:
+                rule.types = (rule.types or set()) | {name}
+        elif name in ("third-party", "3p"):
+            rule.third_party = not negated
+        elif name in ("first-party", "1p"):
+            rule.third_party = negated
+        elif name == "match-case":
+            rule.match_case = True
+        elif name == "important":
+            rule.important = True
+        elif name.startswith("domain="):
+            for domain in option[len("domain="):].split("|"):
+                domain = domain.strip()
+                if domain.startswith("~"):
+                    rule.exclude_domains = (rule.exclude_domains or set()) | {domain[1:]}
+                elif domain:
+                    rule.include_domains = (rule.include_domains or set()) | {domain}
+        elif option in IGNORED_OPTIONS:
+            continue
+        else:
+            # popup, csp, redirect, elemhide...: fora do escopo do bloqueio de rede
+            return False
+    return True
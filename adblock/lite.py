@@ -0,0 +1,66 @@
+from adblock.engine import url_host, site_of
+
+# Tipos bloqueados por padrão no modo leve (nomes das opções Adblock Plus)
+DEFAULT_LITE_TYPES = ("image", "font", "media", "subdocument", "ping")
+# Tipos que o modo leve aceita bloquear; "document" nunca: a página em si sempre carrega
+LITE_TYPES = ("image", "font", "media", "subdocument", "ping", "stylesheet",
+              "script", "object", "websocket")
+
+class LiteMode:
+    """Bloqueio por tipo de recurso (imagens, fontes, mídia...) para páginas leves.
+
+    `blocked_types` vale para todos os sites quando `enabled`. `sites`
+    guarda exceções por host ou site registrável: um conjunto de tipos
+    próprio (vazio = site liberado), aplicado mesmo com o modo global
+    desligado. A decisão custa no máximo duas consultas a dicionário.
+    """
+    def __init__(self, enabled=False, blocked_types=DEFAULT_LITE_TYPES, sites=None):
+        self.enabled = enabled
+        self.blocked_types = frozenset(blocked_types)
+        self.sites = {}
+        for site, types in (sites or {}).items():
+            self.set_site(site, types)
+
+    @classmethod
+    def from_settings(cls, config):
+        config = config or {}
+        return cls(config.get("enabled", False),
+                   config.get("blocked_types") or DEFAULT_LITE_TYPES,
+                   config.get("sites"))
+
+    def to_settings(self):
+        return {
+            "enabled": self.enabled,
+            "blocked_types": sorted(self.blocked_types),
+            "sites": {site: sorted(types) for site, types in self.sites.items()}
+        }
+
+    @property
+    def active(self):
+        """Há algo a verificar? (o interceptador pula tudo quando não)"""
+        return self.enabled or bool(self.sites)
+
+    def set_site(self, site, types):
+        """Tipos bloqueados em `site`; None remove a exceção e volta ao padrão"""
+        site = site.lower()
+        if types is None:
+            self.sites.pop(site, None)
+        else:
+            self.sites[site] = frozenset(t for t in types if t in LITE_TYPES)
+
+    def types_for(self, host):
+        """Tipos bloqueados nas páginas de `host`"""
+        sites = self.sites
+        if sites:
+            types = sites.get(host)
+            if types is None:
+                types = sites.get(site_of(host))
+            if types is not None:
+                return types
+        return self.blocked_types if self.enabled else frozenset()
+
+    def blocks(self, resource_type, first_party_url):
+        """A requisição deve ser bloqueada pelo modo leve?"""
+        if resource_type == "document":
+            return False
+        return resource_type in self.types_for(url_host(first_party_url))
@@ -0,0 +1,105 @@
+import heapq
+
+# Faixas do histograma de latência: a faixa i cobre [2^(i-1), 2^i) microssegundos
+LATENCY_BUCKETS = 24
+# Limite de sites/domínios distintos acompanhados (os excedentes vão para "outros")
+MAX_TRACKED = 2000
+OTHER = "(outros)"
+
+class InterceptorMetrics:
+    """Métricas do interceptador de requisições.
+
+    Pensado para ser atualizado por uma única thread (a de E/S do
+    Chromium) sem trava: cada registro só incrementa inteiros em listas e
+    dicionários, operações atômicas sob o GIL. Quem lê (a interface) usa
+    `snapshot()`, que copia os valores; uma leitura concorrente pode ver
+    contadores com uma requisição de diferença entre si, o que basta para
+    estatística.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.blocked = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.latency = [0] * LATENCY_BUCKETS
+        # tipo de recurso -> [requisições, bloqueadas]
+        self.by_type = {}
+        # site de primeira parte -> [requisições, bloqueadas]
+        self.by_site = {}
+        # domínio bloqueado -> quantidade
+        self.blocked_domains = {}
+
+    @staticmethod
+    def _bucket(elapsed_ns):
+        return min(LATENCY_BUCKETS - 1, (elapsed_ns // 1000).bit_length())
+
+    @staticmethod
+    def _counter(table, key):
+        counter = table.get(key)
+        if counter is None:
+            if len(table) >= MAX_TRACKED:
+                key = OTHER
+                counter = table.get(key)
+            if counter is None:
+                counter = table[key] = [0, 0]
+        return counter
+
+    def record(self, elapsed_ns, resource_type, site, blocked_host=None):
+        """Registra uma requisição decidida em `elapsed_ns` nanossegundos"""
+        self.requests += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.latency[self._bucket(elapsed_ns)] += 1
+        by_type = self._counter(self.by_type, resource_type)
+        by_site = self._counter(self.by_site, site or OTHER)
+        by_type[0] += 1
+        by_site[0] += 1
+        if blocked_host is not None:
+            self.blocked += 1
+            by_type[1] += 1
+            by_site[1] += 1
+            domains = self.blocked_domains
+            if blocked_host not in domains and len(domains) >= MAX_TRACKED:
+                blocked_host = OTHER
+            domains[blocked_host] = domains.get(blocked_host, 0) + 1
+
+    def percentile(self, fraction, latency=None):
+        """Limite superior (µs) da faixa do histograma que contém o percentil"""
+        latency = self.latency if latency is None else latency
+        total = sum(latency)
+        if not total:
+            return 0
+        target = fraction * total
+        seen = 0
+        for i, count in enumerate(latency):
+            seen += count
+            if seen >= target:
+                return 1 << i
+        return 1 << (LATENCY_BUCKETS - 1)
+
+    def top_blocked(self, limit=20):
+        """Domínios mais bloqueados: [(domínio, quantidade)]"""
+        return heapq.nlargest(limit, list(self.blocked_domains.items()), key=lambda item: item[1])
+
+    def snapshot(self, top=20):
+        """Cópia das métricas em tipos simples (pode ser gravada como JSON)"""
+        latency = list(self.latency)
+        requests = self.requests
+        return {
+            "requests": requests,
+            "blocked": self.blocked,
+            "mean_us": round(self.total_ns / requests / 1000, 2) if requests else 0,
+            "max_us": round(self.max_ns / 1000, 2),
+            "p50_us": self.percentile(0.5, latency),
+            "p90_us": self.percentile(0.9, latency),
+            "p99_us": self.percentile(0.99, latency),
+            "latency_histogram": {f"<{1 << i}us": count
+                                  for i, count in enumerate(latency) if count},
+            "by_type": {key: list(value) for key, value in list(self.by_type.items())},
+            "by_site": {key: list(value) for key, value in list(self.by_site.items())},
+            "top_blocked": self.top_blocked(top)
+        }
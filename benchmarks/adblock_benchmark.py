@@ -0,0 +1,204 @@
+"""Benchmark do filtro de anúncios reproduzindo um corpus de requisições.
+
+O corpus é gravado pelo navegador (Ferramentas > Gravar Requisições) em
+JSONL comprimido; sem --corpus, um corpus sintético é gerado. Cada conjunto
+de listas é carregado nos motores em memória e compilado (mmap) e o corpus
+é reproduzido sem Qt, medindo requisições por segundo, latência por
+decisão (p50/p90/p99) e memória. Com --baseline, o resultado é comparado
+com um relatório anterior e o código de saída indica regressão.
+
+Uso:
+    python -m benchmarks.adblock_benchmark --corpus requests_20240101_120000.jsonl.gz
+    python -m benchmarks.adblock_benchmark --lists easylist.txt --lists easylist.txt,extra.txt
+    python -m benchmarks.adblock_benchmark --output atual.json --baseline anterior.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import datetime
+import platform
+import tempfile
+import tracemalloc
+from array import array
+
+from adblock.engine import FilterEngine, default_filter_lists
+from adblock.compiled import compile_lists, CompiledFilterEngine
+from adblock.corpus import read_corpus
+from benchmarks.common import git_revision, max_rss_kb
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FILTERS_DIR = os.path.join(ROOT_DIR, "filters")
+ENGINES = ("memory", "compiled")
+SYNTHETIC_SIZE = 50_000
+RESOURCE_WEIGHTS = [("image", 35), ("script", 25), ("xmlhttprequest", 15), ("stylesheet", 8),
+                    ("font", 5), ("subdocument", 4), ("media", 2), ("ping", 2), ("other", 4)]
+WORDS = ["static", "cdn", "img", "assets", "api", "news", "video", "app", "track", "pixel",
+         "banner", "analytics", "ads", "main", "bundle", "style", "font", "player"]
+
+def synthetic_corpus(size, seed=42):
+    """Requisições sintéticas: poucos sites concentram o tráfego, com terceiros e anúncios"""
+    rng = random.Random(seed)
+    sites = [f"{rng.choice(WORDS)}{i}.{rng.choice(['com', 'com.br', 'org', 'net'])}"
+             for i in range(200)]
+    third_parties = [f"{rng.choice(WORDS)}.{rng.choice(WORDS)}{i}.com" for i in range(300)]
+    third_parties += ["doubleclick.net", "googlesyndication.com", "ads.example.com"]
+    types = [name for name, weight in RESOURCE_WEIGHTS for _ in range(weight)]
+    corpus = []
+    for _ in range(size):
+        site = sites[min(len(sites) - 1, int(rng.paretovariate(1.1)) - 1)]
+        first_party = f"https://www.{site}/"
+        host = f"www.{site}" if rng.random() < 0.4 else rng.choice(third_parties)
+        path = "/".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+        query = f"?id={rng.randint(1, 10 ** 6)}" if rng.random() < 0.3 else ""
+        corpus.append((f"https://{host}/{path}.{rng.choice(['js', 'png', 'css', 'gif'])}{query}",
+                       first_party, rng.choice(types)))
+    return corpus
+
+def load_engine(kind, paths, workdir):
+    """Constrói o motor pedido; retorna (motor, estatísticas de carga)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    if kind == "memory":
+        engine = FilterEngine.from_files(paths)
+        extra = {}
+    else:
+        output = os.path.join(workdir, f"bench-{len(os.listdir(workdir))}.bin")
+        compile_start = time.perf_counter()
+        compile_lists(paths, output)
+        extra = {"compile_ms": round((time.perf_counter() - compile_start) * 1000, 3),
+                 "file_bytes": os.path.getsize(output)}
+        start = time.perf_counter()
+        engine = CompiledFilterEngine(output)
+    load_ms = (time.perf_counter() - start) * 1000
+    traced, _ = tracemalloc.get_traced_memory()
+    # O tracemalloc distorce as medidas de tempo: desligado antes da reprodução
+    tracemalloc.stop()
+    return engine, {"rules": engine.rule_count, "load_ms": round(load_ms, 3),
+                    "memory_kb": round(traced / 1024, 1), **extra}
+
+def replay(engine, corpus):
+    """Reproduz o corpus uma vez; retorna (latências em ns, bloqueadas, tempo total em s)"""
+    latencies = array('q', bytes(8 * len(corpus)))
+    blocked = 0
+    clock = time.perf_counter_ns
+    match = engine.match
+    start = time.perf_counter()
+    for i, (url, first_party, resource_type) in enumerate(corpus):
+        t0 = clock()
+        if match(url, first_party, resource_type) is not None:
+            blocked += 1
+        latencies[i] = clock() - t0
+    return latencies, blocked, time.perf_counter() - start
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def run_engine(kind, paths, corpus, repeat, workdir):
+    engine, results = load_engine(kind, paths, workdir)
+    runs = []
+    for _ in range(repeat):
+        latencies, blocked, elapsed = replay(engine, corpus)
+        ordered = sorted(latencies)
+        runs.append({
+            "requests_per_s": round(len(corpus) / elapsed) if elapsed else None,
+            "p50_us": round(percentile(ordered, 0.5) / 1000, 2),
+            "p90_us": round(percentile(ordered, 0.9) / 1000, 2),
+            "p99_us": round(percentile(ordered, 0.99) / 1000, 2),
+            "max_us": round(ordered[-1] / 1000, 2) if ordered else 0,
+            "blocked": blocked
+        })
+    # A primeira passada aquece caches (hashes, veredictos); a melhor mostra o regime estável
+    results["first_run"] = runs[0]
+    results["best_run"] = max(runs, key=lambda run: run["requests_per_s"] or 0)
+    if hasattr(engine, "close"):
+        engine.close()
+    return results
+
+def compare(report, baseline, tolerance):
+    """Regressões de vazão acima de `tolerance` em relação ao relatório base"""
+    regressions = []
+    for name, engines in report["results"].items():
+        for kind, results in engines.items():
+            try:
+                before = baseline["results"][name][kind]["best_run"]["requests_per_s"]
+            except (KeyError, TypeError):
+                continue
+            after = results["best_run"]["requests_per_s"]
+            if before and after is not None and after < before * (1 - tolerance):
+                regressions.append(f"{name}/{kind}: {before} -> {after} req/s")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do filtro de anúncios")
+    parser.add_argument("--corpus", action="append",
+                        help="corpus gravado (.jsonl ou .jsonl.gz); pode repetir")
+    parser.add_argument("--synthetic", type=int, default=SYNTHETIC_SIZE,
+                        help="tamanho do corpus sintético quando não há --corpus")
+    parser.add_argument("--lists", action="append",
+                        help="conjunto de listas separadas por vírgula; pode repetir "
+                             "(padrão: listas do navegador)")
+    parser.add_argument("--engines", default=",".join(ENGINES),
+                        help="motores separados por vírgula (memory, compiled)")
+    parser.add_argument("--repeat", type=int, default=3, help="reproduções do corpus")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument("--baseline", help="relatório anterior para detectar regressões")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="queda de vazão tolerada em relação ao --baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        corpus = [request for path in args.corpus for request in read_corpus(path)]
+        source = args.corpus
+    else:
+        corpus = synthetic_corpus(args.synthetic)
+        source = f"sintético ({args.synthetic})"
+    rule_sets = [value.split(",") for value in args.lists] if args.lists else \
+        [default_filter_lists(FILTERS_DIR)]
+    engines = [kind for kind in args.engines.split(",") if kind in ENGINES]
+
+    report = {
+        "revision": git_revision(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": source,
+        "requests": len(corpus),
+        "results": {}
+    }
+    workdir = tempfile.mkdtemp(prefix="naveg-adblock-bench-")
+    try:
+        for paths in rule_sets:
+            name = "+".join(os.path.basename(path) for path in paths)
+            report["results"][name] = {}
+            for kind in engines:
+                print(f"Reproduzindo {len(corpus)} requisições: {name} ({kind})...",
+                      file=sys.stderr)
+                report["results"][name][kind] = run_engine(kind, paths, corpus,
+                                                           max(1, args.repeat), workdir)
+        report["max_rss_kb"] = max_rss_kb()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        report["regressions"] = regressions
+        for regression in regressions:
+            print(f"Regressão: {regression}", file=sys.stderr)
+        status = 1 if regressions else 0
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
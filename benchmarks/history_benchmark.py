@@ -0,0 +1,169 @@
+"""Benchmark do histórico com dados sintéticos.
+
+Gera históricos realistas (10 mil, 100 mil e 1 milhão de visitas por
+padrão), mede carregamento, add_entry, buscas, get_today_entries, remoções
+e o preenchimento do HistoryDialog, e grava os resultados em JSON para
+comparar commits.
+
+Uso:
+    python -m benchmarks.history_benchmark --output resultados.json
+    python -m benchmarks.history_benchmark --sizes 10000 --repeat 5
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import datetime
+import platform
+import tempfile
+
+# A interface roda sem janela; precisa ser definido antes de importar o Qt
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from ui.history_manager import HistoryManager, HistoryDialog
+from benchmarks.common import git_revision, max_rss_kb
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+# Quantidade de dias cobertos pelo histórico sintético
+HISTORY_DAYS = 365
+WORDS = ["notícias", "python", "receita", "futebol", "clima", "música", "filme",
+         "tutorial", "preço", "viagem", "mapa", "banco", "escola", "loja", "jogo",
+         "docs", "api", "fórum", "vídeo", "blog"]
+TLDS = ["com", "com.br", "org", "net", "io", "gov.br"]
+QUERIES = ["python", "not", "receita clima", "example", "zzzz"]
+
+def generate_history(history_file, size, seed=42):
+    """Cria um histórico sintético com `size` visitas em `history_file`.
+
+    A popularidade dos sites segue uma distribuição de cauda longa: poucos
+    hosts concentram a maioria das visitas, como num histórico real. As
+    visitas se espalham por HISTORY_DAYS dias até agora, incluindo hoje.
+    """
+    rng = random.Random(seed)
+    hosts = [
+        f"{rng.choice(['', 'www.', 'm.', 'blog.'])}{rng.choice(WORDS)}{i}.{rng.choice(TLDS)}"
+        for i in range(max(10, size // 50))
+    ]
+    now = int(time.time())
+    start = now - HISTORY_DAYS * 86400
+    times = sorted(rng.randint(start, now) for _ in range(size))
+    manager = HistoryManager(history_file)
+    for visit_id, ts in enumerate(times, 1):
+        host = hosts[min(len(hosts) - 1, int(rng.paretovariate(1.2)) - 1)]
+        path = "/".join(rng.choice(WORDS) for _ in range(rng.randint(0, 3)))
+        url = f"https://{host}/{path}"
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))).title()
+        manager._record_visit(visit_id, url, title, ts, typed=rng.random() < 0.05)
+    manager._last_id = size
+    manager.save_history()
+    manager.close()
+    return hosts
+
+def measure(func, repeat=1):
+    """Executa `func` `repeat` vezes; retorna (estatísticas em ms, último resultado)"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "runs": repeat,
+        "mean_ms": round(sum(samples) / repeat, 3),
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(samples[repeat // 2], 3),
+        "max_ms": round(samples[-1], 3)
+    }, result
+
+def populate_dialog(app, manager, pages=5):
+    """Abre o diálogo, rola algumas páginas e aplica um filtro por período"""
+    dialog = HistoryDialog(None, manager)
+    for _ in range(pages):
+        if dialog.model.canFetchMore():
+            dialog.model.fetchMore()
+    dialog.period_combo.setCurrentIndex(1)
+    app.processEvents()
+    rows = dialog.model.rowCount()
+    dialog.deleteLater()
+    app.processEvents()
+    return rows
+
+def run_size(app, size, repeat, workdir):
+    """Mede todas as operações para um histórico de `size` visitas"""
+    results = {}
+    history_file = os.path.join(workdir, f"history-{size}.json")
+    start = time.perf_counter()
+    hosts = generate_history(history_file, size)
+    results["generate_s"] = round(time.perf_counter() - start, 3)
+
+    results["load"], manager = measure(lambda: HistoryManager(history_file), repeat)
+    results["first_search"], _ = measure(lambda: manager.search_history(QUERIES[0]))
+    results["search_history"], _ = measure(
+        lambda: [manager.search_history(query) for query in QUERIES], repeat)
+    results["search_page"], _ = measure(
+        lambda: [manager.search_page(query, 0, 200) for query in QUERIES], repeat)
+    results["get_today_entries"], today = measure(manager.get_today_entries, repeat)
+    results["today_sites"] = len(today)
+    results["dialog_population"], rows = measure(lambda: populate_dialog(app, manager), repeat)
+    results["dialog_rows"] = rows
+
+    counter = iter(range(10 ** 9))
+    def add_batch():
+        for _ in range(1000):
+            n = next(counter)
+            manager.add_entry(f"https://bench{n % 97}.example.com/{n}", f"Bench {n}")
+    stats, _ = measure(add_batch, repeat)
+    results["add_entry_x1000"] = stats
+
+    rng = random.Random(size)
+    sites = manager.get_page(0, 1000)
+    results["remove_urls_x50"], _ = measure(
+        lambda: manager.remove_urls([r.url for r in rng.sample(sites, min(50, len(sites)))]))
+    results["forget_host"], _ = measure(lambda: manager.forget_host(hosts[0]))
+    now = int(time.time())
+    results["remove_range_1day"], _ = measure(
+        lambda: manager.remove_range(now - 30 * 86400, now - 29 * 86400))
+    results["save_history"], _ = measure(manager.save_history)
+    manager.close()
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do histórico do navegador")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="tamanhos (número de visitas) separados por vírgula")
+    parser.add_argument("--repeat", type=int, default=3, help="repetições por medida")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    report = {
+        "revision": git_revision(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {}
+    }
+    workdir = tempfile.mkdtemp(prefix="naveg-bench-")
+    try:
+        for size in (int(value) for value in args.sizes.split(",") if value):
+            print(f"Medindo histórico com {size} visitas...", file=sys.stderr)
+            report["results"][str(size)] = run_size(app, size, max(1, args.repeat), workdir)
+            report["results"][str(size)]["max_rss_kb"] = max_rss_kb()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
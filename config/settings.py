@@ -1,7 +1,12 @@
 import json
 import os
+import atexit
+import threading
+from contextlib import contextmanager
 
 CONFIG_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "settings.json")
+# Espera (s) após a última alteração antes de gravar settings.json
+SAVE_DELAY = 0.5
 
 DEFAULT_SETTINGS = {
     "general": {
@@ -13,7 +18,26 @@ DEFAULT_SETTINGS = {
     "privacy": {
         "clear_on_exit": False,
         "do_not_track": True,
-        "block_ads": False
+        "block_ads": False,
+        # Filtro de Bloom das listas de bloqueio: taxa de falsos positivos e
+        # tamanho máximo em KiB (0 = sem limite); mudar recompila as listas
+        "filter_fp_rate": 0.01,
+        "filter_bloom_max_kb": 0
+    },
+    "lite_mode": {
+        # Tipos de recurso bloqueados em todos os sites quando ativado
+        "enabled": False,
+        "blocked_types": ["image", "font", "media", "subdocument", "ping"],
+        # Exceções por site: lista própria de tipos ([] = carregar tudo)
+        "sites": {}
+    },
+    "tabs": {
+        # Abas com página viva; as menos usadas além disso são descartadas
+        "max_live_tabs": 12,
+        # Memória dos processos de renderização em MB (0 = sem limite; só Linux)
+        "memory_budget_mb": 0,
+        # Abas em segundo plano paradas há mais tempo (s) são congeladas (0 = nunca)
+        "freeze_after_s": 600
     },
     "appearance": {
         "theme": "light",
@@ -31,33 +55,149 @@ DEFAULT_SETTINGS = {
 }
 
 class Settings:
-    def __init__(self):
+    """Configurações do navegador em settings.json.
+
+    `set` altera só a memória e agenda uma gravação em segundo plano após
+    SAVE_DELAY; alterações seguidas adiam a gravação, então uma rajada de
+    mudanças vira uma única escrita. `batch()` suspende as gravações até o
+    fim do bloco. O arquivo é gravado num temporário e renomeado
+    (os.replace), nunca fica pela metade.
+
+    Quem depende de uma configuração se inscreve com `subscribe` e recebe
+    (seção, chave, valor antigo, valor novo) só quando ela muda de fato.
+    Dentro de um `batch()` os avisos ficam retidos e saem no fim do bloco,
+    um por chave alterada.
+    """
+    def __init__(self, config_file=CONFIG_FILE):
+        self.config_file = config_file
+        self._lock = threading.Lock()
+        # Serializa as escritas em disco (timer e flush explícito)
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self._batch_depth = 0
+        self._save_timer = None
+        # (seção, chave) -> callbacks; None em qualquer posição casa com tudo
+        self._subscribers = {}
+        # (seção, chave) -> valor antigo, retidos durante um batch
+        self._pending_changes = {}
         self.settings = self.load_settings()
 
     def load_settings(self):
-        if os.path.exists(CONFIG_FILE):
+        if os.path.exists(self.config_file):
             try:
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                with open(self.config_file, 'r', encoding='utf-8') as f:
                     return {**DEFAULT_SETTINGS, **json.load(f)}
             except Exception:
                 return DEFAULT_SETTINGS.copy()
         return DEFAULT_SETTINGS.copy()
 
     def save_settings(self):
-        try:
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, indent=4)
-        except Exception as e:
-            print(f"Erro ao salvar configurações: {e}")
+        """Grava agora, mesmo sem alterações pendentes"""
+        with self._lock:
+            self._dirty = True
+        self.flush()
 
     def get(self, section, key):
         return self.settings.get(section, {}).get(key)
 
     def set(self, section, key, value):
-        if section not in self.settings:
-            self.settings[section] = {}
-        self.settings[section][key] = value
-        self.save_settings()
+        with self._lock:
+            if section not in self.settings:
+                self.settings[section] = {}
+            old = self.settings[section].get(key)
+            self.settings[section][key] = value
+            self._dirty = True
+            if self._batch_depth:
+                # Guarda o valor de antes do batch; o novo é lido no fim
+                self._pending_changes.setdefault((section, key), old)
+                return
+            self._start_timer()
+        if old != value:
+            self._notify(section, key, old, value)
+
+    # Avisos de alteração
+
+    def subscribe(self, callback, section=None, key=None):
+        """Chama callback(seção, chave, antigo, novo) quando a configuração mudar.
+
+        Sem `key`, recebe todas as chaves da seção; sem `section`, todas as
+        alterações. Os avisos saem na thread que chamou `set` (a da interface).
+        """
+        callbacks = self._subscribers.setdefault((section, key), [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+
+    def unsubscribe(self, callback, section=None, key=None):
+        callbacks = self._subscribers.get((section, key), [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def _notify(self, section, key, old, new):
+        for pattern in ((section, key), (section, None), (None, None)):
+            for callback in list(self._subscribers.get(pattern, ())):
+                try:
+                    callback(section, key, old, new)
+                except Exception as e:
+                    print(f"Erro ao aplicar configuração {section}.{key}: {e}")
+
+    # Gravação
+
+    @contextmanager
+    def batch(self):
+        """Agrupa alterações: uma única gravação depois do bloco"""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            changes = {}
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    changes, self._pending_changes = self._pending_changes, {}
+                    if self._dirty:
+                        self._start_timer()
+            for (section, key), old in changes.items():
+                new = self.get(section, key)
+                if old != new:
+                    self._notify(section, key, old, new)
+
+    def _start_timer(self):
+        # Chamado com self._lock adquirido
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+        self._save_timer = threading.Timer(SAVE_DELAY, self.flush)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+
+    def flush(self):
+        """Grava as alterações pendentes imediatamente"""
+        with self._write_lock:
+            with self._lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                if not self._dirty:
+                    return
+                # Serializado sob a trava: um `set` concorrente não corrompe a cópia
+                data = json.dumps(self.settings, indent=4)
+                self._dirty = False
+            try:
+                tmp_file = self.config_file + ".tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.config_file)
+            except Exception as e:
+                with self._lock:
+                    self._dirty = True
+                print(f"Erro ao salvar configurações: {e}")
+
+    def close(self):
+        self.flush()
 
 # Create a global instance
 settings = Settings()
+# Alterações ainda no timer não se perdem se o processo terminar antes dele
+atexit.register(settings.close)
@@ -1,5 +1,6 @@
 from PyQt6.QtGui import QAction  # Changed from QtWidgets to QtGui
 from abc import ABC, abstractmethod
+from config.settings import settings
 
 class ExtensionBase(ABC):
     """Classe base para extensões"""
@@ -7,6 +8,7 @@ class ExtensionBase(ABC):
     def __init__(self, browser):
         self.browser = browser
         self.actions = []
+        self.setting_callbacks = []
     
     def init(self):
         """Inicializa a extensão"""
@@ -38,3 +40,14 @@ class ExtensionBase(ABC):
         action.triggered.connect(callback)
         self.actions.append(action)
         return action
+    
+    def watch_setting(self, callback, section=None, key=None):
+        """Chama callback(seção, chave, antigo, novo) quando a configuração mudar"""
+        settings.subscribe(callback, section, key)
+        self.setting_callbacks.append((callback, section, key))
+    
+    def unwatch_settings(self):
+        """Cancela todas as inscrições feitas com watch_setting"""
+        for callback, section, key in self.setting_callbacks:
+            settings.unsubscribe(callback, section, key)
+        self.setting_callbacks = []
@@ -8,6 +8,16 @@ import re
 from bs4 import BeautifulSoup
 from urllib.parse import quote
 
+# Elementos ocultados pelo bloqueador de distrações
+DISTRACTION_CSS = """
+.ad, .advertisement, .social-share,
+.recommended, .trending, .popular,
+iframe:not([src*="youtube"]),
+[class*="newsletter"],
+[class*="popup"],
+[id*="popup"] { display: none !important; }
+"""
+
 class SmartBrowsePanel(QDialog):
     def __init__(self, browser, parent=None):
         super().__init__(parent)
@@ -376,26 +386,8 @@ class SmartBrowsePanel(QDialog):
     
     def toggle_distraction_block(self, enabled):
         """Ativa/desativa bloqueador de distrações"""
-        current = self.browser.current_browser()
-        if current:
-            js = """
-            if (!document.getElementById('distraction-blocker')) {
-                var style = document.createElement('style');
-                style.id = 'distraction-blocker';
-                style.innerHTML = `
-                    .ad, .advertisement, .social-share,
-                    .recommended, .trending, .popular,
-                    iframe:not([src*="youtube"]),
-                    [class*="newsletter"],
-                    [class*="popup"],
-                    [id*="popup"] { display: none !important; }
-                `;
-                document.head.appendChild(style);
-            } else {
-                document.getElementById('distraction-blocker').remove();
-            }
-            """
-            current.page().runJavaScript(js)
+        # Registrado na criação do documento: os elementos nem chegam a aparecer
+        self.browser.set_page_style("distraction-blocker", DISTRACTION_CSS, enabled)
 
 class Extension(ExtensionBase):
     def _init(self):
@@ -1,12 +1,14 @@
 import sys
 import os
-import json
-from PyQt6.QtCore import QUrl, QSize, Qt, QPoint, QPropertyAnimation, QTimer, QEasingCurve, QParallelAnimationGroup
+import threading
+import time
+from PyQt6.QtCore import QUrl, QSize, Qt, QPoint, QPropertyAnimation, QTimer, QEasingCurve, QParallelAnimationGroup, QThreadPool
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QToolBar, 
                            QLineEdit, QVBoxLayout, QWidget, 
                            QPushButton, QStatusBar, QTabWidget,
                            QMenu, QDialog, QLabel, QFormLayout,
-                           QComboBox, QMessageBox, QStackedWidget)
+                           QComboBox, QMessageBox, QStackedWidget, QToolButton,
+                           QFileDialog, QProgressDialog)
 from PyQt6.QtGui import QAction, QIcon, QKeySequence, QShortcut  # Movido QShortcut para cá
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtWebEngineCore import QWebEnginePage, QWebEngineProfile, QWebEngineUrlRequestInterceptor
@@ -18,63 +20,198 @@ from ui.search_panel import SearchPanel
 from ui.reader_mode import ReaderModeWidget, ReaderModeExtractor
 from ui.gestures import GestureAwareWebView, GestureHandler
 from ui.screenshot import ScreenshotDialog, ScreenshotTool
+from ui.blocking_stats import BlockingStatsDialog
+from ui.style_injector import StyleInjector
+from ui.bookmark_store import BookmarkStore, ROOT_ID
+from ui.bookmarks_dialog import BookmarksDialog, BookmarkMenu
+from ui.bookmark_import import BookmarkImporter
+from ui.tab_lifecycle import TabLifecycleManager, save_history, restore_history
+from ui.session_store import SessionStore, encode_history, decode_history
 from download_manager import DownloadManager  # Add this import
 from extensions.extension_manager import ExtensionManager
+from adblock.engine import default_filter_lists, url_host, site_of
+from adblock.compiled import load_filter_engine
+from adblock.metrics import InterceptorMetrics
+from adblock.lite import LiteMode
+from adblock.corpus import RequestRecorder
 import datetime
 
 # Caminho para o arquivo de favoritos
 BOOKMARKS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bookmarks.json")
 # Caminho para o arquivo de histórico
 HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.json")
+# Abas abertas da última sessão (general.save_session)
+SESSION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "session.json")
+# Espera (ms) após uma mudança nas abas antes de montar o snapshot da sessão
+SESSION_DELAY_MS = 2000
+# Pasta com listas de filtros extras no formato Adblock Plus (ex.: easylist.txt)
+FILTERS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "filters")
+# Listas de filtros compiladas (recriado quando alguma lista muda)
+COMPILED_FILTERS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "filters.bin")
+# Corpus de requisições gravadas para benchmarks.adblock_benchmark
+REQUEST_CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+# Tipos de recurso do Qt -> tipos usados nas opções das regras Adblock Plus
+RESOURCE_TYPES = {
+    "ResourceTypeMainFrame": "document",
+    "ResourceTypeSubFrame": "subdocument",
+    "ResourceTypeStylesheet": "stylesheet",
+    "ResourceTypeScript": "script",
+    "ResourceTypeImage": "image",
+    "ResourceTypeFavicon": "image",
+    "ResourceTypeFontResource": "font",
+    "ResourceTypeObject": "object",
+    "ResourceTypePluginResource": "object",
+    "ResourceTypeMedia": "media",
+    "ResourceTypeXhr": "xmlhttprequest",
+    "ResourceTypePing": "ping",
+    "ResourceTypeWebSocket": "websocket"
+}
 
 class WebEnginePage(QWebEnginePage):
     """Página web personalizada para suprimir os avisos de console"""
+    # Injetor de estilos do perfil (definido pela janela principal)
+    style_injector = None
+    
     def javaScriptConsoleMessage(self, level, message, lineNumber, sourceID):
         # Ignora mensagens de console JavaScript para manter o console limpo
         pass
+    
+    def acceptNavigationRequest(self, url, nav_type, is_main_frame):
+        # Registra o CSS cosmético do host antes de o documento ser criado
+        if self.style_injector is not None:
+            self.style_injector.prepare_url(url)
+        return super().acceptNavigationRequest(url, nav_type, is_main_frame)
 
 class PrivacyInterceptor(QWebEngineUrlRequestInterceptor):
     """Interceptor para aplicar configurações avançadas de privacidade."""
-    def __init__(self, do_not_track=False, block_ads=False):
+    def __init__(self, do_not_track=False, block_ads=False, lite_mode=None):
         super().__init__()
         self.do_not_track = do_not_track
-        self.block_ads = block_ads
-        # Lista simples de domínios de anúncios (pode ser expandida)
-        self.ad_domains = ["doubleclick.net", "googlesyndication.com", "adservice.google.com"]
+        self.block_ads = False
+        # Bloqueio por tipo de recurso (imagens, fontes, mídia...)
+        self.lite_mode = lite_mode or LiteMode()
+        # Motor de filtros Adblock Plus, lido do arquivo compilado via mmap
+        self.filter_engine = None
+        self._filter_loader = None
+        # Latência e contadores de bloqueio de cada requisição interceptada
+        self.metrics = InterceptorMetrics()
+        # Gravador de corpus (RequestRecorder), ativado pelo menu Ferramentas
+        self.recorder = None
+        self.set_block_ads(block_ads)
+    
+    def set_block_ads(self, enabled):
+        """Liga/desliga o bloqueio, carregando as listas na primeira vez"""
+        self.block_ads = enabled
+        if not enabled or self.filter_engine is not None or self._filter_loader is not None:
+            return
+        paths = default_filter_lists(FILTERS_DIR)
+        bloom = {
+            "fp_rate": settings.get("privacy", "filter_fp_rate") or 0.01,
+            "bloom_max_bytes": (settings.get("privacy", "filter_bloom_max_kb") or 0) * 1024 or None
+        }
+        # Arquivo compilado em dia: abrir é instantâneo, qualquer que seja o tamanho das listas
+        self.filter_engine = load_filter_engine(paths, COMPILED_FILTERS_FILE,
+                                                compile_if_stale=False, **bloom)
+        if self.filter_engine is None:
+            self._filter_loader = threading.Thread(target=self._load_filters,
+                                                   args=(paths, bloom), daemon=True)
+            self._filter_loader.start()
+    
+    def _load_filters(self, paths, bloom):
+        try:
+            engine = load_filter_engine(paths, COMPILED_FILTERS_FILE, **bloom)
+        except Exception as e:
+            print(f"Erro ao compilar listas de filtros: {e}")
+            return
+        # Troca atômica: requisições anteriores passaram sem filtro
+        self.filter_engine = engine
         
     def interceptRequest(self, info):
-        url = info.requestUrl().toString()
-        if self.block_ads:
-            for domain in self.ad_domains:
-                if domain in url:
-                    info.block(True)
-                    return
+        engine = self.filter_engine if self.block_ads else None
+        lite_mode = self.lite_mode
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(info.requestUrl().toString(), info.firstPartyUrl().toString(),
+                            RESOURCE_TYPES.get(info.resourceType().name, "other"))
+        if engine is not None or lite_mode.active:
+            # A gravação acima fica fora da latência medida
+            start = time.perf_counter_ns()
+            url = info.requestUrl().toString()
+            first_party = info.firstPartyUrl().toString()
+            resource_type = RESOURCE_TYPES.get(info.resourceType().name, "other")
+            blocked = (lite_mode.active and lite_mode.blocks(resource_type, first_party)
+                       or engine is not None and engine.match(url, first_party, resource_type))
+            if blocked:
+                info.block(True)
+            elapsed = time.perf_counter_ns() - start
+            # Registro fora da medição: não entra na latência que reporta
+            self.metrics.record(elapsed, resource_type, site_of(url_host(first_party)),
+                                url_host(url) if blocked else None)
+            if blocked:
+                return
         # Note: Qt atualmente não permite modificar cabeçalhos em requests
         # para implementar "Do Not Track" diretamente.
 
 class BrowserTab(QWidget):
-    """Widget de uma aba do navegador"""
-    def __init__(self, parent=None):
+    """Widget de uma aba do navegador.
+
+    Com `lazy=True` a aba começa como espaço reservado: guarda só URL, título
+    e ícone, sem QWebEngineView (e sem processo de renderização). A página,
+    o painel de busca e os gestos são criados por `materialize()` quando a
+    aba é ativada pela primeira vez. Abas hibernadas mantêm a página no
+    estado Discarded do Qt (ver TabLifecycleManager).
+    """
+    def __init__(self, parent=None, url=None, title="", icon=None, lazy=False):
         super().__init__(parent)
+        self.browser = None
+        self.search_panel = None
+        self.gesture_handler = None
+        self.pending_url = url or "https://www.google.com"
+        self.pending_title = title
+        self.pending_icon = icon
+        # Estado salvo ao hibernar: histórico serializado e rolagem (x, y)
+        self.pending_history = None
+        self.pending_scroll = None
+        self.last_active = time.monotonic()
+        # Entrada da aba no snapshot da sessão (None = mudou desde o último)
+        self.session_entry = None
+        
+        # Adicionar modo leitor (inicialmente oculto)
+        self.reader_mode = None
+        self.reader_visible = False
+        
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+        
+        if not lazy:
+            self.materialize()
+    
+    def materialize(self):
+        """Cria a página da aba se ela ainda for um espaço reservado.
+
+        Retorna True quando a página acabou de ser criada (os sinais ainda
+        precisam ser conectados).
+        """
+        if self.browser is not None:
+            return False
         self.browser = QWebEngineView()
         
         # Define uma página personalizada para suprimir avisos
         page = WebEnginePage(QWebEngineProfile.defaultProfile(), self.browser)
         self.browser.setPage(page)
         
-        self.browser.setUrl(QUrl("https://www.google.com"))
+        if not (self.pending_history and restore_history(page, self.pending_history)):
+            self.browser.setUrl(QUrl(self.pending_url))
+        self.pending_history = None
+        self.restore_scroll_on_load()
         
-        layout = QVBoxLayout()
-        layout.setContentsMargins(0, 0, 0, 0)
+        layout = self.layout()
         
         # Adicionar painel de pesquisa
         self.search_panel = SearchPanel(self, self.browser)
         layout.addWidget(self.search_panel)
         
-        # Adicionar modo leitor (inicialmente oculto)
-        self.reader_mode = None
-        self.reader_visible = False
-        
         # Container para web view com gestos
         self.web_container = QStackedWidget()
         
@@ -92,8 +229,41 @@ class BrowserTab(QWidget):
         # Adiciona o container de página
         self.web_container.addWidget(self.gesture_view)
         layout.addWidget(self.web_container)
-        
-        self.setLayout(layout)
+        return True
+    
+    def is_placeholder(self):
+        return self.browser is None
+    
+    def save_state(self):
+        """Guarda URL, título, histórico e rolagem da página atual (hibernação e sessão)"""
+        if self.browser is None:
+            return
+        page = self.browser.page()
+        self.pending_url = self.current_url() or self.pending_url
+        self.pending_title = page.title() or self.pending_title
+        self.pending_history = save_history(page)
+        position = page.scrollPosition()
+        self.pending_scroll = (position.x(), position.y())
+    
+    def restore_scroll_on_load(self):
+        """Volta à rolagem salva quando a próxima carga terminar"""
+        if self.pending_scroll and self.pending_scroll != (0, 0):
+            self.browser.loadFinished.connect(self._restore_scroll)
+    
+    def _restore_scroll(self, ok):
+        self.browser.loadFinished.disconnect(self._restore_scroll)
+        if ok and self.pending_scroll:
+            x, y = self.pending_scroll
+            self.browser.page().runJavaScript(f"window.scrollTo({x:.0f}, {y:.0f});")
+        self.pending_scroll = None
+    
+    def current_url(self):
+        """URL da aba, mesmo sem página criada"""
+        return self.browser.url().toString() if self.browser is not None else self.pending_url
+    
+    def current_title(self):
+        """Título da aba, mesmo sem página criada"""
+        return self.browser.page().title() if self.browser is not None else self.pending_title
     
     def show_search_panel(self):
         """Mostra o painel de busca na página"""
@@ -128,7 +298,7 @@ class BrowserTab(QWidget):
 
 class BookmarkDialog(QDialog):
     """Diálogo para adicionar ou editar favoritos"""
-    def __init__(self, parent=None, title="", url=""):
+    def __init__(self, parent=None, title="", url="", folders=()):
         super().__init__(parent)
         self.setWindowTitle("Adicionar Favorito")
         self.setMinimumWidth(400)
@@ -137,9 +307,15 @@ class BookmarkDialog(QDialog):
         
         self.title_input = QLineEdit(title)
         self.url_input = QLineEdit(url)
+        # Pastas de destino: [(id, caminho)]
+        self.folder_combo = QComboBox()
+        for folder_id, path in folders:
+            self.folder_combo.addItem(path, folder_id)
         
         layout.addRow("Título:", self.title_input)
         layout.addRow("URL:", self.url_input)
+        if folders:
+            layout.addRow("Pasta:", self.folder_combo)
         
         buttons_layout = QVBoxLayout()
         
@@ -157,9 +333,11 @@ class BookmarkDialog(QDialog):
     
     def get_data(self):
         """Retorna os dados do favorito"""
+        folder = self.folder_combo.currentData()
         return {
             "title": self.title_input.text(),
-            "url": self.url_input.text()
+            "url": self.url_input.text(),
+            "folder": folder if folder is not None else ROOT_ID
         }
 
 class SimpleBrowser(QMainWindow):
@@ -169,7 +347,8 @@ class SimpleBrowser(QMainWindow):
         self.setGeometry(100, 100, 1280, 800)
         
         # Favoritos
-        self.bookmarks = self.load_bookmarks()
+        self.bookmark_store = BookmarkStore(BOOKMARKS_FILE)
+        self.bookmark_importer = None
         
         # Inicializar gerenciador de histórico
         self.history_manager = HistoryManager(HISTORY_FILE)
@@ -178,17 +357,38 @@ class SimpleBrowser(QMainWindow):
         profile = QWebEngineProfile.defaultProfile()
         self.privacy_interceptor = PrivacyInterceptor(
             do_not_track=settings.get("privacy", "do_not_track"),
-            block_ads=settings.get("privacy", "block_ads")
+            block_ads=settings.get("privacy", "block_ads"),
+            lite_mode=LiteMode.from_settings(settings.settings.get("lite_mode"))
         )
         # Updated call: use setUrlRequestInterceptor
         profile.setUrlRequestInterceptor(self.privacy_interceptor)
         
+        # Ocultação cosmética (##seletor) e estilos das extensões, injetados na criação do documento
+        self.style_injector = StyleInjector(profile, default_filter_lists(FILTERS_DIR))
+        self.style_injector.set_enabled(settings.get("privacy", "block_ads"))
+        WebEnginePage.style_injector = self.style_injector
+        
         # Criar o widget de abas
         self.tabs = QTabWidget()
         self.tabs.setTabsClosable(True)
         self.tabs.tabCloseRequested.connect(self.close_tab)
         self.tabs.currentChanged.connect(self.tab_changed)
         
+        # Hibernação das abas em segundo plano menos usadas
+        self.tab_lifecycle = TabLifecycleManager(
+            self.tabs,
+            max_live_tabs=settings.get("tabs", "max_live_tabs") or 12,
+            memory_budget_mb=settings.get("tabs", "memory_budget_mb") or 0,
+            freeze_after=settings.get("tabs", "freeze_after_s") or 0,
+            parent=self
+        )
+        
+        # Sessão: snapshot das abas gravado em segundo plano após cada mudança
+        self.session_store = SessionStore(SESSION_FILE)
+        self.session_timer = QTimer(self)
+        self.session_timer.setSingleShot(True)
+        self.session_timer.timeout.connect(self.save_session)
+        
         # Configurar o layout principal
         self.setCentralWidget(self.tabs)
         
@@ -233,10 +433,10 @@ class SimpleBrowser(QMainWindow):
         toolbar.addWidget(self.url_bar)
         
         # Botão de favoritos
-        bookmark_btn = QAction("⭐", self)
-        bookmark_btn.setStatusTip("Adicionar aos favoritos (Ctrl+D)")
-        bookmark_btn.triggered.connect(self.add_bookmark)
-        toolbar.addAction(bookmark_btn)
+        self.bookmark_btn = QAction("☆", self)
+        self.bookmark_btn.setStatusTip("Adicionar aos favoritos (Ctrl+D)")
+        self.bookmark_btn.triggered.connect(self.add_bookmark)
+        toolbar.addAction(self.bookmark_btn)
         
         # Botão de nova aba
         new_tab_btn = QAction("+", self)
@@ -244,6 +444,22 @@ class SimpleBrowser(QMainWindow):
         new_tab_btn.triggered.connect(self.add_new_tab)
         toolbar.addAction(new_tab_btn)
         
+        # Modo leve: bloqueia imagens, fontes, mídia... (menu com opções por site)
+        self.lite_mode_btn = QAction("🪶", self)
+        self.lite_mode_btn.setCheckable(True)
+        self.lite_mode_btn.setChecked(self.privacy_interceptor.lite_mode.enabled)
+        self.lite_mode_btn.setStatusTip("Modo leve: não carregar imagens, fontes e mídia")
+        self.lite_mode_btn.toggled.connect(self.toggle_lite_mode)
+        lite_menu = QMenu(self)
+        lite_menu.addAction("Modo leve neste site").triggered.connect(
+            lambda: self.set_lite_mode_site(True))
+        lite_menu.addAction("Carregar tudo neste site").triggered.connect(
+            lambda: self.set_lite_mode_site(False))
+        lite_menu.addAction("Usar o padrão neste site").triggered.connect(
+            lambda: self.set_lite_mode_site(None))
+        self.lite_mode_btn.setMenu(lite_menu)
+        toolbar.addAction(self.lite_mode_btn)
+        
         # Adicionar botão de configurações
         settings_btn = QAction("⚙️", self)
         settings_btn.setStatusTip("Configurações (Ctrl+,)")
@@ -272,15 +488,15 @@ class SimpleBrowser(QMainWindow):
         bookmarks_toolbar.setMovable(False)
         self.addToolBar(bookmarks_toolbar)
         
-        bookmarks_label = QLabel("Favoritos:")
-        bookmarks_toolbar.addWidget(bookmarks_label)
-        
-        # Combobox para favoritos
-        self.bookmarks_combo = QComboBox()
-        self.bookmarks_combo.setMinimumWidth(200)
-        self.bookmarks_combo.activated.connect(self.open_bookmark)
-        self.update_bookmarks_menu()
-        bookmarks_toolbar.addWidget(self.bookmarks_combo)
+        # Menu de pastas montado sob demanda (só as pastas alteradas são remontadas)
+        self.bookmarks_menu = BookmarkMenu(self.bookmark_store, open_url=self.open_bookmark,
+                                           show_all=self.manage_bookmarks, parent=self,
+                                           open_in_tabs=self.open_in_tabs)
+        bookmarks_button = QToolButton()
+        bookmarks_button.setText("Favoritos ▾")
+        bookmarks_button.setMenu(self.bookmarks_menu)
+        bookmarks_button.setPopupMode(QToolButton.ToolButtonPopupMode.InstantPopup)
+        bookmarks_toolbar.addWidget(bookmarks_button)
         
         manage_bookmarks_btn = QPushButton("Gerenciar")
         manage_bookmarks_btn.clicked.connect(self.manage_bookmarks)
@@ -357,6 +573,14 @@ class SimpleBrowser(QMainWindow):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         
+        # Contador de bloqueios permanente na barra de status
+        self.blocked_label = QLabel()
+        self.status_bar.addPermanentWidget(self.blocked_label)
+        self.blocked_timer = QTimer(self)
+        self.blocked_timer.timeout.connect(self.update_blocked_label)
+        self.blocked_timer.start(2000)
+        self.update_blocked_label()
+        
         # Criar barra de menu
         menubar = self.menuBar()
         
@@ -386,6 +610,11 @@ class SimpleBrowser(QMainWindow):
         
         file_menu.addSeparator()
         
+        import_bookmarks_action = file_menu.addAction("Importar Favoritos...")
+        import_bookmarks_action.triggered.connect(self.import_bookmarks)
+        
+        file_menu.addSeparator()
+        
         exit_action = file_menu.addAction("Sair")
         exit_action.setShortcut("Alt+F4")
         exit_action.triggered.connect(self.close)
@@ -415,6 +644,13 @@ class SimpleBrowser(QMainWindow):
         settings_action.setShortcut("Ctrl+,")
         settings_action.triggered.connect(self.show_settings)
         
+        blocking_stats_action = tools_menu.addAction("Estatísticas de Bloqueio")
+        blocking_stats_action.triggered.connect(self.show_blocking_stats)
+        
+        record_requests_action = tools_menu.addAction("Gravar Requisições")
+        record_requests_action.setCheckable(True)
+        record_requests_action.toggled.connect(self.toggle_request_recording)
+        
         keyboard_shortcuts = help_menu.addAction("Atalhos de Teclado")
         keyboard_shortcuts.triggered.connect(self.show_shortcuts)
         
@@ -427,8 +663,12 @@ class SimpleBrowser(QMainWindow):
         # Configurar atalhos de teclado
         self.setup_shortcuts()
         
-        # Mostrar a janela e adicionar uma aba inicial
-        self.add_new_tab()
+        # Reaplicar só as configurações que mudarem
+        self.subscribe_settings()
+        
+        # Mostrar a janela e restaurar a sessão anterior (ou adicionar uma aba inicial)
+        if not (settings.get("general", "save_session") and self.restore_session()):
+            self.add_new_tab()
         self.show()
     
     def setup_shortcuts(self):
@@ -497,35 +737,72 @@ class SimpleBrowser(QMainWindow):
     
     def show_settings(self):
         """Mostra o diálogo de configurações"""
+        # As alterações chegam pelos avisos de settings.subscribe
         dialog = SettingsDialog(self)
-        if dialog.exec():
-            self.apply_settings()
+        dialog.exec()
+    
+    def subscribe_settings(self):
+        """Inscreve cada parte do navegador só nas configurações que ela usa"""
+        for section, key, callback in self.setting_handlers():
+            settings.subscribe(callback, section, key)
+    
+    def setting_handlers(self):
+        return [
+            ("appearance", "show_status_bar", self.apply_status_bar_setting),
+            ("appearance", "font_size", self.apply_font_size_setting),
+            ("appearance", "theme", self.apply_theme_setting),
+            ("privacy", "do_not_track", self.apply_do_not_track_setting),
+            ("privacy", "block_ads", self.apply_block_ads_setting),
+            ("advanced", "user_agent", self.apply_user_agent_setting),
+            ("tabs", None, self.apply_tabs_setting),
+            ("general", "save_session", self.apply_save_session_setting)
+        ]
     
     def apply_settings(self):
-        """Aplica as configurações atuais"""
-        # Atualizar aparência
-        show_status = settings.get("appearance", "show_status_bar")
-        self.statusBar().setVisible(show_status)
-        
-        # Atualizar fonte
-        font_size = settings.get("appearance", "font_size")
-        self.url_bar.setStyleSheet(f"font-size: {font_size}px; padding: 4px;")
+        """Aplica todas as configurações atuais de uma vez"""
+        for section, key, callback in self.setting_handlers():
+            value = settings.get(section, key) if key else None
+            callback(section, key, value, value)
         
         # Atualizar proxy se necessário
         if settings.get("advanced", "proxy_enabled"):
             # Implementar configuração de proxy
             pass
-        
-        # Aplicar tema
-        theme = settings.get("appearance", "theme")
+    
+    def apply_status_bar_setting(self, section, key, old, show_status):
+        self.statusBar().setVisible(show_status)
+    
+    def apply_font_size_setting(self, section, key, old, font_size):
+        self.url_bar.setStyleSheet(f"font-size: {font_size}px; padding: 4px;")
+    
+    def apply_theme_setting(self, section, key, old, theme):
         apply_theme(QApplication.instance(), theme)
-        
-        # Atualizar configurações de privacidade
-        self.privacy_interceptor.do_not_track = settings.get("privacy", "do_not_track")
-        self.privacy_interceptor.block_ads = settings.get("privacy", "block_ads")
-        ua = settings.get("advanced", "user_agent")
-        if ua:
-            QWebEngineProfile.defaultProfile().setHttpUserAgent(ua)
+    
+    def apply_do_not_track_setting(self, section, key, old, do_not_track):
+        self.privacy_interceptor.do_not_track = do_not_track
+    
+    def apply_block_ads_setting(self, section, key, old, block_ads):
+        self.privacy_interceptor.set_block_ads(block_ads)
+        self.style_injector.set_enabled(block_ads)
+    
+    def apply_user_agent_setting(self, section, key, old, ua):
+        # Vazio volta ao user agent padrão do WebEngine
+        QWebEngineProfile.defaultProfile().setHttpUserAgent(ua or "")
+    
+    def apply_save_session_setting(self, section, key, old, save_session):
+        if save_session:
+            self.session_changed()
+        else:
+            # Sem sessão salva: não deixa as abas antigas no disco
+            self.session_timer.stop()
+            self.session_store.clear()
+    
+    def apply_tabs_setting(self, section, key, old, value):
+        self.tab_lifecycle.configure(
+            max_live_tabs=settings.get("tabs", "max_live_tabs") or 12,
+            memory_budget_mb=settings.get("tabs", "memory_budget_mb") or 0,
+            freeze_after=settings.get("tabs", "freeze_after_s") or 0
+        )
     
     def closeEvent(self, event):
         """Limpa dados sensíveis ao fechar se a opção 'clear_on_exit' estiver ativada"""
@@ -533,44 +810,107 @@ class SimpleBrowser(QMainWindow):
             profile = QWebEngineProfile.defaultProfile()
             profile.clearHttpCache()
             profile.cookieStore().deleteAllCookies()
+        if settings.get("general", "save_session"):
+            # Snapshot final com todas as abas atualizadas (inclui a rolagem)
+            self.session_timer.stop()
+            for i in range(self.tabs.count()):
+                self.tabs.widget(i).session_entry = None
+            self.save_session()
+            self.session_store.flush()
+        self.history_manager.close()
+        self.bookmark_store.close()
+        for section, key, callback in self.setting_handlers():
+            settings.unsubscribe(callback, section, key)
+        settings.close()
+        if self.privacy_interceptor.recorder is not None:
+            recorder, self.privacy_interceptor.recorder = self.privacy_interceptor.recorder, None
+            recorder.close()
         event.accept()
     
-    def load_bookmarks(self):
-        """Carrega os favoritos do arquivo"""
-        if os.path.exists(BOOKMARKS_FILE):
-            try:
-                with open(BOOKMARKS_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Erro ao carregar favoritos: {e}")
-        return []
+    def session_changed(self, tab=None):
+        """Agenda um snapshot da sessão; `tab` marca a aba cuja entrada mudou"""
+        if tab is not None:
+            tab.session_entry = None
+        if settings.get("general", "save_session") and not self.session_timer.isActive():
+            self.session_timer.start(SESSION_DELAY_MS)
     
-    def save_bookmarks(self):
-        """Salva os favoritos no arquivo"""
+    def session_tab_entry(self, tab):
+        """Entrada da aba no snapshot, refeita só se a aba mudou desde o último"""
+        if tab.session_entry is None:
+            if self.tab_lifecycle.is_live(tab):
+                tab.save_state()
+            tab.session_entry = {
+                "url": tab.pending_url,
+                "title": tab.pending_title,
+                "history": encode_history(tab.pending_history),
+                "scroll": list(tab.pending_scroll) if tab.pending_scroll else None
+            }
+        return tab.session_entry
+    
+    def save_session(self):
+        """Monta o snapshot das abas (thread da interface) e o grava em segundo plano"""
+        if not settings.get("general", "save_session"):
+            return
+        entries = [self.session_tab_entry(self.tabs.widget(i)) for i in range(self.tabs.count())]
+        self.session_store.save(entries, self.tabs.currentIndex())
+    
+    def restore_session(self):
+        """Recria as abas da última sessão como espaços reservados.
+
+        Só a aba ativa cria a página; as demais carregam ao serem ativadas,
+        então restaurar muitas abas é quase instantâneo.
+        """
+        data = self.session_store.load()
+        if not data or not data["tabs"]:
+            return False
+        saved_current = data.get("current")
+        current = 0
+        # Sem currentChanged durante a criação: nenhuma aba é materializada antes da hora
+        self.tabs.blockSignals(True)
         try:
-            with open(BOOKMARKS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.bookmarks, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Erro ao salvar favoritos: {e}")
+            for position, entry in enumerate(data["tabs"]):
+                if not isinstance(entry, dict) or not entry.get("url"):
+                    continue
+                if isinstance(saved_current, int) and position <= saved_current:
+                    # O índice salvo conta as entradas ignoradas: ativa a aba criada para
+                    # ela (ou a última criada antes, se a própria entrada foi ignorada)
+                    current = self.tabs.count()
+                tab = self.add_new_tab(entry["url"], background=True, title=entry.get("title") or "")
+                tab.pending_history = decode_history(entry.get("history"))
+                scroll = entry.get("scroll")
+                tab.pending_scroll = tuple(scroll) if scroll else None
+        finally:
+            self.tabs.blockSignals(False)
+        if not self.tabs.count():
+            return False
+        if self.tabs.currentIndex() == current:
+            # Já era a atual, mas o aviso foi bloqueado: ativa aqui
+            self.tab_changed(current)
+        else:
+            self.tabs.setCurrentIndex(current)
+        return True
     
-    def update_bookmarks_menu(self):
-        """Atualiza o menu de favoritos"""
-        self.bookmarks_combo.clear()
-        self.bookmarks_combo.addItem("Selecione um favorito...")
-        
-        for bookmark in self.bookmarks:
-            self.bookmarks_combo.addItem(bookmark["title"])
+    def save_bookmarks(self):
+        """Grava os favoritos pendentes imediatamente"""
+        self.bookmark_store.flush()
     
-    def open_bookmark(self, index):
-        """Abre o favorito selecionado"""
-        if index > 0:  # Ignora o item "Selecione um favorito..."
-            bookmark = self.bookmarks[index - 1]
+    def update_bookmark_button(self, url=None):
+        """Estrela cheia quando a página atual já está nos favoritos"""
+        if url is None:
             browser = self.current_browser()
-            if browser:
-                browser.setUrl(QUrl(bookmark["url"]))
-            
-            # Reseta o combobox para o primeiro item
-            self.bookmarks_combo.setCurrentIndex(0)
+            url = browser.url().toString() if browser else ""
+        if url and self.bookmark_store.is_bookmarked(url):
+            self.bookmark_btn.setText("⭐")
+            self.bookmark_btn.setStatusTip("Página nos favoritos")
+        else:
+            self.bookmark_btn.setText("☆")
+            self.bookmark_btn.setStatusTip("Adicionar aos favoritos (Ctrl+D)")
+    
+    def open_bookmark(self, url):
+        """Abre um favorito na aba atual"""
+        browser = self.current_browser()
+        if browser:
+            browser.setUrl(QUrl(url))
     
     def add_bookmark(self):
         """Adiciona a página atual aos favoritos"""
@@ -582,55 +922,119 @@ class SimpleBrowser(QMainWindow):
         current_title = browser.page().title()
         
         # Verifica se já existe um favorito com essa URL
-        for bookmark in self.bookmarks:
-            if bookmark["url"] == current_url:
-                QMessageBox.information(self, "Favorito Existente", 
-                                      "Esta página já está nos seus favoritos.")
-                return
+        if self.bookmark_store.is_bookmarked(current_url):
+            QMessageBox.information(self, "Favorito Existente", 
+                                  "Esta página já está nos seus favoritos.")
+            return
         
         # Exibe diálogo para editar o favorito
-        dialog = BookmarkDialog(self, current_title, current_url)
+        dialog = BookmarkDialog(self, current_title, current_url, self.bookmark_store.folders())
         if dialog.exec():
             bookmark_data = dialog.get_data()
-            self.bookmarks.append(bookmark_data)
-            self.save_bookmarks()
-            self.update_bookmarks_menu()
+            if self.bookmark_store.add(bookmark_data["title"], bookmark_data["url"],
+                                       bookmark_data["folder"]) is None:
+                QMessageBox.information(self, "Favorito Existente", 
+                                      "Esta página já está nos seus favoritos.")
+                return
+            self.update_bookmark_button()
             self.status_bar.showMessage(f"Favorito '{bookmark_data['title']}' adicionado", 3000)
     
     def manage_bookmarks(self):
         """Gerencia os favoritos"""
-        # Aqui seria implementado um diálogo mais completo para gestão de favoritos
-        # Por enquanto, apenas mostra uma mensagem
-        QMessageBox.information(self, "Gerenciar Favoritos", 
-                              "Funcionalidade em desenvolvimento.\n\n" +
-                              f"Você tem {len(self.bookmarks)} favoritos salvos.")
+        dialog = BookmarksDialog(self, self.bookmark_store, self.open_bookmark)
+        dialog.exec()
+        self.update_bookmark_button()
     
-    def add_new_tab(self, url=None):
-        """Adiciona uma nova aba ao navegador"""
-        tab = BrowserTab(self)
+    def import_bookmarks(self):
+        """Importa favoritos de outro navegador em segundo plano"""
+        if self.bookmark_importer is not None:
+            return
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Importar Favoritos", os.path.expanduser("~"),
+            "Favoritos (*.html *.htm Bookmarks *.json places.sqlite *.sqlite);;Todos os arquivos (*)"
+        )
+        if not filename:
+            return
+        self.bookmark_importer = BookmarkImporter(self.bookmark_store, filename, parent=self)
+        progress = QProgressDialog("Importando favoritos...", "Cancelar", 0, 0, self)
+        progress.setWindowTitle("Importar Favoritos")
+        progress.setMinimumDuration(500)
+        progress.canceled.connect(self.bookmark_importer.cancel)
+        
+        def update_progress(done, total):
+            progress.setMaximum(total)
+            progress.setValue(done)
+        
+        def finished(added, duplicates, error):
+            progress.reset()
+            self.bookmark_importer.deleteLater()
+            self.bookmark_importer = None
+            self.update_bookmark_button()
+            message = f"{added} favoritos importados, {duplicates} já existiam"
+            if error:
+                QMessageBox.warning(self, "Importar Favoritos", f"{message}.\n\n{error}")
+            else:
+                self.status_bar.showMessage(message, 5000)
+        
+        self.bookmark_importer.progress.connect(update_progress)
+        self.bookmark_importer.finished.connect(finished)
+        self.bookmark_importer.start(QThreadPool.globalInstance())
+    
+    def add_new_tab(self, url=None, background=False, title=""):
+        """Adiciona uma nova aba ao navegador.
+
+        Abas em segundo plano ficam como espaço reservado (sem página) até
+        serem ativadas; abrir muitas de uma vez quase não custa memória.
+        """
+        tab = BrowserTab(self, url, title, lazy=background)
+        if not background:
+            self.connect_tab(tab)
         
-        if url:
-            tab.browser.setUrl(QUrl(url))
+        # Adiciona a aba ao widget de abas
+        index = self.tabs.addTab(tab, self.elide_tab_title(title))
+        if tab.pending_icon is not None:
+            self.tabs.setTabIcon(index, tab.pending_icon)
+        self.session_changed()
+        if background:
+            self.tabs.setTabToolTip(index, tab.pending_url)
+            self.tab_lifecycle.schedule_check()
+            return tab
+        self.tabs.setCurrentIndex(index)
         
-        # Conecta os sinais da aba
+        # Foca na barra de URL
+        self.url_bar.selectAll()
+        self.url_bar.setFocus()
+        return tab
+    
+    def connect_tab(self, tab):
+        """Conecta os sinais da página de uma aba"""
         tab.browser.urlChanged.connect(lambda qurl, browser=tab.browser: 
                                       self.update_url(qurl, browser))
         tab.browser.loadFinished.connect(lambda _, browser=tab.browser:
                                         self.update_title(browser))
         tab.browser.loadProgress.connect(self.loading_progress)
         
-        # Adiciona a aba ao widget de abas
-        index = self.tabs.addTab(tab, "Nova Aba")
-        self.tabs.setCurrentIndex(index)
-        
         # Adicionar entrada ao histórico quando a página carregar
         tab.browser.loadFinished.connect(
             lambda ok, browser=tab.browser: self.add_to_history(browser) if ok else None
         )
         
-        # Foca na barra de URL
-        self.url_bar.selectAll()
-        self.url_bar.setFocus()
+        # Nova URL ou título: a entrada da aba na sessão precisa ser refeita
+        tab.browser.urlChanged.connect(lambda _, tab=tab: self.session_changed(tab))
+        tab.browser.titleChanged.connect(lambda _, tab=tab: self.session_changed(tab))
+    
+    def open_in_tabs(self, urls):
+        """Abre várias URLs em abas de segundo plano"""
+        for url in urls:
+            self.add_new_tab(url, background=True)
+        self.status_bar.showMessage(f"{len(urls)} abas abertas", 3000)
+    
+    def set_page_style(self, name, css, enabled=True):
+        """Ativa/desativa um estilo em todas as páginas, abertas e futuras"""
+        # Abas ainda sem página recebem o estilo pelo perfil quando forem criadas
+        pages = [self.tabs.widget(i).browser.page() for i in range(self.tabs.count())
+                 if not self.tabs.widget(i).is_placeholder()]
+        self.style_injector.set_style(name, css, enabled, pages)
     
     def close_current_tab(self):
         """Fecha a aba atual"""
@@ -640,6 +1044,18 @@ class SimpleBrowser(QMainWindow):
         """Atualiza a interface quando a aba ativa muda"""
         if index >= 0:
             tab = self.tabs.widget(index)
+            # Primeira ativação de uma aba em segundo plano: cria a página agora
+            materialized = tab.materialize()
+            if materialized:
+                self.connect_tab(tab)
+            self.tab_lifecycle.activated(tab)
+            self.session_changed()
+            if materialized:
+                # A página ainda não carregou: mostra o que o espaço reservado guardava
+                self.url_bar.setText(tab.pending_url)
+                self.update_bookmark_button(tab.pending_url)
+                self.setWindowTitle(f"{self.elide_tab_title(tab.pending_title)} - Meu Navegador")
+                return
             qurl = tab.browser.url()
             self.update_url(qurl, tab.browser)
             self.update_title(tab.browser)
@@ -647,7 +1063,11 @@ class SimpleBrowser(QMainWindow):
     def close_tab(self, index):
         """Fecha uma aba"""
         if self.tabs.count() > 1:
+            tab = self.tabs.widget(index)
             self.tabs.removeTab(index)
+            # removeTab não destrói o widget: libera a página e o processo de renderização
+            tab.deleteLater()
+            self.session_changed()
         else:
             # Se é a última aba, não feche, apenas limpe
             self.tabs.widget(0).browser.setUrl(QUrl("https://www.google.com"))
@@ -656,23 +1076,24 @@ class SimpleBrowser(QMainWindow):
         """Atualiza a URL na barra de endereço"""
         if browser == self.tabs.currentWidget().browser:
             self.url_bar.setText(url.toString())
+            self.update_bookmark_button(url.toString())
     
     def update_title(self, browser=None):
         """Atualiza o título da aba com o título da página"""
         if browser:
             index = self.get_tab_index(browser)
             if index >= 0:
-                title = browser.page().title()
-                if len(title) > 20:
-                    title = title[:17] + "..."
-                
-                if not title:
-                    title = "Nova Aba"
-                    
+                title = self.elide_tab_title(browser.page().title())
                 self.tabs.setTabText(index, title)
                 if browser == self.tabs.currentWidget().browser:
                     self.setWindowTitle(f"{title} - Meu Navegador")
     
+    def elide_tab_title(self, title):
+        """Título curto para o rótulo da aba"""
+        if len(title) > 20:
+            title = title[:17] + "..."
+        return title or "Nova Aba"
+    
     def get_tab_index(self, browser):
         """Encontra o índice da aba que contém o navegador especificado"""
         for i in range(self.tabs.count()):
@@ -702,6 +1123,8 @@ class SimpleBrowser(QMainWindow):
         if not url.startswith(('http://', 'https://')):
             url = 'http://' + url
         
+        # Marca a próxima visita desta aba como digitada (typed_count do histórico)
+        browser.typed_navigation = True
         browser.setUrl(QUrl(url))
     
     def back_browser(self):
@@ -870,6 +1293,65 @@ class SimpleBrowser(QMainWindow):
         dialog = HistoryDialog(self, self.history_manager)
         dialog.exec()
     
+    def toggle_lite_mode(self, enabled):
+        """Liga/desliga o modo leve em todos os sites"""
+        lite_mode = self.privacy_interceptor.lite_mode
+        if lite_mode.enabled == enabled:
+            return
+        lite_mode.enabled = enabled
+        settings.set("lite_mode", "enabled", enabled)
+        self.status_bar.showMessage("Modo leve ativado" if enabled else "Modo leve desativado", 3000)
+        self.reload_browser()
+    
+    def set_lite_mode_site(self, enabled):
+        """Exceção do modo leve para o site da aba atual (None volta ao padrão)"""
+        browser = self.current_browser()
+        if not browser:
+            return
+        host = url_host(browser.url().toString())
+        if not host:
+            return
+        lite_mode = self.privacy_interceptor.lite_mode
+        site = site_of(host)
+        if enabled is None:
+            lite_mode.set_site(site, None)
+        else:
+            lite_mode.set_site(site, lite_mode.blocked_types if enabled else ())
+        settings.set("lite_mode", "sites", lite_mode.to_settings()["sites"])
+        self.reload_browser()
+    
+    def toggle_request_recording(self, enabled):
+        """Grava (ou para de gravar) as requisições para o benchmark do filtro"""
+        recorder = self.privacy_interceptor.recorder
+        self.privacy_interceptor.recorder = None
+        if recorder is not None:
+            recorder.close()
+            self.status_bar.showMessage(
+                f"{recorder.count} requisições gravadas em {recorder.path}", 5000)
+        if enabled:
+            try:
+                self.privacy_interceptor.recorder = RequestRecorder.in_directory(REQUEST_CORPUS_DIR)
+                self.status_bar.showMessage("Gravando requisições...", 3000)
+            except Exception as e:
+                print(f"Erro ao iniciar gravação de requisições: {e}")
+    
+    def show_blocking_stats(self):
+        """Exibe latência e contadores do bloqueio de anúncios"""
+        dialog = BlockingStatsDialog(self, self.privacy_interceptor.metrics)
+        dialog.exec()
+    
+    def update_blocked_label(self):
+        """Atualiza o contador de requisições bloqueadas na barra de status"""
+        metrics = self.privacy_interceptor.metrics
+        if not self.privacy_interceptor.block_ads and not self.privacy_interceptor.lite_mode.active:
+            self.blocked_label.setText("")
+            return
+        self.blocked_label.setText(f"Bloqueadas: {metrics.blocked}/{metrics.requests}")
+        self.blocked_label.setToolTip(
+            f"Latência do filtro: p50 ≤ {metrics.percentile(0.5)} µs, "
+            f"p99 ≤ {metrics.percentile(0.99)} µs"
+        )
+    
     def clear_history(self):
         """Limpa o histórico de navegação"""
         self.history_manager.clear_history()
@@ -880,8 +1362,11 @@ class SimpleBrowser(QMainWindow):
         url = browser.url().toString()
         title = browser.page().title() or url
         
+        typed = getattr(browser, "typed_navigation", False)
+        browser.typed_navigation = False
+        
         if url.startswith(("http://", "https://")):
-            self.history_manager.add_entry(url, title)
+            self.history_manager.add_entry(url, title, typed)
     
     def toggle_fullscreen(self):
         """Alterna entre modo de tela cheia e normal"""
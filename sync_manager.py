@@ -28,7 +28,7 @@ class SyncManager:
             
             # Dados para sincronizar
             data = {
-                'bookmarks': self.browser.bookmarks,
+                'bookmarks': self.browser.bookmark_store.to_list(),
                 'history': self.browser.history_manager.get_all(),
                 'settings': self.browser.settings.get_all(),
                 'timestamp': timestamp
@@ -128,8 +128,8 @@ class SyncManager:
                 with open(file, encoding='utf-8') as f:
                     data = json.load(f)
                     if 'bookmarks' in file.name:
-                        self.browser.bookmarks = data
-                        self.browser.save_bookmarks()
+                        self.browser.bookmark_store.replace(data)
+                        self.browser.update_bookmark_button()
                     elif 'history' in file.name:
                         self.browser.history_manager.restore(data)
                     elif 'settings' in file.name:
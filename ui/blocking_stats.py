@@ -0,0 +1,163 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+                             QTabWidget, QTableView, QHeaderView, QFileDialog)
+from PyQt6.QtCore import Qt, QTimer, QAbstractTableModel, QModelIndex
+import json
+
+# Intervalo de atualização do diálogo enquanto aberto (ms)
+REFRESH_INTERVAL = 1000
+
+class StatsTableModel(QAbstractTableModel):
+    """Tabela de contadores sem um item por célula.
+
+    `set_rows` compara com as linhas anteriores e avisa a view só das
+    linhas que mudaram (e das inseridas/removidas no fim), então uma
+    atualização por segundo não recria milhares de itens.
+    """
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.rows = []
+
+    def set_rows(self, rows):
+        rows = [tuple(row) for row in rows]
+        if len(rows) < len(self.rows):
+            self.beginRemoveRows(QModelIndex(), len(rows), len(self.rows) - 1)
+            del self.rows[len(rows):]
+            self.endRemoveRows()
+        changed = [row for row in range(len(self.rows)) if self.rows[row] != rows[row]]
+        for row in changed:
+            self.rows[row] = rows[row]
+        if changed:
+            self.dataChanged.emit(self.index(changed[0], 0),
+                                  self.index(changed[-1], len(self.headers) - 1))
+        if len(rows) > len(self.rows):
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(rows) - 1)
+            self.rows.extend(rows[len(self.rows):])
+            self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self.rows[index.row()][index.column()]
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return None
+
+
+class BlockingStatsDialog(QDialog):
+    """Diálogo com as métricas do interceptador de requisições"""
+
+    def __init__(self, parent=None, metrics=None):
+        super().__init__(parent)
+        self.metrics = metrics
+        self.setWindowTitle("Estatísticas de Bloqueio")
+        self.setMinimumSize(640, 480)
+        self.initUI()
+        self.refresh()
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(REFRESH_INTERVAL)
+
+    def initUI(self):
+        layout = QVBoxLayout()
+
+        # Resumo: totais e latência
+        self.summary_label = QLabel()
+        self.summary_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        layout.addWidget(self.summary_label)
+
+        # Só a tabela da aba visível é atualizada a cada segundo
+        self.tabs = QTabWidget()
+        self.domains_table = self._create_table(["Domínio", "Bloqueios"])
+        self.tabs.addTab(self.domains_table, "Mais Bloqueados")
+        self.sites_table = self._create_table(["Site", "Requisições", "Bloqueadas"])
+        self.tabs.addTab(self.sites_table, "Por Site")
+        self.types_table = self._create_table(["Tipo", "Requisições", "Bloqueadas"])
+        self.tabs.addTab(self.types_table, "Por Tipo")
+        self.latency_table = self._create_table(["Latência", "Requisições"])
+        self.tabs.addTab(self.latency_table, "Latência")
+        self.tabs.currentChanged.connect(lambda index: self.refresh())
+        layout.addWidget(self.tabs)
+
+        # Botões de ação
+        button_layout = QHBoxLayout()
+
+        export_button = QPushButton("Exportar JSON")
+        export_button.clicked.connect(self.export_stats)
+        button_layout.addWidget(export_button)
+
+        reset_button = QPushButton("Zerar")
+        reset_button.clicked.connect(self.reset_stats)
+        button_layout.addWidget(reset_button)
+
+        close_button = QPushButton("Fechar")
+        close_button.clicked.connect(self.reject)
+        button_layout.addWidget(close_button)
+
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+    def _create_table(self, headers):
+        table = QTableView()
+        table.setModel(StatsTableModel(headers, table))
+        table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        return table
+
+    def refresh(self):
+        """Atualiza o diálogo com uma cópia das métricas atuais"""
+        if self.metrics is None:
+            self.summary_label.setText("Bloqueio de anúncios desativado.")
+            return
+        stats = self.metrics.snapshot(top=100)
+        requests = stats["requests"]
+        percent = stats["blocked"] * 100 / requests if requests else 0
+        self.summary_label.setText(
+            f"Requisições: {requests} | Bloqueadas: {stats['blocked']} ({percent:.1f}%)\n"
+            f"Latência: média {stats['mean_us']} µs | p50 ≤ {stats['p50_us']} µs | "
+            f"p90 ≤ {stats['p90_us']} µs | p99 ≤ {stats['p99_us']} µs | "
+            f"máx. {stats['max_us']} µs"
+        )
+        table = self.tabs.currentWidget()
+        by_blocked = lambda item: (-item[1][1], -item[1][0])
+        if table is self.domains_table:
+            rows = stats["top_blocked"]
+        elif table is self.sites_table:
+            rows = [(site, seen, blocked)
+                    for site, (seen, blocked) in sorted(stats["by_site"].items(), key=by_blocked)]
+        elif table is self.types_table:
+            rows = [(name, seen, blocked)
+                    for name, (seen, blocked) in sorted(stats["by_type"].items(), key=by_blocked)]
+        else:
+            rows = list(stats["latency_histogram"].items())
+        table.model().set_rows(rows)
+
+    def reset_stats(self):
+        if self.metrics is not None:
+            self.metrics.reset()
+        self.refresh()
+
+    def export_stats(self):
+        """Salva as métricas em JSON para comparar conjuntos de regras"""
+        if self.metrics is None:
+            return
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Exportar Estatísticas", "bloqueio.json", "JSON (*.json)"
+        )
+        if not filename:
+            return
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(self.metrics.snapshot(top=1000), f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"Erro ao exportar estatísticas: {e}")
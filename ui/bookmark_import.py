@@ -0,0 +1,311 @@
+import os
+import json
+import shutil
+import sqlite3
+import tempfile
+import threading
+from collections import deque
+from html.parser import HTMLParser
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+# Favoritos enviados à thread da interface por vez
+CHUNK_SIZE = 500
+# Bytes lidos do HTML por vez
+READ_SIZE = 64 * 1024
+# Nomes das pastas raiz do Firefox (guid -> título)
+FIREFOX_ROOTS = {
+    "menu________": "Menu de favoritos",
+    "toolbar_____": "Barra de favoritos",
+    "unfiled_____": "Outros favoritos",
+    "mobile______": "Favoritos do celular"
+}
+# Nomes das pastas raiz do Chromium (chave em "roots" -> título)
+CHROMIUM_ROOTS = {
+    "bookmark_bar": "Barra de favoritos",
+    "other": "Outros favoritos",
+    "synced": "Favoritos do celular"
+}
+
+def detect_format(path):
+    """"html", "chromium" ou "firefox" pela extensão ou pelo início do arquivo"""
+    lower = path.lower()
+    if lower.endswith((".html", ".htm")):
+        return "html"
+    if lower.endswith((".sqlite", ".db")):
+        return "firefox"
+    with open(path, 'rb') as f:
+        head = f.read(512)
+    if head.startswith(b"SQLite format 3"):
+        return "firefox"
+    if b"NETSCAPE-Bookmark-file" in head or b"<!DOCTYPE" in head.upper():
+        return "html"
+    return "chromium"
+
+
+class NetscapeBookmarkParser(HTMLParser):
+    """Lê o formato de exportação Netscape (usado por todos os navegadores).
+
+    <DT><H3>pasta</H3> seguido de <DL> abre uma pasta; </DL> fecha;
+    <DT><A HREF="...">título</A> é um favorito. Os favoritos encontrados vão
+    para `pending` como (caminho das pastas, título, URL).
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.path = []
+        self.pending = []
+        self._folder_title = None
+        self._capture = None
+        self._text = []
+        self._href = None
+        # Cada <DL> registra se abriu uma pasta (H3 antes dele) ou não
+        self._lists = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            self._href = dict(attrs).get("href")
+            self._capture = "a"
+            self._text = []
+        elif tag == "h3":
+            self._capture = "h3"
+            self._text = []
+        elif tag == "dl":
+            opened = self._folder_title is not None
+            if opened:
+                self.path.append(self._folder_title)
+                self._folder_title = None
+            self._lists.append(opened)
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self._capture == "a":
+            self._capture = None
+            if self._href:
+                url = self._href.strip()
+                title = "".join(self._text).strip() or url
+                if not url.lower().startswith(("javascript:", "place:")):
+                    self.pending.append((tuple(self.path), title, url))
+            self._href = None
+        elif tag == "h3" and self._capture == "h3":
+            self._capture = None
+            self._folder_title = "".join(self._text).strip() or "Nova pasta"
+        elif tag == "dl":
+            if self._lists and self._lists.pop() and self.path:
+                self.path.pop()
+
+    def handle_data(self, data):
+        if self._capture:
+            self._text.append(data)
+
+def iter_netscape_html(path, progress=None):
+    """Favoritos de um HTML Netscape, lido em blocos de READ_SIZE"""
+    total = os.path.getsize(path)
+    parser = NetscapeBookmarkParser()
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        while True:
+            block = f.read(READ_SIZE)
+            if not block:
+                break
+            parser.feed(block)
+            if parser.pending:
+                yield from parser.pending
+                parser.pending = []
+            if progress:
+                # Posição em bytes do arquivo (com a leitura antecipada do buffer)
+                progress(min(f.buffer.tell(), total), total)
+    parser.close()
+    yield from parser.pending
+
+def iter_chromium_json(path, progress=None):
+    """Favoritos do arquivo Bookmarks do Chrome/Chromium/Edge"""
+    with open(path, 'r', encoding='utf-8') as f:
+        roots = json.load(f).get("roots", {})
+    pending = deque()
+    for key, node in roots.items():
+        if isinstance(node, dict):
+            title = CHROMIUM_ROOTS.get(key, node.get("name") or key)
+            pending.append(((title,), node.get("children", [])))
+    total = sum(len(children) for _, children in pending)
+    done = 0
+    # Percurso em largura e iterativo: mantém a ordem das pastas e não estoura a pilha
+    while pending:
+        folder_path, children = pending.popleft()
+        for node in children:
+            if node.get("type") == "folder":
+                subfolder = node.get("children", [])
+                total += len(subfolder)
+                pending.append((folder_path + (node.get("name") or "Nova pasta",), subfolder))
+            elif node.get("url"):
+                yield folder_path, node.get("name") or node["url"], node["url"]
+            done += 1
+            if progress and done % CHUNK_SIZE == 0:
+                progress(done, total)
+    if progress:
+        progress(total, total)
+
+def iter_firefox_places(path, progress=None):
+    """Favoritos de um places.sqlite do Firefox (copiado: o Firefox mantém o banco travado)"""
+    workdir = tempfile.mkdtemp(prefix="naveg-import-")
+    try:
+        copy = os.path.join(workdir, "places.sqlite")
+        shutil.copy2(path, copy)
+        if os.path.exists(path + "-wal"):
+            shutil.copy2(path + "-wal", copy + "-wal")
+        conn = sqlite3.connect(copy)
+        try:
+            folders = {}
+            for folder_id, parent, title, guid in conn.execute(
+                    "SELECT id, parent, title, guid FROM moz_bookmarks WHERE type = 2"):
+                if guid == "root________":
+                    continue
+                folders[folder_id] = (parent, FIREFOX_ROOTS.get(guid, title or "Nova pasta"))
+            paths = {}
+            def folder_path(folder_id):
+                if folder_id not in folders:
+                    return ()
+                if folder_id not in paths:
+                    parent, title = folders[folder_id]
+                    paths[folder_id] = folder_path(parent) + (title,)
+                return paths[folder_id]
+
+            total = conn.execute("SELECT COUNT(*) FROM moz_bookmarks WHERE type = 1").fetchone()[0]
+            cursor = conn.execute(
+                "SELECT b.parent, b.title, p.url FROM moz_bookmarks b "
+                "JOIN moz_places p ON p.id = b.fk WHERE b.type = 1 "
+                "ORDER BY b.parent, b.position")
+            done = 0
+            while True:
+                rows = cursor.fetchmany(CHUNK_SIZE)
+                if not rows:
+                    break
+                for parent, title, url in rows:
+                    if url and not url.startswith(("place:", "javascript:")):
+                        yield folder_path(parent), title or url, url
+                done += len(rows)
+                if progress:
+                    progress(done, total)
+        finally:
+            conn.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+READERS = {
+    "html": iter_netscape_html,
+    "chromium": iter_chromium_json,
+    "firefox": iter_firefox_places
+}
+
+
+class BookmarkImportSignals(QObject):
+    # lote de favoritos [(caminho das pastas, título, URL)]
+    chunk = pyqtSignal(list)
+    # processados, total (bytes, nós ou linhas, conforme o formato)
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal()
+    failed = pyqtSignal(str)
+
+
+class BookmarkImportTask(QRunnable):
+    """Lê o arquivo exportado em uma thread do QThreadPool.
+
+    Só a leitura acontece aqui: os favoritos seguem em lotes pelo sinal
+    `chunk` e são aplicados ao BookmarkStore na thread da interface por
+    BookmarkImporter. `cancelled` é um threading.Event.
+    """
+    def __init__(self, path, fmt, cancelled):
+        super().__init__()
+        self.path = path
+        self.fmt = fmt
+        self.cancelled = cancelled
+        self.signals = BookmarkImportSignals()
+
+    def run(self):
+        try:
+            chunk = []
+            for record in READERS[self.fmt](self.path, self.signals.progress.emit):
+                if self.cancelled.is_set():
+                    return
+                chunk.append(record)
+                if len(chunk) >= CHUNK_SIZE:
+                    self.signals.chunk.emit(chunk)
+                    chunk = []
+            if chunk:
+                self.signals.chunk.emit(chunk)
+            self.signals.finished.emit()
+        except Exception as e:
+            print(f"Erro ao importar favoritos: {e}")
+            self.signals.failed.emit(str(e))
+
+
+class BookmarkImporter(QObject):
+    """Aplica uma importação ao BookmarkStore sem travar a interface.
+
+    Os lotes chegam da BookmarkImportTask; duplicatas são descartadas pelo
+    índice de URLs do store e as pastas de origem são recriadas dentro de
+    uma pasta "Importados". O store fica em modo batch durante toda a
+    importação, então bookmarks.json é gravado uma única vez, no fim.
+    """
+    progress = pyqtSignal(int, int)
+    # adicionados, duplicados, mensagem de erro ("" se deu certo)
+    finished = pyqtSignal(int, int, str)
+
+    def __init__(self, store, path, fmt=None, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.path = path
+        self.fmt = fmt
+        self.added = 0
+        self.duplicates = 0
+        self.cancelled = threading.Event()
+        self._folders = {}
+        self._root = None
+        self._done = False
+
+    def start(self, pool):
+        try:
+            self.fmt = self.fmt or detect_format(self.path)
+        except Exception as e:
+            self.finished.emit(0, 0, str(e))
+            return
+        self.store.begin_batch()
+        self._root = self.store.add_folder(f"Importados ({os.path.basename(self.path)})").id
+        self._folders = {(): self._root}
+        task = BookmarkImportTask(self.path, self.fmt, self.cancelled)
+        task.signals.chunk.connect(self._apply_chunk)
+        task.signals.progress.connect(self.progress)
+        task.signals.finished.connect(self._task_finished)
+        task.signals.failed.connect(self._finish)
+        pool.start(task)
+
+    def cancel(self):
+        self.cancelled.set()
+        self._finish("Importação cancelada")
+
+    def _folder(self, path):
+        folder_id = self._folders.get(path)
+        if folder_id is None:
+            folder_id = self.store.add_folder(path[-1], self._folder(path[:-1])).id
+            self._folders[path] = folder_id
+        return folder_id
+
+    def _apply_chunk(self, chunk):
+        if self._done:
+            return
+        store = self.store
+        for path, title, url in chunk:
+            if store.is_bookmarked(url):
+                self.duplicates += 1
+                continue
+            store.add(title, url, self._folder(path))
+            self.added += 1
+
+    def _task_finished(self):
+        self._finish("")
+
+    def _finish(self, error):
+        if self._done:
+            return
+        self._done = True
+        if not self.added and self._root is not None and not self.store.child_count(self._root):
+            # Nada importado: não deixa a pasta vazia para trás
+            self.store.remove(self._root)
+        self.store.end_batch()
+        self.finished.emit(self.added, self.duplicates, error)
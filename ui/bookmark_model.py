@@ -0,0 +1,178 @@
+from PyQt6.QtCore import Qt, QAbstractItemModel, QModelIndex
+from ui.bookmark_store import ROOT_ID
+
+class BookmarkTreeModel(QAbstractItemModel):
+    """Modelo preguiçoso da árvore de favoritos.
+
+    Os filhos de uma pasta só entram no modelo quando a view a expande
+    (canFetchMore/fetchMore), em lotes de FETCH_BATCH. `_loaded` guarda,
+    por pasta, os ids já expostos à view e `_parents` a pasta de cada um
+    (o modelo não depende do estado do store no meio de uma alteração);
+    cada QModelIndex carrega o id do item, então nenhum objeto por nó é
+    criado. As alterações do BookmarkStore chegam como eventos e viram
+    inserções, remoções ou dataChanged só nos nós afetados (e só se a
+    pasta já foi carregada).
+    """
+    FETCH_BATCH = 500
+    HEADERS = ["Título", "URL"]
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self._loaded = {}
+        self._parents = {}
+        self._rows = {}
+        store.listeners.append(self._store_changed)
+
+    def detach(self):
+        """Para de acompanhar o BookmarkStore (ao fechar o diálogo)"""
+        if self._store_changed in self.store.listeners:
+            self.store.listeners.remove(self._store_changed)
+
+    # Mapeamento entre índices e ids
+
+    def item_id(self, index):
+        return index.internalId() if index.isValid() else ROOT_ID
+
+    def item(self, index):
+        return self.store.get(self.item_id(index))
+
+    def _row(self, folder_id, item_id):
+        rows = self._rows.get(folder_id)
+        if rows is None:
+            # Recalculado só depois de alguma alteração na pasta
+            rows = self._rows[folder_id] = {
+                child: row for row, child in enumerate(self._loaded.get(folder_id, ()))}
+        return rows.get(item_id, -1)
+
+    def index_of(self, item_id):
+        """QModelIndex de um item já carregado (inválido para a raiz ou itens não carregados)"""
+        folder_id = self._parents.get(item_id)
+        if folder_id is None:
+            return QModelIndex()
+        row = self._row(folder_id, item_id)
+        return self.createIndex(row, 0, item_id) if row >= 0 else QModelIndex()
+
+    # Interface do QAbstractItemModel
+
+    def index(self, row, column, parent=QModelIndex()):
+        children = self._loaded.get(self.item_id(parent))
+        if children is None or not 0 <= row < len(children) or not 0 <= column < len(self.HEADERS):
+            return QModelIndex()
+        return self.createIndex(row, column, children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        folder_id = self._parents.get(index.internalId(), ROOT_ID)
+        if folder_id == ROOT_ID:
+            return QModelIndex()
+        return self.index_of(folder_id)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self._loaded.get(self.item_id(parent), ()))
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        # Mostra a seta de expansão sem carregar os filhos
+        item_id = self.item_id(parent)
+        if item_id == ROOT_ID:
+            return True
+        item = self.store.get(item_id)
+        return item is not None and item.is_folder and self.store.child_count(item_id) > 0
+
+    def canFetchMore(self, parent=QModelIndex()):
+        item_id = self.item_id(parent)
+        return len(self._loaded.get(item_id, ())) < self.store.child_count(item_id)
+
+    def fetchMore(self, parent=QModelIndex()):
+        item_id = self.item_id(parent)
+        loaded = self._loaded.setdefault(item_id, [])
+        pending = self.store.child_ids(item_id)[len(loaded):len(loaded) + self.FETCH_BATCH]
+        if not pending:
+            return
+        self.beginInsertRows(parent, len(loaded), len(loaded) + len(pending) - 1)
+        loaded.extend(pending)
+        self._parents.update((child, item_id) for child in pending)
+        self._rows.pop(item_id, None)
+        self.endInsertRows()
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        item = self.item(index) if index.isValid() else None
+        if item is None:
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            if index.column() == 0:
+                return f"📁 {item.title}" if item.is_folder else item.title
+            return item.url
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return item.url or item.title
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    # Eventos do BookmarkStore
+
+    def _folder_index(self, folder_id):
+        """Índice da pasta, ou None se ela ainda não está exposta à view"""
+        if folder_id == ROOT_ID:
+            return QModelIndex()
+        index = self.index_of(folder_id)
+        return index if index.isValid() else None
+
+    def _store_changed(self, event, *args):
+        if event == "reset":
+            self.beginResetModel()
+            self._loaded.clear()
+            self._parents.clear()
+            self._rows.clear()
+            self.endResetModel()
+        elif event == "inserted":
+            folder_id, position, item = args
+            loaded = self._loaded.get(folder_id)
+            parent = self._folder_index(folder_id)
+            if loaded is None or parent is None or position > len(loaded):
+                # Pasta não carregada (ou só em parte): o item aparece no próximo fetchMore
+                return
+            self.beginInsertRows(parent, position, position)
+            loaded.insert(position, item.id)
+            self._parents[item.id] = folder_id
+            self._rows.pop(folder_id, None)
+            self.endInsertRows()
+        elif event == "removed":
+            folder_id, row, item = args
+            loaded = self._loaded.get(folder_id)
+            parent = self._folder_index(folder_id)
+            if loaded is not None and parent is not None and row < len(loaded):
+                self.beginRemoveRows(parent, row, row)
+                del loaded[row]
+                self._rows.pop(folder_id, None)
+                self.endRemoveRows()
+            self._parents.pop(item.id, None)
+            if item.is_folder:
+                self._forget(item.id)
+        elif event == "changed":
+            item = args[0]
+            index = self.index_of(item.id)
+            if index.isValid():
+                self.dataChanged.emit(index, index.siblingAtColumn(len(self.HEADERS) - 1))
+
+    def _forget(self, folder_id):
+        """Descarta o que foi carregado de uma pasta removida (e das subpastas)"""
+        for child in self._loaded.pop(folder_id, ()):
+            self._parents.pop(child, None)
+            if child in self._loaded:
+                self._forget(child)
+        self._rows.pop(folder_id, None)
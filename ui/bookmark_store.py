@@ -0,0 +1,400 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit, urlunsplit
+
+# Espera após uma alteração antes de gravar (agrupa alterações seguidas)
+SAVE_DELAY = 1.0
+DEFAULT_PORTS = {"http": 80, "https": 443, "ftp": 21}
+# Pasta raiz implícita (não é gravada no arquivo)
+ROOT_ID = 0
+ROOT_TITLE = "Favoritos"
+
+def normalize_url(url):
+    """Chave de comparação de URLs: esquema e host em minúsculas, sem porta
+    padrão, sem fragmento e sem a barra final de um caminho vazio"""
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.scheme or not parts.netloc:
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    if ":" in host:
+        host = f"[{host}]"
+    if port is not None and DEFAULT_PORTS.get(scheme) != port:
+        host = f"{host}:{port}"
+    if parts.username:
+        credentials = parts.username + (f":{parts.password}" if parts.password else "")
+        host = f"{credentials}@{host}"
+    path = parts.path if parts.path != "/" else ""
+    return urlunsplit((scheme, host, path, parts.query, ""))
+
+
+class Bookmark:
+    """Favorito com identificador estável (não muda ao mover ou editar)"""
+    __slots__ = ("id", "title", "url", "parent", "added")
+    is_folder = False
+
+    def __init__(self, bookmark_id, title, url, parent=ROOT_ID, added=None):
+        self.id = bookmark_id
+        self.title = title
+        self.url = url
+        self.parent = parent
+        self.added = added if added is not None else int(time.time())
+
+    def to_dict(self):
+        return {"id": self.id, "title": self.title, "url": self.url,
+                "parent": self.parent, "added": self.added}
+
+
+class BookmarkFolder:
+    """Pasta de favoritos; os filhos ficam no índice `children` do BookmarkStore"""
+    __slots__ = ("id", "title", "parent", "added")
+    is_folder = True
+    url = ""
+
+    def __init__(self, folder_id, title, parent=ROOT_ID, added=None):
+        self.id = folder_id
+        self.title = title
+        self.parent = parent
+        self.added = added if added is not None else int(time.time())
+
+    def to_dict(self):
+        return {"id": self.id, "type": "folder", "title": self.title,
+                "parent": self.parent, "added": self.added}
+
+
+class BookmarkStore:
+    """Favoritos em pastas, persistidos em bookmarks.json com índice por URL.
+
+    `items` (id -> Bookmark ou BookmarkFolder) compartilha um único espaço
+    de ids estáveis; `children` (id da pasta -> lista ordenada de ids) guarda
+    a árvore, com a raiz implícita ROOT_ID. `_by_url` (URL normalizada ->
+    Bookmark) responde em tempo constante se uma página já é favorita, o que
+    a estrela da barra consulta a cada navegação. Duplicatas antigas (de
+    arquivos anteriores ao índice) ficam em `_duplicates` e assumem a chave
+    quando o favorito indexado é removido, sem varrer `items`.
+
+    Cada alteração avisa os `listeners` com o que mudou (inserção, remoção
+    ou edição de um nó, com a pasta e a posição), para que modelos e menus
+    atualizem só os nós afetados. Alterações marcam o arquivo como sujo e
+    agendam uma gravação atômica após SAVE_DELAY; `batch()` agrupa várias
+    alterações numa única gravação.
+
+    A gravação roda num threading.Timer: as alterações e a cópia da árvore
+    feita por `flush` passam por `_lock`; só a escrita do arquivo fica fora
+    dela (serializada por `_write_lock`).
+    """
+    def __init__(self, bookmarks_file):
+        self.bookmarks_file = bookmarks_file
+        self.items = {}
+        self.children = {ROOT_ID: []}
+        self.listeners = []
+        self._by_url = {}
+        # URL normalizada -> favoritos repetidos além do indexado em _by_url
+        self._duplicates = {}
+        self._next_id = 1
+        # Reentrante: as alterações chamam _schedule_save com a trava já tomada
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self._batch_depth = 0
+        self._save_timer = None
+        self.load()
+
+    def load(self):
+        """Carrega os favoritos do arquivo (lista de dicionários em ordem de árvore)"""
+        if not os.path.exists(self.bookmarks_file):
+            return
+        try:
+            with open(self.bookmarks_file, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+        except Exception as e:
+            print(f"Erro ao carregar favoritos: {e}")
+            return
+        self._load_records(records)
+        if any("id" not in record for record in records):
+            # Arquivo antigo, sem ids: grava os ids atribuídos agora
+            self._schedule_save()
+
+    def _load_records(self, records):
+        self.items.clear()
+        self.children = {ROOT_ID: []}
+        self._by_url.clear()
+        self._duplicates.clear()
+        self._next_id = max((r.get("id", 0) for r in records if isinstance(r.get("id"), int)),
+                            default=0) + 1
+        parents = []
+        for record in records:
+            item_id = record.get("id")
+            if not isinstance(item_id, int) or item_id <= ROOT_ID or item_id in self.items:
+                item_id = self._next_id
+                self._next_id += 1
+            if record.get("type") == "folder":
+                item = BookmarkFolder(item_id, record.get("title") or "Nova pasta",
+                                      added=record.get("added"))
+                self.children[item_id] = []
+            elif record.get("url"):
+                item = Bookmark(item_id, record.get("title") or record["url"], record["url"],
+                                added=record.get("added"))
+                key = normalize_url(item.url)
+                if key in self._by_url:
+                    self._duplicates.setdefault(key, []).append(item)
+                else:
+                    self._by_url[key] = item
+            else:
+                continue
+            self.items[item_id] = item
+            parents.append((item, record.get("parent", ROOT_ID)))
+        # Pais resolvidos depois: uma pasta pode aparecer após os filhos
+        for item, parent in parents:
+            item.parent = parent
+        for item, parent in parents:
+            if parent not in self.children or self._is_descendant(parent, item.id):
+                item.parent = parent = ROOT_ID
+            self.children[parent].append(item.id)
+
+    def __len__(self):
+        """Quantidade de favoritos (sem contar as pastas)"""
+        return len(self.items) - (len(self.children) - 1)
+
+    def __iter__(self):
+        """Favoritos em ordem de árvore"""
+        return (item for item in self.walk() if not item.is_folder)
+
+    def walk(self, folder_id=ROOT_ID):
+        """Pastas e favoritos abaixo de `folder_id`, em profundidade"""
+        for item_id in list(self.children.get(folder_id, ())):
+            item = self.items[item_id]
+            yield item
+            if item.is_folder:
+                yield from self.walk(item_id)
+
+    def get(self, item_id):
+        return self.items.get(item_id)
+
+    def child_ids(self, folder_id=ROOT_ID):
+        return self.children.get(folder_id, [])
+
+    def child_count(self, folder_id=ROOT_ID):
+        return len(self.children.get(folder_id, ()))
+
+    def folders(self):
+        """[(id, caminho)] de todas as pastas, raiz incluída"""
+        result = [(ROOT_ID, ROOT_TITLE)]
+        def visit(folder_id, path):
+            for item_id in self.children[folder_id]:
+                item = self.items[item_id]
+                if item.is_folder:
+                    item_path = f"{path}/{item.title}"
+                    result.append((item_id, item_path))
+                    visit(item_id, item_path)
+        visit(ROOT_ID, ROOT_TITLE)
+        return result
+
+    def find(self, url):
+        """Favorito com a mesma URL normalizada, ou None"""
+        return self._by_url.get(normalize_url(url))
+
+    def is_bookmarked(self, url):
+        return normalize_url(url) in self._by_url
+
+    def _is_descendant(self, item_id, ancestor_id):
+        """`item_id` é `ancestor_id` ou está dentro dele?"""
+        seen = set()
+        while item_id != ROOT_ID and item_id not in seen:
+            if item_id == ancestor_id:
+                return True
+            seen.add(item_id)
+            item = self.items.get(item_id)
+            if item is None:
+                return False
+            item_id = item.parent
+        return False
+
+    # Alterações
+
+    def _notify(self, event, *args):
+        for listener in list(self.listeners):
+            try:
+                listener(event, *args)
+            except Exception as e:
+                print(f"Erro ao notificar alteração nos favoritos: {e}")
+
+    def _insert(self, item, parent, position):
+        siblings = self.children[parent]
+        if position is None or not 0 <= position <= len(siblings):
+            position = len(siblings)
+        item.parent = parent
+        siblings.insert(position, item.id)
+        self.items[item.id] = item
+        self._notify("inserted", parent, position, item)
+        self._schedule_save()
+        return item
+
+    def add(self, title, url, parent=ROOT_ID, position=None):
+        """Adiciona um favorito; retorna None se a URL já estiver nos favoritos"""
+        with self._lock:
+            key = normalize_url(url)
+            if key in self._by_url or parent not in self.children:
+                return None
+            bookmark = Bookmark(self._next_id, title or url, url)
+            self._next_id += 1
+            self._by_url[key] = bookmark
+            return self._insert(bookmark, parent, position)
+
+    def add_folder(self, title, parent=ROOT_ID, position=None):
+        with self._lock:
+            if parent not in self.children:
+                return None
+            folder = BookmarkFolder(self._next_id, title or "Nova pasta")
+            self._next_id += 1
+            self.children[folder.id] = []
+            return self._insert(folder, parent, position)
+
+    def update(self, item_id, title=None, url=None):
+        """Edita título e/ou URL; retorna False se a nova URL já for outro favorito"""
+        with self._lock:
+            item = self.items.get(item_id)
+            if item is None:
+                return False
+            if url is not None and not item.is_folder and url != item.url:
+                key = normalize_url(url)
+                other = self._by_url.get(key)
+                if other is not None and other is not item:
+                    return False
+                self._unindex(item)
+                item.url = url
+                self._by_url[key] = item
+            if title is not None:
+                item.title = title
+            self._notify("changed", item)
+            self._schedule_save()
+            return True
+
+    def move(self, item_id, parent, position=None):
+        """Move um item para outra pasta (ou posição); False se formaria um ciclo"""
+        with self._lock:
+            item = self.items.get(item_id)
+            if item is None or parent not in self.children or self._is_descendant(parent, item_id):
+                return False
+            siblings = self.children[item.parent]
+            row = siblings.index(item_id)
+            if item.parent == parent and position is not None and position > row:
+                # A remoção abaixo desloca a posição de destino
+                position -= 1
+            del siblings[row]
+            self._notify("removed", item.parent, row, item)
+            self._insert(item, parent, position)
+            return True
+
+    def remove(self, item_id):
+        """Remove um favorito ou uma pasta com todo o conteúdo"""
+        with self._lock:
+            item = self.items.get(item_id)
+            if item is None:
+                return False
+            removed = [item] + (list(self.walk(item_id)) if item.is_folder else [])
+            siblings = self.children[item.parent]
+            row = siblings.index(item_id)
+            del siblings[row]
+            for entry in removed:
+                del self.items[entry.id]
+                if entry.is_folder:
+                    self.children.pop(entry.id, None)
+                else:
+                    self._unindex(entry)
+            self._notify("removed", item.parent, row, item)
+            self._schedule_save()
+            return True
+
+    def _unindex(self, bookmark):
+        key = normalize_url(bookmark.url)
+        others = self._duplicates.get(key)
+        if self._by_url.get(key) is bookmark:
+            del self._by_url[key]
+            if others:
+                # Duplicata antiga assume a chave
+                self._by_url[key] = others.pop(0)
+        elif others and bookmark in others:
+            others.remove(bookmark)
+        if others is not None and not others:
+            del self._duplicates[key]
+
+    def replace(self, records):
+        """Substitui todos os favoritos (restauração de backup/sincronização)"""
+        with self._lock:
+            self._load_records(records)
+            self._notify("reset")
+            self._schedule_save()
+
+    def to_list(self):
+        """Pastas e favoritos em ordem de árvore (pais antes dos filhos)"""
+        with self._lock:
+            return [item.to_dict() for item in self.walk()]
+
+    # Gravação
+
+    @contextmanager
+    def batch(self):
+        """Agrupa alterações: grava uma única vez ao final"""
+        self.begin_batch()
+        try:
+            yield self
+        finally:
+            self.end_batch()
+
+    def begin_batch(self):
+        """Suspende as gravações até o end_batch correspondente (importações longas)"""
+        self._batch_depth += 1
+
+    def end_batch(self):
+        self._batch_depth -= 1
+        if self._batch_depth == 0 and self._dirty:
+            self._schedule_save()
+
+    def _schedule_save(self):
+        with self._lock:
+            # Marcado sob a trava: uma gravação em andamento não apaga a marca
+            self._dirty = True
+            if self._batch_depth:
+                return
+            self._start_timer()
+
+    def _start_timer(self):
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+        self._save_timer = threading.Timer(SAVE_DELAY, self.flush)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+
+    def flush(self):
+        """Grava agora, se houver alterações pendentes"""
+        with self._write_lock:
+            with self._lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                if not self._dirty:
+                    return
+                # Cópia tirada sob a trava: nenhuma alteração fica pela metade
+                records = self.to_list()
+                self._dirty = False
+            try:
+                tmp_file = self.bookmarks_file + ".tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(records, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_file, self.bookmarks_file)
+            except Exception as e:
+                with self._lock:
+                    self._dirty = True
+                print(f"Erro ao salvar favoritos: {e}")
+
+    def close(self):
+        self.flush()
@@ -0,0 +1,235 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QTreeView,
+                             QHeaderView, QInputDialog, QMessageBox, QMenu, QLabel)
+from PyQt6.QtCore import Qt
+from ui.bookmark_model import BookmarkTreeModel
+from ui.bookmark_store import ROOT_ID
+
+# Itens por pasta no menu da barra de favoritos (o restante fica no gerenciador)
+MENU_LIMIT = 100
+
+class BookmarksDialog(QDialog):
+    """Gerenciador de favoritos em árvore de pastas"""
+
+    def __init__(self, parent=None, store=None, open_url=None):
+        super().__init__(parent)
+        self.store = store
+        self.open_url = open_url
+        self.setWindowTitle("Gerenciar Favoritos")
+        self.setMinimumSize(700, 500)
+        self.initUI()
+
+    def initUI(self):
+        layout = QVBoxLayout()
+
+        self.count_label = QLabel()
+        layout.addWidget(self.count_label)
+
+        self.model = BookmarkTreeModel(self.store, self)
+        self.tree = QTreeView()
+        self.tree.setModel(self.model)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setSelectionMode(QTreeView.SelectionMode.SingleSelection)
+        self.tree.header().setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)
+        self.tree.header().setStretchLastSection(True)
+        self.tree.setColumnWidth(0, 280)
+        self.tree.doubleClicked.connect(self.open_selected)
+        self.tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.tree.customContextMenuRequested.connect(self.show_context_menu)
+        layout.addWidget(self.tree)
+
+        # Botões de ação
+        button_layout = QHBoxLayout()
+
+        open_button = QPushButton("Abrir")
+        open_button.clicked.connect(self.open_selected)
+        button_layout.addWidget(open_button)
+
+        folder_button = QPushButton("Nova Pasta")
+        folder_button.clicked.connect(self.new_folder)
+        button_layout.addWidget(folder_button)
+
+        edit_button = QPushButton("Editar")
+        edit_button.clicked.connect(self.edit_selected)
+        button_layout.addWidget(edit_button)
+
+        move_button = QPushButton("Mover")
+        move_button.clicked.connect(self.move_selected)
+        button_layout.addWidget(move_button)
+
+        delete_button = QPushButton("Excluir")
+        delete_button.clicked.connect(self.delete_selected)
+        button_layout.addWidget(delete_button)
+
+        close_button = QPushButton("Fechar")
+        close_button.clicked.connect(self.reject)
+        button_layout.addWidget(close_button)
+
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+        self.update_count()
+        self.store.listeners.append(self._store_changed)
+
+    def done(self, result):
+        # O store sobrevive ao diálogo: não deve continuar chamando o modelo
+        self.model.detach()
+        if self._store_changed in self.store.listeners:
+            self.store.listeners.remove(self._store_changed)
+        super().done(result)
+
+    def _store_changed(self, event, *args):
+        if event != "changed":
+            self.update_count()
+
+    def update_count(self):
+        self.count_label.setText(f"{len(self.store)} favoritos")
+
+    def selected_item(self):
+        indexes = self.tree.selectionModel().selectedRows()
+        return self.model.item(indexes[0]) if indexes else None
+
+    def target_folder(self):
+        """Pasta selecionada (ou a pasta do favorito selecionado) para inserir itens"""
+        item = self.selected_item()
+        if item is None:
+            return ROOT_ID
+        return item.id if item.is_folder else item.parent
+
+    def open_selected(self, index=None):
+        item = self.selected_item()
+        if item is None or item.is_folder:
+            return
+        if self.open_url:
+            self.open_url(item.url)
+
+    def new_folder(self):
+        title, ok = QInputDialog.getText(self, "Nova Pasta", "Nome da pasta:")
+        if ok and title.strip():
+            folder = self.store.add_folder(title.strip(), self.target_folder())
+            parent = self.model.index_of(folder.parent) if folder.parent != ROOT_ID else None
+            if parent is not None:
+                self.tree.expand(parent)
+
+    def edit_selected(self):
+        item = self.selected_item()
+        if item is None:
+            return
+        title, ok = QInputDialog.getText(self, "Editar", "Título:", text=item.title)
+        if not ok:
+            return
+        url = None
+        if not item.is_folder:
+            url, ok = QInputDialog.getText(self, "Editar", "URL:", text=item.url)
+            if not ok:
+                return
+        if not self.store.update(item.id, title.strip() or item.title, url):
+            QMessageBox.information(self, "Favorito Existente",
+                                    "Esta URL já está nos seus favoritos.")
+
+    def move_selected(self):
+        item = self.selected_item()
+        if item is None:
+            return
+        # Pastas de destino possíveis: nenhuma dentro do próprio item
+        folders = [(folder_id, path) for folder_id, path in self.store.folders()
+                   if folder_id == ROOT_ID or not self.store._is_descendant(folder_id, item.id)]
+        paths = [path for _, path in folders]
+        path, ok = QInputDialog.getItem(self, "Mover", "Mover para:", paths, 0, False)
+        if ok:
+            self.store.move(item.id, folders[paths.index(path)][0])
+
+    def delete_selected(self):
+        item = self.selected_item()
+        if item is None:
+            return
+        if item.is_folder and self.store.child_count(item.id):
+            reply = QMessageBox.question(
+                self, "Excluir Pasta",
+                f"Excluir a pasta '{item.title}' e todo o seu conteúdo?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            if reply != QMessageBox.StandardButton.Yes:
+                return
+        self.store.remove(item.id)
+
+    def show_context_menu(self, position):
+        if self.selected_item() is None:
+            return
+        menu = QMenu(self)
+        menu.addAction("Abrir").triggered.connect(self.open_selected)
+        menu.addAction("Editar").triggered.connect(self.edit_selected)
+        menu.addAction("Mover").triggered.connect(self.move_selected)
+        menu.addSeparator()
+        menu.addAction("Excluir").triggered.connect(self.delete_selected)
+        menu.exec(self.tree.viewport().mapToGlobal(position))
+
+
+class BookmarkMenu(QMenu):
+    """Menu de uma pasta de favoritos, montado só quando é aberto.
+
+    As subpastas viram submenus que também só se montam ao abrir. O menu
+    raiz acompanha o BookmarkStore e marca para remontar apenas os menus
+    das pastas alteradas.
+    """
+    def __init__(self, store, folder_id=ROOT_ID, open_url=None, show_all=None,
+                 title="Favoritos", parent=None, registry=None, open_in_tabs=None):
+        super().__init__(title, parent)
+        self.store = store
+        self.folder_id = folder_id
+        self.open_url = open_url
+        self.show_all = show_all
+        self.open_in_tabs = open_in_tabs
+        self.dirty = True
+        # pasta -> menu, compartilhado entre o menu raiz e os submenus
+        self.registry = registry if registry is not None else {}
+        self.registry[folder_id] = self
+        if registry is None:
+            store.listeners.append(self._store_changed)
+        self.aboutToShow.connect(self.populate)
+
+    def _store_changed(self, event, *args):
+        if event == "reset":
+            folders = list(self.registry)
+        elif event == "changed":
+            folders = [args[0].parent]
+        else:
+            folders = [args[0]]
+        for folder_id in folders:
+            menu = self.registry.get(folder_id)
+            if menu is not None:
+                menu.dirty = True
+
+    def populate(self):
+        if not self.dirty:
+            return
+        self.dirty = False
+        for action in self.actions():
+            submenu = action.menu()
+            if submenu is not None:
+                self.registry.pop(submenu.folder_id, None)
+                submenu.deleteLater()
+        self.clear()
+        child_ids = self.store.child_ids(self.folder_id)
+        for item_id in child_ids[:MENU_LIMIT]:
+            item = self.store.get(item_id)
+            if item.is_folder:
+                self.addMenu(BookmarkMenu(self.store, item.id, self.open_url, self.show_all,
+                                          f"📁 {item.title}", self, self.registry,
+                                          self.open_in_tabs))
+            else:
+                action = self.addAction(item.title)
+                action.setToolTip(item.url)
+                action.triggered.connect(lambda checked=False, url=item.url: self.open_url(url))
+        if len(child_ids) > MENU_LIMIT and self.show_all:
+            self.addSeparator()
+            self.addAction(f"Mostrar todos ({len(child_ids)})...").triggered.connect(self.show_all)
+        if not child_ids:
+            self.addAction("(vazio)").setEnabled(False)
+        elif self.open_in_tabs:
+            self.addSeparator()
+            self.addAction("Abrir todos em abas").triggered.connect(self.open_all)
+    
+    def open_all(self):
+        """Abre os favoritos da pasta (sem subpastas) em abas de segundo plano"""
+        items = [self.store.get(item_id) for item_id in self.store.child_ids(self.folder_id)]
+        urls = [item.url for item in items if not item.is_folder]
+        if urls:
+            self.open_in_tabs(urls)
@@ -0,0 +1,481 @@
+import os
+import gzip
+import json
+import lzma
+import threading
+from collections import OrderedDict
+from ui.history_store import HistoryURL, HistoryEntry, VisitColumns
+
+# Quantidade de segmentos mantidos descompactados em memória
+ARCHIVE_CACHE_SEGMENTS = 4
+# Compressores disponíveis: extensão do arquivo e função de abertura
+COMPRESSORS = {
+    "gzip": (".json.gz", gzip.open),
+    "lzma": (".json.xz", lzma.open)
+}
+
+class HistorySegment:
+    """Metadados de um segmento imutável de visitas arquivadas"""
+    def __init__(self, name, first_ts, last_ts, count):
+        self.name = name
+        self.first_ts = first_ts
+        self.last_ts = last_ts
+        self.count = count
+
+    def overlaps(self, since, until):
+        return ((since is None or self.last_ts >= since) and
+                (until is None or self.first_ts < until))
+
+    def to_dict(self):
+        return {"name": self.name, "first_ts": self.first_ts,
+                "last_ts": self.last_ts, "count": self.count}
+
+
+class HistoryArchive:
+    """Segmentos comprimidos com as visitas antigas do histórico.
+
+    Cada segmento guarda um bloco de visitas em colunas (VisitColumns) em
+    ordem de tempo e a tabela das URLs que elas referenciam, de modo que
+    pode ser lido sozinho. Os segmentos só são carregados quando uma
+    consulta precisa deles e ficam num pequeno cache LRU. Segmentos novos
+    ficam pendentes em memória até `write_pending()` gravá-los.
+
+    O catálogo (urls.json.gz) guarda os registros das URLs cujas visitas
+    estão todas arquivadas e `url_segments` (id da URL -> segmentos com
+    visitas dela), para que remoções leiam só os segmentos afetados. As
+    remoções regravam os segmentos numa thread própria, uma de cada vez;
+    até terminarem, os períodos removidos ficam ocultos nas consultas.
+    """
+    def __init__(self, directory, compression="gzip"):
+        self.directory = directory
+        self.index_file = os.path.join(directory, "index.json")
+        self.extension, self._open = COMPRESSORS[compression]
+        self.catalog_file = os.path.join(directory, "urls" + self.extension)
+        self._lock = threading.RLock()
+        self._cache = OrderedDict()
+        self._pending = {}
+        # Segmentos já gravados sendo regravados (conteúdo novo ainda não está no disco)
+        self._rewrites = {}
+        self.segments = []
+        self.url_segments = {}
+        self._catalog_dirty = False
+        self._next_seq = 1
+        # Regravações agendadas e os períodos e URLs removidos que elas ainda não aplicaram
+        self._jobs = []
+        self._worker = None
+        self._removed_ranges = []
+        self._removed_url_ids = set()
+        self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_file):
+            return
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.segments = [HistorySegment(**meta) for meta in data.get("segments", [])]
+            self._next_seq = data.get("next_seq", len(self.segments) + 1)
+        except Exception as e:
+            print(f"Erro ao carregar índice do arquivo de histórico: {e}")
+
+    def _save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_file = self.index_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({"version": 1, "next_seq": self._next_seq,
+                       "segments": [s.to_dict() for s in self.segments
+                                    if s.name not in self._pending]}, f)
+        os.replace(tmp_file, self.index_file)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def names(self):
+        with self._lock:
+            return [segment.name for segment in self.segments]
+
+    def discard_uncommitted(self, committed):
+        """Apaga segmentos gravados que o snapshot não chegou a confirmar"""
+        committed = set(committed)
+        with self._lock:
+            orphans = [s for s in self.segments if s.name not in committed]
+            if not orphans:
+                return
+            for segment in orphans:
+                try:
+                    os.remove(self._path(segment.name))
+                except OSError:
+                    pass
+            self.segments = [s for s in self.segments if s.name in committed]
+            self._save_index()
+
+    @property
+    def dirty(self):
+        """O catálogo precisa ser regravado no próximo write_pending"""
+        return self._catalog_dirty
+
+    def load_catalog(self):
+        """Lê o catálogo: preenche url_segments e retorna (registros das URLs frias, migrado).
+
+        Arquivos anteriores ao catálogo são migrados lendo uma vez cada
+        segmento; nesse caso os registros incluem as URLs ainda quentes.
+        """
+        with self._lock:
+            names = {segment.name for segment in self.segments}
+            self.url_segments = {}
+        if not names:
+            return [], False
+        if os.path.exists(self.catalog_file):
+            try:
+                with self._open(self.catalog_file, 'rt', encoding='utf-8') as f:
+                    data = json.load(f)
+                with self._lock:
+                    for url_id, segments in data["segments"]:
+                        # Segmentos descartados por discard_uncommitted saem do mapa
+                        segments = names.intersection(segments)
+                        if segments:
+                            self.url_segments[url_id] = segments
+                return [HistoryURL.from_row(row) for row in data["urls"]], False
+            except Exception as e:
+                print(f"Erro ao carregar catálogo do histórico: {e}")
+        records = {}
+        with self._lock:
+            self.url_segments = {}
+        for segment in self._overlapping(None, None):
+            data = self.load(segment.name)
+            with self._lock:
+                for url_id in set(data["visits"].url_ids):
+                    self.url_segments.setdefault(url_id, set()).add(segment.name)
+            # Dos segmentos mais recentes para os mais antigos: vale o registro mais novo
+            for url_id, record in data["urls"].items():
+                records.setdefault(url_id, record)
+        self._catalog_dirty = True
+        return list(records.values()), True
+
+    def merge_url(self, old_id, new_id):
+        """Passa os segmentos de uma URL arquivada com outro id para o registro atual"""
+        with self._lock:
+            segments = self.url_segments.pop(old_id, None)
+            if segments:
+                self.url_segments.setdefault(new_id, set()).update(segments)
+                self._catalog_dirty = True
+
+    def add_segment(self, visits, urls):
+        """Registra um novo segmento (pendente de gravação) e retorna seu nome"""
+        with self._lock:
+            name = f"segment-{self._next_seq:06d}{self.extension}"
+            self._next_seq += 1
+            segment = HistorySegment(name, visits.times[0], visits.times[-1], len(visits))
+            self.segments.append(segment)
+            self.segments.sort(key=lambda s: s.first_ts)
+            self._pending[name] = {"visits": visits, "urls": urls}
+            for url_id in set(visits.url_ids):
+                self.url_segments.setdefault(url_id, set()).add(name)
+            self._catalog_dirty = True
+            return name
+
+    def write_pending(self, urls=None):
+        """Grava os segmentos pendentes e, se `urls` vier, o catálogo com essas linhas.
+
+        Retorna False se alguma gravação falhar.
+        """
+        with self._lock:
+            pending = list(self._pending.items())
+        ok = True
+        for name, data in pending:
+            try:
+                self._write(name, data)
+            except Exception as e:
+                print(f"Erro ao arquivar histórico: {e}")
+                ok = False
+                continue
+            with self._lock:
+                # Uma remoção pode ter trocado o conteúdo enquanto ele era gravado
+                if self._pending.get(name) is data:
+                    del self._pending[name]
+        with self._lock:
+            if pending:
+                self._save_index()
+            if urls is None or not ok:
+                return ok
+            segments = [[url_id, sorted(names)] for url_id, names in self.url_segments.items()]
+            self._catalog_dirty = False
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_file = self.catalog_file + ".tmp"
+            with self._open(tmp_file, 'wt', encoding='utf-8') as f:
+                json.dump({"version": 1, "urls": urls, "segments": segments}, f)
+            os.replace(tmp_file, self.catalog_file)
+        except Exception as e:
+            print(f"Erro ao gravar catálogo do histórico: {e}")
+            self._catalog_dirty = True
+            return False
+        return True
+
+    def _write(self, name, data):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_file = self._path(name) + ".tmp"
+        with self._open(tmp_file, 'wt', encoding='utf-8') as f:
+            json.dump({"version": 2, "visits": data["visits"].to_dict(), "urls": data["urls"]}, f)
+        os.replace(tmp_file, self._path(name))
+
+    def load(self, name):
+        """Conteúdo de um segmento: {"visits": VisitColumns, "urls": {id: HistoryURL}}"""
+        with self._lock:
+            if name in self._cache:
+                self._cache.move_to_end(name)
+                return self._cache[name]
+            data = self._pending.get(name) or self._rewrites.get(name)
+        if data is None:
+            with self._open(self._path(name), 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version", 1) < 2:
+                # Formato 1: visitas como listas [id, id da URL, timestamp]
+                data["visits"] = VisitColumns.from_rows(data["visits"])
+            else:
+                data["visits"] = VisitColumns.from_dict(data["visits"])
+        segment = {
+            "visits": data["visits"],
+            "urls": {row[0]: HistoryURL.from_row(row) for row in data["urls"]}
+        }
+        with self._lock:
+            self._cache[name] = segment
+            while len(self._cache) > ARCHIVE_CACHE_SEGMENTS:
+                self._cache.popitem(last=False)
+        return segment
+
+    @staticmethod
+    def _hidden(ts, ranges):
+        """A visita cai num período cuja remoção ainda não foi aplicada"""
+        return any((since is None or ts >= since) and (until is None or ts < until)
+                   for since, until in ranges)
+
+    def count(self, since=None, until=None):
+        """Quantidade de visitas arquivadas no período"""
+        with self._lock:
+            hidden = list(self._removed_ranges)
+            removed_ids = set(self._removed_url_ids)
+        total = 0
+        for segment in self._overlapping(since, until):
+            if ((since is None or segment.first_ts >= since) and
+                    (until is None or segment.last_ts < until) and not removed_ids and
+                    not any(segment.overlaps(*period) for period in hidden)):
+                total += segment.count
+            else:
+                visits = self.load(segment.name)["visits"]
+                lo, hi = visits.range(since, until)
+                total += sum(1 for i in range(lo, hi)
+                             if visits.url_ids[i] not in removed_ids
+                             and not self._hidden(visits.times[i], hidden))
+        return total
+
+    def _overlapping(self, since, until):
+        """Segmentos que cruzam o período, do mais recente para o mais antigo"""
+        with self._lock:
+            segments = list(self.segments)
+        return [s for s in reversed(segments) if s.overlaps(since, until)]
+
+    def iter_visits(self, since=None, until=None):
+        """Gera as visitas (HistoryEntry) do período, mais recentes primeiro"""
+        with self._lock:
+            hidden = list(self._removed_ranges)
+            removed_ids = set(self._removed_url_ids)
+        for segment in self._overlapping(since, until):
+            data = self.load(segment.name)
+            visits = data["visits"]
+            lo, hi = visits.range(since, until)
+            for i in range(hi - 1, lo - 1, -1):
+                if visits.url_ids[i] in removed_ids:
+                    continue
+                if hidden and self._hidden(visits.times[i], hidden):
+                    continue
+                record = data["urls"].get(visits.url_ids[i])
+                if record is not None:
+                    yield HistoryEntry(visits.ids[i], visits.times[i], record)
+
+    def last_visit(self, url_id):
+        """Timestamp da visita arquivada mais recente da URL, ou None"""
+        with self._lock:
+            if url_id in self._removed_url_ids:
+                return None
+            names = self.url_segments.get(url_id, ())
+            segments = [s for s in reversed(self.segments) if s.name in names]
+            hidden = list(self._removed_ranges)
+        for segment in segments:
+            visits = self.load(segment.name)["visits"]
+            for i in range(len(visits) - 1, -1, -1):
+                if visits.url_ids[i] == url_id and not self._hidden(visits.times[i], hidden):
+                    return visits.times[i]
+        return None
+
+    # Regravações em segundo plano
+
+    def _submit(self, job):
+        with self._lock:
+            self._jobs.append(job)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._drain, daemon=True)
+                self._worker.start()
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                if not self._jobs:
+                    self._worker = None
+                    return
+                job = self._jobs.pop(0)
+            try:
+                job()
+            except Exception as e:
+                print(f"Erro ao regravar arquivo de histórico: {e}")
+
+    def wait(self):
+        """Espera as regravações agendadas terminarem"""
+        while True:
+            with self._lock:
+                worker = self._worker
+            if worker is None:
+                return
+            worker.join()
+
+    def _rewrite(self, segment, visits, urls, dropped=()):
+        """Substitui o conteúdo de um segmento (ou o apaga, se ficou vazio).
+
+        `dropped` são as URLs que deixaram de ter visitas nele.
+        """
+        referenced = set(visits.url_ids)
+        url_rows = [r.to_row() for r in urls.values() if r.id in referenced]
+        with self._lock:
+            if segment not in self.segments:
+                # Arquivo apagado (clear) enquanto a regravação rodava
+                return
+            self._cache.pop(segment.name, None)
+            for url_id in dropped:
+                names = self.url_segments.get(url_id)
+                if names is not None:
+                    names.discard(segment.name)
+                    if not names:
+                        del self.url_segments[url_id]
+            self._catalog_dirty = True
+            if not len(visits):
+                self.segments.remove(segment)
+                if self._pending.pop(segment.name, None) is None:
+                    try:
+                        os.remove(self._path(segment.name))
+                    except OSError:
+                        pass
+                self._save_index()
+                return
+            segment.first_ts = visits.times[0]
+            segment.last_ts = visits.times[-1]
+            segment.count = len(visits)
+            data = {"visits": visits, "urls": url_rows}
+            if segment.name in self._pending:
+                self._pending[segment.name] = data
+                return
+            # Consultas leem o conteúdo novo enquanto o arquivo é gravado
+            self._rewrites[segment.name] = data
+        try:
+            self._write(segment.name, data)
+            with self._lock:
+                self._save_index()
+        finally:
+            with self._lock:
+                if self._rewrites.get(segment.name) is data:
+                    del self._rewrites[segment.name]
+
+    def remove_urls(self, records):
+        """Agenda a remoção das visitas arquivadas das URLs (registros HistoryURL).
+
+        Até a regravação terminar, as visitas delas ficam ocultas nas consultas.
+        """
+        url_ids = {record.id for record in records}
+        with self._lock:
+            names = set()
+            for url_id in url_ids:
+                names.update(self.url_segments.pop(url_id, ()))
+            if not names:
+                return
+            self._catalog_dirty = True
+            self._removed_url_ids.update(url_ids)
+        urls = {record.url for record in records}
+        self._submit(lambda: self._drop_urls(names, url_ids, urls))
+
+    def _drop_urls(self, names, url_ids, urls):
+        try:
+            for segment in self._overlapping(None, None):
+                if segment.name not in names:
+                    continue
+                data = self.load(segment.name)
+                # Também pelo endereço: visitas arquivadas antes do catálogo podem ter outro id
+                ids = url_ids.union(r.id for r in data["urls"].values() if r.url in urls)
+                visits = data["visits"].copy()
+                visits.drop_urls(ids)
+                self._rewrite(segment, visits, data["urls"])
+        finally:
+            with self._lock:
+                self._removed_url_ids.difference_update(url_ids)
+
+    def remove_range(self, since=None, until=None, callback=None):
+        """Agenda a remoção das visitas arquivadas do período [since, until).
+
+        `callback` recebe {id da URL: visitas removidas} na thread do
+        arquivo, depois que os segmentos foram regravados.
+        """
+        period = (since, until)
+        hide = bool(self._overlapping(since, until))
+        if hide:
+            with self._lock:
+                self._removed_ranges.append(period)
+        self._submit(lambda: self._remove_range(period, hide, callback))
+
+    def _remove_range(self, period, hide, callback):
+        counts = {}
+        try:
+            for segment in self._overlapping(*period):
+                data = self.load(segment.name)
+                visits = data["visits"].copy()
+                lo, hi = visits.range(*period)
+                if lo == hi:
+                    continue
+                removed = {}
+                for url_id in visits.url_ids[lo:hi]:
+                    removed[url_id] = removed.get(url_id, 0) + 1
+                visits.delete(lo, hi)
+                self._rewrite(segment, visits, data["urls"],
+                              set(removed).difference(visits.url_ids))
+                for url_id, count in removed.items():
+                    counts[url_id] = counts.get(url_id, 0) + count
+        finally:
+            if hide:
+                with self._lock:
+                    self._removed_ranges.remove(period)
+        if callback is not None:
+            callback(counts)
+
+    def clear(self):
+        with self._lock:
+            self._jobs = []
+        self.wait()
+        with self._lock:
+            for segment in self.segments:
+                if segment.name not in self._pending:
+                    try:
+                        os.remove(self._path(segment.name))
+                    except OSError:
+                        pass
+            try:
+                if os.path.exists(self.catalog_file):
+                    os.remove(self.catalog_file)
+            except OSError:
+                pass
+            self.segments = []
+            self.url_segments = {}
+            self._catalog_dirty = False
+            self._pending = {}
+            self._rewrites = {}
+            self._removed_ranges = []
+            self._removed_url_ids = set()
+            self._cache.clear()
+            if os.path.isdir(self.directory):
+                self._save_index()
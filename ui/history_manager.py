@@ -1,67 +1,772 @@
 import os
 import json
 import datetime
+import itertools
+import threading
+from urllib.parse import urlsplit
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, 
-                           QTableWidget, QTableWidgetItem, QPushButton,
-                           QHeaderView, QLabel, QLineEdit, QMenu)
-from PyQt6.QtCore import Qt, QUrl
+                           QTableView, QAbstractItemView, QPushButton,
+                           QHeaderView, QLabel, QLineEdit, QMenu, QComboBox)
+from PyQt6.QtCore import Qt, QUrl, QTimer, QThreadPool
+from ui.history_search import HistorySearchIndex
+from ui.history_model import HistoryTableModel, HistorySearchTask
+from ui.history_archive import HistoryArchive
+from ui.history_store import HistoryURL, HistoryEntry, VisitColumns
+
+# Visitas mantidas em memória (camada quente); as mais antigas vão para o arquivo
+HOT_VISITS = 5000
+# Visitas por segmento do arquivo comprimido
+SEGMENT_VISITS = 5000
+# Compressão dos segmentos arquivados: "gzip" ou "lzma"
+ARCHIVE_COMPRESSION = "gzip"
+# Quantidade de registros no diário que dispara uma compactação em segundo plano
+COMPACT_THRESHOLD = 500
+# Versão do formato do snapshot gravado em history.json
+SNAPSHOT_VERSION = 4
+# Intervalo sem digitação antes de disparar a busca no diálogo
+SEARCH_DEBOUNCE_MS = 200
+# Agrupamentos de período oferecidos no diálogo (rótulo, período)
+HISTORY_PERIODS = [
+    ("Tudo", None),
+    ("Hoje", "today"),
+    ("Ontem", "yesterday"),
+    ("Esta semana", "week"),
+    ("Últimos 7 dias", "last7")
+]
+
+def day_start(day):
+    """Timestamp (segundos desde a época) da meia-noite local do dia"""
+    return int(datetime.datetime.combine(day, datetime.time()).timestamp())
+
+def period_range(period):
+    """Intervalo [since, until) de um período nomeado do histórico"""
+    today = datetime.date.today()
+    tomorrow = day_start(today + datetime.timedelta(days=1))
+    if period == "today":
+        return day_start(today), tomorrow
+    if period == "yesterday":
+        return day_start(today - datetime.timedelta(days=1)), day_start(today)
+    if period == "week":
+        return day_start(today - datetime.timedelta(days=today.weekday())), tomorrow
+    if period == "last7":
+        return day_start(today - datetime.timedelta(days=6)), tomorrow
+    return None, None
 
 class HistoryManager:
+    """Histórico agregado por URL, persistido como snapshot + diário (journal).
+
+    `urls` guarda um HistoryURL por endereço (título, número de visitas,
+    última visita e quantas vezes foi digitado) na ordem da última visita;
+    `visits` é o registro compacto de cada visita em colunas (VisitColumns:
+    id, id da URL e timestamp em segundos desde a época), mantido em ordem
+    de timestamp, o que permite consultas por período com bisect. As
+    visitas são entregues aos chamadores como HistoryEntry, criadas sob
+    demanda. Índices auxiliares (visitas por URL e sufixo de host -> URLs)
+    permitem remover sites e períodos em lote com uma única passada.
+    Cada visita grava apenas uma linha JSON no diário; periodicamente o
+    diário é compactado em um novo snapshot numa thread em segundo plano.
+    Só as HOT_VISITS visitas mais recentes ficam em memória: na compactação
+    os blocos mais antigos viram segmentos comprimidos (`archive`), lidos
+    apenas quando uma consulta alcança o período deles. A tabela de URLs
+    fica inteira em memória (contagens e ids sobrevivem ao arquivamento e
+    a busca FTS5 cobre todo o histórico); o snapshot só leva as URLs com
+    visitas na camada quente e as demais vão para o catálogo do arquivo.
+    Remoções no arquivo rodam na thread dele e voltam por `_data_lock`,
+    que também protege as leituras feitas pela busca em segundo plano
+    (HistorySearchTask) contra as alterações da thread da interface.
+    """
     def __init__(self, history_file):
         self.history_file = history_file
-        self.history = self.load_history()
+        self.journal_file = history_file + ".journal"
+        self._lock = threading.Lock()
+        # Protege as estruturas em memória contra a thread do arquivo e a compactação
+        self._data_lock = threading.RLock()
+        self._journal = None
+        self._journal_count = 0
+        self._last_id = 0
+        self._compact_thread = None
+        # Índice de busca construído sob demanda na primeira pesquisa
+        self._index = None
+        self._index_lock = threading.RLock()
+        self.archive = HistoryArchive(history_file + ".archive", ARCHIVE_COMPRESSION)
+        self._reset()
+        self.load_history()
+    
+    def _reset(self):
+        """Esvazia as estruturas em memória"""
+        self.urls = {}
+        self.visits = VisitColumns()
+        self._urls_by_id = {}
+        # id da URL -> quantidade de visitas dela na camada quente
+        self._hot_visits = {}
+        # host -> URLs desse host
+        self._host_urls = {}
+        # sufixo de host ("exemplo.com", "com"...) -> hosts com esse sufixo
+        self._suffix_hosts = {}
+        # As URLs sem visitas quentes mudaram e o catálogo precisa ser regravado
+        self._cold_dirty = False
     
     def load_history(self):
+        """Carrega o snapshot e reaplica os registros pendentes do diário"""
+        with self._data_lock:
+            migrate = self._load()
+        # Fora do lock: a gravação espera as regravações do arquivo, que o usam
+        if migrate:
+            self.save_history()
+    
+    def _load(self):
+        """Monta o estado em memória; retorna True se o formato precisa ser regravado"""
+        self._reset()
+        snapshot_id = 0
+        segments = []
+        rows = []
+        migrate = False
         if os.path.exists(self.history_file):
             try:
                 with open(self.history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                    data = json.load(f)
+                if isinstance(data, list):
+                    # Formato antigo: lista simples de visitas sem identificadores
+                    for i, entry in enumerate(data, 1):
+                        self._record_visit(i, entry["url"], entry["title"],
+                                           self._parse_timestamp(entry["timestamp"]))
+                    snapshot_id = len(data)
+                    migrate = True
+                elif data.get("version", 2) < 3:
+                    # Snapshot v2: lista de visitas com identificadores
+                    for entry in data.get("entries", []):
+                        self._record_visit(entry["id"], entry["url"], entry["title"],
+                                           self._parse_timestamp(entry["timestamp"]))
+                    snapshot_id = data.get("last_id", 0)
+                    migrate = True
+                else:
+                    rows = data["urls"]
+                    if data["version"] < SNAPSHOT_VERSION:
+                        # Snapshot v3: visitas como listas [id, id da URL, timestamp]
+                        self.visits = VisitColumns.from_rows(data["visits"])
+                        migrate = True
+                    else:
+                        self.visits = VisitColumns.from_dict(data["visits"])
+                    snapshot_id = data.get("last_id", 0)
+                    segments = data.get("segments", [])
             except Exception as e:
                 print(f"Erro ao carregar histórico: {e}")
-                return []
-        return []
+        # Segmentos gravados depois do último snapshot não fazem parte dele
+        self.archive.discard_uncommitted(segments)
+        if self._load_urls(rows):
+            migrate = True
+        if rows:
+            # Nos formatos antigos _record_visit já contou as visitas quentes
+            for url_id in self.visits.url_ids:
+                self._hot_visits[url_id] += 1
+        
+        self._last_id = snapshot_id
+        self._journal_count = 0
+        if os.path.exists(self.journal_file):
+            try:
+                with open(self.journal_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            # Linha incompleta (ex.: queda durante a gravação)
+                            continue
+                        if record.get("id", 0) <= snapshot_id:
+                            continue
+                        self._replay(record)
+                        self._last_id = max(self._last_id, record["id"])
+                        self._journal_count += 1
+            except Exception as e:
+                print(f"Erro ao ler diário do histórico: {e}")
+        return migrate
     
-    def save_history(self):
+    def _load_urls(self, rows):
+        """Monta a tabela de URLs: as do catálogo do arquivo e depois as do snapshot.
+
+        Retorna True se o catálogo foi migrado dos segmentos (formato anterior).
+        """
+        hot = [HistoryURL.from_row(row) for row in rows]
+        hot_ids = {record.id for record in hot}
+        hot_urls = {record.url: record for record in hot}
+        records, migrated = self.archive.load_catalog()
+        # As URLs frias são mais antigas que qualquer visita quente: vêm primeiro na ordem
+        for record in sorted(records, key=lambda r: r.last_visit):
+            if record.id in hot_ids:
+                continue
+            current = hot_urls.get(record.url)
+            if current is not None:
+                if migrated:
+                    # URL revisitada depois de arquivada ganhou outro id: soma as contagens
+                    current.visit_count += record.visit_count
+                    current.typed_count += record.typed_count
+                    self.archive.merge_url(record.id, current.id)
+                continue
+            self._add_url(record)
+        for record in hot:
+            self._add_url(record)
+        return migrated
+    
+    @staticmethod
+    def _parse_timestamp(value):
+        """Converte o timestamp ISO dos formatos antigos em segundos desde a época"""
+        return int(datetime.datetime.fromisoformat(value).timestamp())
+    
+    def _replay(self, record):
+        """Aplica um registro do diário sobre o histórico em memória"""
+        op = record.get("op")
+        if op == "visit":
+            self._record_visit(record["id"], record["url"], record["title"],
+                               record["ts"], record.get("typed", False))
+        elif op == "add":
+            # Registro do formato v2 do diário
+            entry = record["entry"]
+            self._record_visit(record["id"], entry["url"], entry["title"],
+                               self._parse_timestamp(entry["timestamp"]))
+        elif op == "remove":
+            self._remove_urls(record["urls"])
+        elif op == "remove_range":
+            self._remove_range(record["since"], record["until"])
+    
+    @staticmethod
+    def host_suffixes(url):
+        """Sufixos do host da URL: www.exemplo.com -> www.exemplo.com, exemplo.com, com"""
+        return HistoryManager._suffixes(urlsplit(url).hostname or "")
+    
+    @staticmethod
+    def _suffixes(host):
+        parts = host.split(".")
+        return [".".join(parts[i:]) for i in range(len(parts)) if parts[i]]
+    
+    def _add_url(self, record):
+        """Registra uma URL nova no dicionário principal e nos índices"""
+        self.urls[record.url] = record
+        self._urls_by_id[record.id] = record
+        self._hot_visits[record.id] = 0
+        host = urlsplit(record.url).hostname or ""
+        urls = self._host_urls.get(host)
+        if urls is None:
+            # Os sufixos apontam para hosts, não para cada URL
+            urls = self._host_urls[host] = set()
+            for suffix in self._suffixes(host):
+                self._suffix_hosts.setdefault(suffix, set()).add(host)
+        urls.add(record.url)
+    
+    def _drop_url(self, record):
+        """Retira uma URL do dicionário principal e dos índices"""
+        del self.urls[record.url]
+        del self._urls_by_id[record.id]
+        del self._hot_visits[record.id]
+        host = urlsplit(record.url).hostname or ""
+        urls = self._host_urls.get(host)
+        if urls is None:
+            return
+        urls.discard(record.url)
+        if urls:
+            return
+        del self._host_urls[host]
+        for suffix in self._suffixes(host):
+            hosts = self._suffix_hosts.get(suffix)
+            if hosts is not None:
+                hosts.discard(host)
+                if not hosts:
+                    del self._suffix_hosts[suffix]
+    
+    def _record_visit(self, visit_id, url, title, ts, typed=False):
+        """Soma uma visita ao registro da URL (criando-o se preciso)"""
+        record = self.urls.pop(url, None)
+        if record is None:
+            # O id da URL é o id da primeira visita, estável na reaplicação do diário
+            record = HistoryURL(visit_id, url, title, last_visit=ts)
+            self._add_url(record)
+        else:
+            # Reinserir no fim mantém o dicionário ordenado pela última visita
+            self.urls[url] = record
+            if title and title != record.title:
+                record.set_title(title)
+        record.visit_count += 1
+        record.last_visit = ts
+        if typed:
+            record.typed_count += 1
+        self.visits.add(visit_id, record.id, ts)
+        self._hot_visits[record.id] += 1
+        return record
+    
+    def _remove_urls(self, urls):
+        """Remove URLs e suas visitas numa única passada; retorna os registros removidos"""
+        removed = []
+        removed_visits = 0
+        for url in set(urls):
+            record = self.urls.get(url)
+            if record is not None:
+                removed_visits += self._hot_visits[record.id]
+                self._drop_url(record)
+                removed.append(record)
+        if removed_visits:
+            self.visits.drop_urls({record.id for record in removed})
+        if removed:
+            # Só os segmentos com visitas dessas URLs são regravados, na thread do arquivo
+            self.archive.remove_urls(removed)
+        return removed
+    
+    def _remove_range(self, since, until):
+        """Remove as visitas do período; retorna (URLs removidas, URLs alteradas).
+
+        Sites sem nenhuma visita restante saem do histórico; os demais têm
+        a contagem e a última visita recalculadas. A parte arquivada é
+        removida na thread do arquivo e ajustada em `_archive_range_removed`.
+        """
+        lo, hi = self.visits.range(since, until)
+        removed = []
+        changed = {}
+        # URLs que ficaram só com visitas arquivadas: a última visita vem do arquivo
+        cold = []
+        if lo < hi:
+            counts = {}
+            for url_id in self.visits.url_ids[lo:hi]:
+                counts[url_id] = counts.get(url_id, 0) + 1
+            self.visits.delete(lo, hi)
+            
+            for url_id, count in counts.items():
+                record = self._urls_by_id.get(url_id)
+                if record is None:
+                    continue
+                remaining = self._hot_visits[url_id] - count
+                if not remaining and url_id not in self.archive.url_segments:
+                    self._drop_url(record)
+                    removed.append(record)
+                    continue
+                self._hot_visits[url_id] = remaining
+                record.visit_count = max(remaining, record.visit_count - count)
+                if remaining:
+                    changed[url_id] = record
+                else:
+                    cold.append(url_id)
+                    self._cold_dirty = True
+        if changed:
+            # A última visita de cada site alterado é a mais recente que restou
+            pending = set(changed)
+            for i in range(len(self.visits) - 1, -1, -1):
+                url_id = self.visits.url_ids[i]
+                if url_id in pending:
+                    changed[url_id].last_visit = self.visits.times[i]
+                    pending.discard(url_id)
+                    if not pending:
+                        break
+            # Reordena pela última visita, já que algumas podem ter recuado
+            self.urls = dict(sorted(self.urls.items(), key=lambda item: item[1].last_visit))
+        self.archive.remove_range(
+            since, until, lambda counts: self._archive_range_removed(counts, cold))
+        return removed, list(changed.values())
+    
+    def _archive_range_removed(self, counts, cold):
+        """Aplica às URLs a remoção de um período do arquivo (roda na thread do arquivo)"""
+        url_ids = set(counts).union(cold)
+        if not url_ids:
+            return
+        # Lê os segmentos antes de pegar o lock, para não travar a interface
+        latest = {url_id: self.archive.last_visit(url_id) for url_id in url_ids}
+        with self._data_lock:
+            removed = []
+            changed = []
+            for url_id in url_ids:
+                record = self._urls_by_id.get(url_id)
+                if record is None:
+                    continue
+                record.visit_count -= counts.get(url_id, 0)
+                if self._hot_visits[url_id]:
+                    # A última visita continua na camada quente
+                    changed.append(record)
+                elif latest[url_id] is None:
+                    self._drop_url(record)
+                    removed.append(record)
+                else:
+                    record.visit_count = max(1, record.visit_count)
+                    record.last_visit = latest[url_id]
+                    changed.append(record)
+            if not removed and not changed:
+                return
+            self._cold_dirty = True
+            self.urls = dict(sorted(self.urls.items(), key=lambda item: item[1].last_visit))
+            self._unindex(removed)
+            with self._index_lock:
+                if self._index is not None and changed:
+                    self._index.add_many(
+                        (r.id, r.url, r.title, r.last_visit) for r in changed
+                    )
+    
+    def _open_journal(self):
+        """Abre o diário para acréscimo, isolando uma eventual linha incompleta"""
+        journal = open(self.journal_file, 'a+b')
+        if journal.tell() > 0:
+            journal.seek(-1, os.SEEK_END)
+            if journal.read(1) != b"\n":
+                journal.write(b"\n")
+        journal.close()
+        return open(self.journal_file, 'a', encoding='utf-8')
+
+    def _append_journal(self, record):
+        """Acrescenta um registro ao diário (uma única linha)"""
+        with self._lock:
+            self._last_id += 1
+            record["id"] = self._last_id
+            try:
+                if self._journal is None:
+                    self._journal = self._open_journal()
+                self._journal.write(json.dumps(record, ensure_ascii=False) + "\n")
+                self._journal.flush()
+                self._journal_count += 1
+            except Exception as e:
+                print(f"Erro ao gravar diário do histórico: {e}")
+            return self._last_id
+    
+    def _roll_archive(self):
+        """Move os blocos de visitas mais antigos da memória para o arquivo"""
+        while len(self.visits) >= HOT_VISITS + SEGMENT_VISITS:
+            block = self.visits.slice(0, SEGMENT_VISITS)
+            self.visits.delete(0, SEGMENT_VISITS)
+            counts = {}
+            for url_id in block.url_ids:
+                counts[url_id] = counts.get(url_id, 0) + 1
+            url_rows = []
+            for url_id, count in counts.items():
+                record = self._urls_by_id.get(url_id)
+                if record is None:
+                    continue
+                url_rows.append(record.to_row())
+                # Sites sem visitas recentes continuam na tabela e vão para o catálogo
+                self._hot_visits[url_id] -= count
+            self.archive.add_segment(block, url_rows)
+    
+    def _snapshot(self):
+        """Cópia compacta do estado atual, segura para gravar em outra thread.
+
+        Chamado com `_data_lock`. O snapshot leva só as URLs com visitas
+        quentes; as linhas das demais (o catálogo) só são montadas quando
+        esse conjunto mudou.
+        """
+        urls = []
+        if len(self.visits):
+            # URLs quentes têm a última visita depois da visita quente mais antiga
+            oldest = self.visits.times[0]
+            for record in reversed(self.urls.values()):
+                if record.last_visit < oldest:
+                    break
+                if self._hot_visits[record.id]:
+                    urls.append(record.to_row())
+            urls.reverse()
+        cold = None
+        if self._cold_dirty or self.archive.dirty:
+            cold = [record.to_row() for record in self.urls.values()
+                    if not self._hot_visits[record.id]]
+            self._cold_dirty = False
+        with self._lock:
+            return urls, cold, self.visits.copy(), self._last_id, self.archive.names()
+    
+    def _write_snapshot(self):
+        """Grava o snapshot de forma atômica e descarta o diário já incorporado"""
+        # Remoções pendentes no arquivo mudam contagens que entram no snapshot
+        self.archive.wait()
+        with self._data_lock:
+            urls, cold, visits, last_id, segments = self._snapshot()
+        # Os segmentos novos e o catálogo precisam estar no disco antes do snapshot
+        if not self.archive.write_pending(cold):
+            if cold is not None:
+                self._cold_dirty = True
+            return
         try:
-            # Limitar o histórico a 1000 itens
-            if len(self.history) > 1000:
-                self.history = self.history[-1000:]
-                
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.history, f, ensure_ascii=False, indent=2)
+            tmp_file = self.history_file + ".tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({"version": SNAPSHOT_VERSION, "last_id": last_id,
+                           "urls": urls, "visits": visits.to_dict(), "segments": segments},
+                          f, ensure_ascii=False)
+            os.replace(tmp_file, self.history_file)
+            self._truncate_journal(last_id)
         except Exception as e:
             print(f"Erro ao salvar histórico: {e}")
     
-    def add_entry(self, url, title):
-        timestamp = datetime.datetime.now().isoformat()
-        entry = {
-            "url": url,
-            "title": title,
-            "timestamp": timestamp,
-            "date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        self.history.append(entry)
-        self.save_history()
+    def _truncate_journal(self, last_id):
+        """Mantém no diário apenas os registros posteriores ao snapshot"""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if not os.path.exists(self.journal_file):
+                return
+            pending = []
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        if json.loads(line).get("id", 0) > last_id:
+                            pending.append(line)
+                    except ValueError:
+                        continue
+            if pending:
+                tmp_file = self.journal_file + ".tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    f.writelines(pending)
+                os.replace(tmp_file, self.journal_file)
+            else:
+                os.remove(self.journal_file)
+            self._journal_count = len(pending)
+    
+    def compact(self, wait=False):
+        """Compacta o diário em um novo snapshot em segundo plano"""
+        if self._compact_thread is not None and self._compact_thread.is_alive():
+            if wait:
+                self._compact_thread.join()
+            return
+        with self._data_lock:
+            self._roll_archive()
+        self._compact_thread = threading.Thread(target=self._write_snapshot, daemon=True)
+        self._compact_thread.start()
+        if wait:
+            self._compact_thread.join()
+    
+    def save_history(self):
+        """Grava imediatamente um snapshot completo (operação síncrona)"""
+        if self._compact_thread is not None and self._compact_thread.is_alive():
+            self._compact_thread.join()
+        with self._data_lock:
+            self._roll_archive()
+        self._write_snapshot()
+    
+    def close(self):
+        """Aguarda compactações e regravações pendentes e fecha o diário"""
+        if self._compact_thread is not None and self._compact_thread.is_alive():
+            self._compact_thread.join()
+        self.archive.wait()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+    
+    def add_entry(self, url, title, typed=False):
+        """Registra uma visita; `typed` indica URL digitada na barra de endereço"""
+        ts = int(datetime.datetime.now().timestamp())
+        record = {"op": "visit", "url": url, "title": title, "ts": ts}
+        if typed:
+            record["typed"] = True
+        with self._data_lock:
+            visit_id = self._append_journal(record)
+            url_record = self._record_visit(visit_id, url, title, ts, typed)
+            with self._index_lock:
+                if self._index is not None:
+                    self._index.add(url_record.id, url, url_record.title, ts)
+        if self._journal_count >= COMPACT_THRESHOLD:
+            self.compact()
+    
+    def remove_url(self, url):
+        """Remove uma URL e todas as suas visitas do histórico"""
+        return self.remove_urls([url])
+    
+    def remove_urls(self, urls):
+        """Remove várias URLs com uma passada e um único registro no diário"""
+        with self._data_lock:
+            removed = self._remove_urls(urls)
+            if removed:
+                self._append_journal({"op": "remove", "urls": [r.url for r in removed]})
+                self._unindex(removed)
+        return len(removed)
+    
+    def remove_range(self, since=None, until=None):
+        """Remove todas as visitas do período [since, until)"""
+        with self._data_lock:
+            removed, changed = self._remove_range(since, until)
+            # Sempre no diário: a parte arquivada é regravada depois, em segundo plano
+            self._append_journal({"op": "remove_range", "since": since, "until": until})
+            self._unindex(removed)
+            with self._index_lock:
+                if self._index is not None and changed:
+                    self._index.add_many(
+                        (r.id, r.url, r.title, r.last_visit) for r in changed
+                    )
+        return len(removed)
+    
+    def forget_host(self, host):
+        """Esquece um site: remove todas as URLs do host e de seus subdomínios"""
+        host = host.lower().strip(".")
+        with self._data_lock:
+            urls = set()
+            for name in self._suffix_hosts.get(host, ()):
+                urls.update(self._host_urls[name])
+            return self.remove_urls(urls)
     
     def clear_history(self):
-        self.history = []
+        # Antes do lock: a regravação em andamento no arquivo pode precisar dele
+        self.archive.clear()
+        with self._data_lock:
+            self._reset()
+            with self._index_lock:
+                if self._index is not None:
+                    self._index.clear()
         self.save_history()
+    
+    def _unindex(self, records):
+        with self._index_lock:
+            if self._index is not None and records:
+                self._index.remove(record.id for record in records)
         
-    def search_history(self, query):
-        """Busca entradas no histórico que contenham o termo de busca"""
+    def _search_index(self):
+        """Retorna o índice FTS5, construindo-o a partir do histórico se preciso"""
+        # Mesma ordem de add_entry (dados e depois índice), para não travar em sentidos opostos
+        with self._data_lock, self._index_lock:
+            if self._index is None:
+                index = HistorySearchIndex()
+                if index.available:
+                    index.add_many(
+                        (r.id, r.url, r.title, r.last_visit)
+                        for r in list(self.urls.values())
+                    )
+                self._index = index
+            return self._index
+    
+    def _resolve(self, url_ids):
+        return [self._urls_by_id[i] for i in url_ids if i in self._urls_by_id]
+    
+    def _scan(self, query):
+        """Busca linear, usada quando o SQLite não tem FTS5"""
         query = query.lower()
         return [
-            entry for entry in self.history 
-            if query in entry["url"].lower() or query in entry["title"].lower()
+            record for record in list(self.urls.values())
+            if query in record.url.lower() or query in record.title.lower()
         ]
     
+    def search_history(self, query):
+        """Busca sites no histórico que contenham o termo de busca"""
+        index = self._search_index()
+        with self._data_lock:
+            if not index.available:
+                return self._scan(query)
+            # Mantém a ordem cronológica (última visita) esperada pelos chamadores
+            return self._resolve(index.search(query, order="recent"))[::-1]
+    
+    def search_ranked(self, query, limit=50, offset=0):
+        """Busca paginada com os resultados mais relevantes primeiro"""
+        index = self._search_index()
+        with self._data_lock:
+            if not index.available:
+                return self._scan(query)[::-1][offset:offset + limit]
+            return self._resolve(index.search(query, limit=limit, offset=offset))
+    
+    def get_page(self, offset=0, limit=100):
+        """Retorna uma página de sites, visitados mais recentemente primeiro"""
+        with self._data_lock:
+            return list(itertools.islice(reversed(self.urls.values()), offset, offset + limit))
+    
+    def search_page(self, query, offset=0, limit=100):
+        """Página de resultados da busca, mais recentes primeiro"""
+        index = self._search_index()
+        with self._data_lock:
+            if not index.available:
+                return self._scan(query)[::-1][offset:offset + limit]
+            return self._resolve(index.search(query, limit=limit, offset=offset, order="recent"))
+    
+    def count_entries(self, since=None, until=None):
+        """Quantidade de visitas no período (os segmentos inteiros contam sem ser lidos)"""
+        with self._data_lock:
+            lo, hi = self.visits.range(since, until)
+        return hi - lo + self.archive.count(since, until)
+    
+    def get_entries(self, since=None, until=None, limit=None, offset=0):
+        """Visitas no período [since, until), mais recentes primeiro"""
+        with self._data_lock:
+            lo, hi = self.visits.range(since, until)
+            end = hi - offset
+            start = lo if limit is None else max(lo, end - limit)
+            entries = []
+            for i in range(end - 1, start - 1, -1):
+                record = self._urls_by_id.get(self.visits.url_ids[i])
+                if record is not None:
+                    entries.append(HistoryEntry(self.visits.ids[i], self.visits.times[i], record))
+        if limit is not None and len(entries) >= limit:
+            return entries
+        # Continua nos segmentos arquivados que cruzam o período
+        skip = max(0, offset - (hi - lo))
+        stop = None if limit is None else skip + limit - len(entries)
+        entries.extend(itertools.islice(self._archived_visits(since, until), skip, stop))
+        return entries
+    
+    def _archived_visits(self, since=None, until=None):
+        """Visitas arquivadas do período, ligadas aos registros atuais das URLs.
+
+        Roda fora de `_data_lock`: só faz consultas pontuais (dict.get) às tabelas.
+        """
+        for entry in self.archive.iter_visits(since, until):
+            # URLs já removidas ficam de fora mesmo antes de o segmento ser regravado;
+            # a busca pelo endereço cobre ids arquivados antes do catálogo
+            record = self._urls_by_id.get(entry.record.id) or self.urls.get(entry.url)
+            if record is not None:
+                entry.record = record
+                yield entry
+    
+    def get_sites(self, since=None, until=None):
+        """Sites visitados no período, pela visita mais recente no período"""
+        with self._data_lock:
+            lo, hi = self.visits.range(since, until)
+            seen = set()
+            sites = []
+            for i in range(hi - 1, lo - 1, -1):
+                url_id = self.visits.url_ids[i]
+                if url_id not in seen:
+                    seen.add(url_id)
+                    record = self._urls_by_id.get(url_id)
+                    if record is not None:
+                        sites.append(record)
+        # Os segmentos são lidos fora do lock, para não segurar a interface
+        urls = {record.url for record in sites}
+        for entry in self._archived_visits(since, until):
+            if entry.url not in urls:
+                urls.add(entry.url)
+                sites.append(entry.record)
+        return sites
+    
+    def find_sites(self, query="", since=None, until=None, offset=0, limit=100):
+        """Página de sites filtrada por texto e/ou período, mais recentes primeiro"""
+        if since is None and until is None:
+            if query:
+                return self.search_page(query, offset, limit)
+            return self.get_page(offset, limit)
+        sites = self.get_sites(since, until)
+        if query:
+            query = query.lower()
+            sites = [
+                record for record in sites
+                if query in record.url.lower() or query in record.title.lower()
+            ]
+        return sites[offset:offset + limit]
+    
+    def group_by_day(self, since=None, until=None):
+        """Visitas do período agrupadas por dia: [(data, visitas)], mais recentes primeiro"""
+        groups = []
+        for entry in self.get_entries(since, until):
+            day = datetime.date.fromtimestamp(entry.timestamp)
+            if not groups or groups[-1][0] != day:
+                groups.append((day, []))
+            groups[-1][1].append(entry)
+        return groups
+    
+    def get_all(self):
+        """Todas as visitas (incluindo as arquivadas) em ordem cronológica, para exportação"""
+        return [entry.to_dict() for entry in reversed(self.get_entries())]
+    
+    def restore(self, entries):
+        """Substitui o histórico pelas visitas exportadas por get_all()"""
+        self.clear_history()
+        entries = sorted(entries, key=lambda entry: entry["timestamp"])
+        with self._data_lock:
+            with self._lock:
+                first_id = self._last_id + 1
+                self._last_id += len(entries)
+            for visit_id, entry in enumerate(entries, first_id):
+                self._record_visit(visit_id, entry["url"], entry["title"],
+                                   self._parse_timestamp(entry["timestamp"]))
+            with self._index_lock:
+                self._index = None
+        self.save_history()
+    
     def get_today_entries(self):
-        """Retorna entradas de hoje"""
-        today = datetime.datetime.now().date()
-        return [
-            entry for entry in self.history
-            if datetime.datetime.fromisoformat(entry["timestamp"]).date() == today
-        ]
+        """Retorna os sites visitados hoje, em ordem cronológica"""
+        return self.get_sites(*period_range("today"))[::-1]
 
 class HistoryDialog(QDialog):
     def __init__(self, parent, history_manager):
@@ -78,17 +783,34 @@ class HistoryDialog(QDialog):
         search_layout.addWidget(QLabel("Pesquisar:"))
         self.search_box = QLineEdit()
         self.search_box.setPlaceholderText("Digite para pesquisar no histórico")
-        self.search_box.textChanged.connect(self.filter_history)
+        self.search_box.textChanged.connect(self.schedule_filter)
         search_layout.addWidget(self.search_box)
+        self.period_combo = QComboBox()
+        for label, period in HISTORY_PERIODS:
+            self.period_combo.addItem(label, period)
+        self.period_combo.currentIndexChanged.connect(self.filter_history)
+        search_layout.addWidget(self.period_combo)
         layout.addLayout(search_layout)
         
-        # Tabela de histórico
-        self.table = QTableWidget(0, 3)
-        self.table.setHorizontalHeaderLabels(["Título", "URL", "Data"])
+        # Busca enquanto digita: aguarda uma pausa e roda fora da thread da interface
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.filter_history)
+        self.search_generation = 0
+        self.search_cancelled = None
+        
+        # Tabela de histórico (modelo preguiçoso, carregado por páginas)
+        self.model = HistoryTableModel(self.history_manager, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().setVisible(False)
         self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
         self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
-        self.table.cellDoubleClicked.connect(self.open_url)
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
+        self.table.doubleClicked.connect(self.open_url)
         self.table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.show_context_menu)
         layout.addWidget(self.table)
@@ -104,55 +826,82 @@ class HistoryDialog(QDialog):
         layout.addLayout(button_layout)
         
         self.setLayout(layout)
-        self.populate_table(self.history_manager.history)
+        self.model.refresh()
+    
+    def schedule_filter(self):
+        """Reinicia a espera a cada tecla; só a última consulta é executada"""
+        self.cancel_search()
+        self.search_timer.start()
     
-    def populate_table(self, history):
-        self.table.setRowCount(0)
-        for entry in reversed(history):  # Mostra os mais recentes primeiro
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            self.table.setItem(row, 0, QTableWidgetItem(entry["title"]))
-            self.table.setItem(row, 1, QTableWidgetItem(entry["url"]))
-            self.table.setItem(row, 2, QTableWidgetItem(entry["date"]))
+    def cancel_search(self):
+        """Invalida a busca anterior, esteja ela na fila ou em execução"""
+        self.search_generation += 1
+        if self.search_cancelled is not None:
+            self.search_cancelled.set()
+            self.search_cancelled = None
     
     def filter_history(self):
         query = self.search_box.text()
-        if query:
-            filtered_history = self.history_manager.search_history(query)
-            self.populate_table(filtered_history)
-        else:
-            self.populate_table(self.history_manager.history)
+        since, until = period_range(self.period_combo.currentData())
+        self.cancel_search()
+        if not query:
+            # Sem texto a primeira página sai direto do índice por tempo
+            self.model.set_query("", since, until)
+            return
+        self.search_cancelled = threading.Event()
+        task = HistorySearchTask(self.history_manager, query, since, until,
+                                 self.search_generation, self.model.PAGE_SIZE,
+                                 self.search_cancelled)
+        task.signals.finished.connect(self.apply_search_results)
+        QThreadPool.globalInstance().start(task)
     
-    def open_url(self, row, column):
-        url = self.table.item(row, 1).text()
+    def apply_search_results(self, generation, query, entries):
+        # Resultados de consultas antigas são descartados
+        if generation != self.search_generation:
+            return
+        self.search_cancelled = None
+        since, until = period_range(self.period_combo.currentData())
+        self.model.set_results(query, since, until, entries)
+    
+    def done(self, result):
+        self.search_timer.stop()
+        self.cancel_search()
+        super().done(result)
+    
+    def selected_urls(self):
+        """URLs das linhas selecionadas na tabela"""
+        rows = sorted(set(index.row() for index in self.table.selectionModel().selectedRows()))
+        return [self.model.entry(row).url for row in rows]
+    
+    def open_url(self, index):
+        url = self.model.entry(index.row()).url
         self.parent.add_new_tab(url)
         self.accept()
     
     def clear_history(self):
         self.history_manager.clear_history()
-        self.table.setRowCount(0)
+        self.model.refresh()
     
     def show_context_menu(self, position):
         menu = QMenu()
         open_action = menu.addAction("Abrir em Nova Aba")
         remove_action = menu.addAction("Remover do Histórico")
+        forget_action = menu.addAction("Esquecer este Site")
         
-        action = menu.exec(self.table.mapToGlobal(position))
+        action = menu.exec(self.table.viewport().mapToGlobal(position))
         
         if action == open_action:
-            rows = set(index.row() for index in self.table.selectedIndexes())
-            for row in rows:
-                url = self.table.item(row, 1).text()
-                self.parent.add_new_tab(url)
+            # Em segundo plano: as abas só carregam quando forem ativadas
+            for url in self.selected_urls():
+                self.parent.add_new_tab(url, background=True)
         
         elif action == remove_action:
-            rows = sorted(set(index.row() for index in self.table.selectedIndexes()), reverse=True)
-            for row in rows:
-                url = self.table.item(row, 1).text()
-                # Remover do histórico
-                self.history_manager.history = [
-                    entry for entry in self.history_manager.history 
-                    if entry["url"] != url
-                ]
-                self.table.removeRow(row)
-            self.history_manager.save_history()
+            self.history_manager.remove_urls(self.selected_urls())
+            self.model.refresh()
+        
+        elif action == forget_action:
+            for url in self.selected_urls():
+                host = urlsplit(url).hostname
+                if host:
+                    self.history_manager.forget_host(host)
+            self.model.refresh()
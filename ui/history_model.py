@@ -0,0 +1,133 @@
+import datetime
+from PyQt6.QtCore import (Qt, QAbstractTableModel, QModelIndex, QObject,
+                          QRunnable, pyqtSignal)
+
+class HistoryTableModel(QAbstractTableModel):
+    """Modelo preguiçoso do histórico: carrega páginas conforme a rolagem.
+
+    Em vez de criar itens para todo o histórico, o modelo pede ao
+    HistoryManager apenas a próxima página quando a view precisa dela
+    (canFetchMore/fetchMore).
+    """
+    PAGE_SIZE = 200
+    HEADERS = ["Título", "URL", "Visitas", "Última visita"]
+
+    def __init__(self, history_manager, parent=None):
+        super().__init__(parent)
+        self.history_manager = history_manager
+        self.query = ""
+        self.since = None
+        self.until = None
+        self.entries = []
+        self.exhausted = False
+
+    def set_query(self, query, since=None, until=None):
+        """Reinicia o modelo com um novo filtro de texto e período (vazio mostra tudo)"""
+        self.beginResetModel()
+        self.query = query
+        self.since = since
+        self.until = until
+        self.entries = []
+        self.exhausted = False
+        self.endResetModel()
+
+    def set_results(self, query, since, until, entries):
+        """Aplica a primeira página já buscada em segundo plano"""
+        self.beginResetModel()
+        self.query = query
+        self.since = since
+        self.until = until
+        self.entries = list(entries)
+        self.exhausted = len(self.entries) < self.PAGE_SIZE
+        self.endResetModel()
+
+    def refresh(self):
+        """Recarrega o modelo mantendo o filtro atual"""
+        self.set_query(self.query, self.since, self.until)
+
+    def entry(self, row):
+        return self.entries[row]
+
+    def _fetch_page(self, offset, limit):
+        return self.history_manager.find_sites(self.query, self.since, self.until,
+                                               offset, limit)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.entries[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            column = index.column()
+            if column == 0:
+                return entry.title
+            if column == 1:
+                return entry.url
+            if column == 2:
+                return entry.visit_count
+            # A data é formatada só para as linhas que a view realmente exibe
+            return datetime.datetime.fromtimestamp(entry.last_visit).strftime("%Y-%m-%d %H:%M:%S")
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return entry.url
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        page = self._fetch_page(len(self.entries), self.PAGE_SIZE)
+        if len(page) < self.PAGE_SIZE:
+            self.exhausted = True
+        if not page:
+            return
+        start = len(self.entries)
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self.entries.extend(page)
+        self.endInsertRows()
+
+
+class HistorySearchSignals(QObject):
+    # geração, consulta, primeira página de resultados
+    finished = pyqtSignal(int, str, list)
+
+
+class HistorySearchTask(QRunnable):
+    """Busca a primeira página de resultados em uma thread do QThreadPool.
+
+    `cancelled` é um threading.Event compartilhado com o diálogo; a tarefa
+    não emite resultados depois de cancelada.
+    """
+    def __init__(self, history_manager, query, since, until, generation, limit, cancelled):
+        super().__init__()
+        self.history_manager = history_manager
+        self.query = query
+        self.since = since
+        self.until = until
+        self.generation = generation
+        self.limit = limit
+        self.cancelled = cancelled
+        self.signals = HistorySearchSignals()
+
+    def run(self):
+        if self.cancelled.is_set():
+            return
+        try:
+            entries = self.history_manager.find_sites(self.query, self.since, self.until,
+                                                      0, self.limit)
+        except Exception as e:
+            print(f"Erro ao pesquisar histórico: {e}")
+            entries = []
+        if not self.cancelled.is_set():
+            self.signals.finished.emit(self.generation, self.query, entries)
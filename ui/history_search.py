@@ -0,0 +1,91 @@
+import re
+import sqlite3
+import threading
+
+# Divide a consulta em termos; cada termo vira uma busca por prefixo
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+class HistorySearchIndex:
+    """Índice de texto completo (SQLite FTS5) sobre título e URL do histórico.
+
+    O índice guarda o id de cada entrada e o momento da última visita (para
+    ordenar por recência); quem o usa resolve os ids de volta para as entradas. Se o SQLite não tiver suporte a FTS5,
+    `available` fica falso e o chamador deve usar a busca linear.
+    """
+    def __init__(self, path=":memory:"):
+        self._lock = threading.Lock()
+        self.available = False
+        try:
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5("
+                "title, url, last_visit UNINDEXED, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+            self.available = True
+        except sqlite3.Error as e:
+            print(f"Índice FTS5 indisponível, usando busca linear: {e}")
+
+    @staticmethod
+    def build_query(query):
+        """Converte o texto digitado em uma expressão MATCH do FTS5"""
+        tokens = TOKEN_RE.findall(query.lower())
+        return " ".join(f'"{token}"*' for token in tokens)
+
+    def add(self, entry_id, url, title, last_visit):
+        self.add_many([(entry_id, url, title, last_visit)])
+
+    def add_many(self, rows):
+        """Indexa várias entradas (id, url, título, última visita) de uma vez"""
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO history_fts(rowid, title, url, last_visit) "
+                "VALUES (?, ?, ?, ?)",
+                ((entry_id, title, url, last_visit)
+                 for entry_id, url, title, last_visit in rows)
+            )
+            self.conn.commit()
+
+    def remove(self, entry_ids):
+        with self._lock:
+            self.conn.executemany(
+                "DELETE FROM history_fts WHERE rowid = ?",
+                ((entry_id,) for entry_id in entry_ids)
+            )
+            self.conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self.conn.execute("DELETE FROM history_fts")
+            self.conn.commit()
+
+    def search(self, query, limit=None, offset=0, order="rank"):
+        """Retorna os ids que casam com a consulta.
+
+        `order` pode ser "rank" (relevância bm25), "recent" (última visita
+        mais nova primeiro) ou None (sem ordenação).
+        """
+        match = self.build_query(query)
+        if not match:
+            return []
+        sql = "SELECT rowid FROM history_fts WHERE history_fts MATCH ?"
+        if order == "rank":
+            # Título pesa mais que a URL na relevância
+            sql += " ORDER BY bm25(history_fts, 2.0, 1.0)"
+        elif order == "recent":
+            sql += " ORDER BY last_visit DESC"
+        sql += " LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self.conn.execute(
+                sql, (match, -1 if limit is None else limit, offset)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self, query):
+        """Quantidade de entradas que casam com a consulta"""
+        match = self.build_query(query)
+        if not match:
+            return 0
+        with self._lock:
+            return self.conn.execute(
+                "SELECT count(*) FROM history_fts WHERE history_fts MATCH ?", (match,)
+            ).fetchone()[0]
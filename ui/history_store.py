@@ -0,0 +1,138 @@
+import sys
+import bisect
+import datetime
+from array import array
+from itertools import compress
+
+class HistoryURL:
+    """Registro agregado de uma URL do histórico.
+
+    Usa __slots__ em vez de um dicionário por registro; URL e título são
+    internados, então o mesmo texto carregado do snapshot, do diário e dos
+    segmentos arquivados ocupa a memória uma única vez.
+    """
+    __slots__ = ("id", "url", "title", "visit_count", "last_visit", "typed_count")
+
+    def __init__(self, url_id, url, title, visit_count=0, last_visit=0, typed_count=0):
+        self.id = url_id
+        self.url = sys.intern(url)
+        self.title = sys.intern(title or "")
+        self.visit_count = visit_count
+        self.last_visit = last_visit
+        self.typed_count = typed_count
+
+    def set_title(self, title):
+        self.title = sys.intern(title)
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*row)
+
+    def to_row(self):
+        return [self.id, self.url, self.title, self.visit_count,
+                self.last_visit, self.typed_count]
+
+
+class HistoryEntry:
+    """Visão leve de uma visita, criada sob demanda a partir das colunas"""
+    __slots__ = ("id", "timestamp", "record")
+
+    def __init__(self, visit_id, timestamp, record):
+        self.id = visit_id
+        self.timestamp = timestamp
+        self.record = record
+
+    @property
+    def url_id(self):
+        return self.record.id
+
+    @property
+    def url(self):
+        return self.record.url
+
+    @property
+    def title(self):
+        return self.record.title
+
+    def to_dict(self):
+        """Formato simples de exportação: URL, título e data ISO"""
+        return {
+            "url": self.record.url,
+            "title": self.record.title,
+            "timestamp": datetime.datetime.fromtimestamp(self.timestamp).isoformat()
+        }
+
+
+class VisitColumns:
+    """Registro de visitas em colunas (id, id da URL, timestamp).
+
+    Cada coluna é um array('q') ordenado por timestamp: 24 bytes por visita
+    em vez de uma lista e três inteiros Python. `times` serve diretamente
+    para consultas por período com bisect.
+    """
+    __slots__ = ("ids", "url_ids", "times")
+
+    def __init__(self, ids=(), url_ids=(), times=()):
+        self.ids = array('q', ids)
+        self.url_ids = array('q', url_ids)
+        self.times = array('q', times)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Converte o formato antigo [[id, id da URL, timestamp], ...]"""
+        rows = sorted(rows, key=lambda row: row[2])
+        return cls((row[0] for row in rows), (row[1] for row in rows),
+                   (row[2] for row in rows))
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["ids"], data["url_ids"], data["times"])
+
+    def to_dict(self):
+        return {"ids": self.ids.tolist(), "url_ids": self.url_ids.tolist(),
+                "times": self.times.tolist()}
+
+    def __len__(self):
+        return len(self.times)
+
+    def add(self, visit_id, url_id, ts):
+        if self.times and ts < self.times[-1]:
+            # Relógio voltou no tempo: insere na posição certa
+            pos = bisect.bisect_right(self.times, ts)
+            self.ids.insert(pos, visit_id)
+            self.url_ids.insert(pos, url_id)
+            self.times.insert(pos, ts)
+        else:
+            self.ids.append(visit_id)
+            self.url_ids.append(url_id)
+            self.times.append(ts)
+
+    def range(self, since=None, until=None):
+        """Índices [lo, hi) das visitas com since <= timestamp < until"""
+        lo = 0 if since is None else bisect.bisect_left(self.times, since)
+        hi = len(self.times) if until is None else bisect.bisect_left(self.times, until)
+        return lo, max(lo, hi)
+
+    def slice(self, lo, hi):
+        return VisitColumns(self.ids[lo:hi], self.url_ids[lo:hi], self.times[lo:hi])
+
+    def delete(self, lo, hi):
+        del self.ids[lo:hi]
+        del self.url_ids[lo:hi]
+        del self.times[lo:hi]
+
+    def keep(self, mask):
+        """Mantém só as visitas cuja posição em `mask` é verdadeira"""
+        mask = list(mask)
+        self.ids = array('q', compress(self.ids, mask))
+        self.url_ids = array('q', compress(self.url_ids, mask))
+        self.times = array('q', compress(self.times, mask))
+
+    def drop_urls(self, url_ids):
+        """Remove as visitas das URLs informadas; retorna quantas saíram"""
+        before = len(self.times)
+        self.keep(url_id not in url_ids for url_id in self.url_ids)
+        return before - len(self.times)
+
+    def copy(self):
+        return self.slice(0, len(self.times))
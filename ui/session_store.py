@@ -0,0 +1,124 @@
+import os
+import json
+import base64
+import datetime
+import threading
+
+SESSION_VERSION = 1
+# Sessões de execuções anteriores mantidas como session.json.1, .2, ...
+SESSION_BACKUPS = 3
+
+def encode_history(data):
+    """Histórico serializado (bytes) -> texto para o JSON"""
+    return base64.b64encode(data).decode('ascii') if data else None
+
+def decode_history(text):
+    try:
+        return base64.b64decode(text) if text else None
+    except (ValueError, TypeError):
+        return None
+
+
+class SessionStore:
+    """Snapshot das abas abertas em session.json.
+
+    `save` recebe o snapshot pronto (montado na thread da interface) e o
+    grava em segundo plano; snapshots que chegam durante uma gravação
+    substituem o pendente, então só o mais recente vai para o disco. Cada
+    gravação vai para um temporário com fsync e é renomeada (os.replace):
+    uma queda no meio deixa o arquivo anterior intacto. Na primeira
+    gravação de cada execução, a sessão anterior é rotacionada para
+    session.json.1 (até SESSION_BACKUPS cópias); `load` recorre às cópias
+    se o arquivo principal estiver ilegível.
+    """
+    def __init__(self, session_file, backups=SESSION_BACKUPS):
+        self.session_file = session_file
+        self.backups = backups
+        self._lock = threading.Lock()
+        self._pending = None
+        self._writer = None
+        self._rotated = False
+
+    def backup_file(self, number):
+        return f"{self.session_file}.{number}"
+
+    def load(self):
+        """Snapshot mais recente legível, ou None"""
+        candidates = [self.session_file] + [self.backup_file(i) for i in range(1, self.backups + 1)]
+        for path in candidates:
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict) and isinstance(data.get("tabs"), list):
+                    return data
+            except Exception as e:
+                print(f"Erro ao carregar sessão {os.path.basename(path)}: {e}")
+        return None
+
+    def save(self, tabs, current):
+        """Agenda a gravação do snapshot (lista de dicionários por aba)"""
+        data = {
+            "version": SESSION_VERSION,
+            "saved": datetime.datetime.now().isoformat(timespec="seconds"),
+            "current": current,
+            "tabs": tabs
+        }
+        with self._lock:
+            self._pending = data
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._drain, daemon=True)
+                self._writer.start()
+
+    def flush(self):
+        """Espera as gravações pendentes terminarem"""
+        while True:
+            with self._lock:
+                writer = self._writer
+            if writer is None:
+                return
+            writer.join()
+
+    def clear(self):
+        """Apaga a sessão e as cópias (ao desativar "salvar sessão")"""
+        with self._lock:
+            self._pending = None
+        self.flush()
+        for path in [self.session_file] + [self.backup_file(i) for i in range(1, self.backups + 1)]:
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                print(f"Erro ao apagar sessão: {e}")
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                data, self._pending = self._pending, None
+                if data is None:
+                    self._writer = None
+                    return
+            self._write(data)
+
+    def _rotate(self):
+        for number in range(self.backups - 1, 0, -1):
+            if os.path.exists(self.backup_file(number)):
+                os.replace(self.backup_file(number), self.backup_file(number + 1))
+        if os.path.exists(self.session_file):
+            os.replace(self.session_file, self.backup_file(1))
+
+    def _write(self, data):
+        try:
+            if not self._rotated:
+                self._rotated = True
+                if self.backups:
+                    self._rotate()
+            tmp_file = self.session_file + ".tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.session_file)
+        except Exception as e:
+            print(f"Erro ao salvar sessão: {e}")
@@ -126,41 +126,58 @@ class SettingsDialog(QDialog):
         self.user_agent = QLineEdit(settings.get("advanced", "user_agent"))
         layout.addRow("User Agent personalizado:", self.user_agent)
         
+        self.max_live_tabs = QSpinBox()
+        self.max_live_tabs.setRange(1, 100)
+        self.max_live_tabs.setValue(settings.get("tabs", "max_live_tabs") or 12)
+        layout.addRow("Abas carregadas no máximo:", self.max_live_tabs)
+        
+        self.memory_budget = QSpinBox()
+        self.memory_budget.setRange(0, 65536)
+        self.memory_budget.setSingleStep(256)
+        self.memory_budget.setSuffix(" MB")
+        self.memory_budget.setSpecialValueText("Sem limite")
+        self.memory_budget.setValue(settings.get("tabs", "memory_budget_mb") or 0)
+        layout.addRow("Memória das abas:", self.memory_budget)
+        
         widget.setLayout(layout)
         return widget
     
     def save_settings(self):
-        # Salvar configurações gerais
-        settings.set("general", "home_page", self.home_page.text())
-        settings.set("general", "download_path", self.download_path.text())
-        settings.set("general", "save_session", self.save_session.isChecked())
-        
-        # Salvar configurações de privacidade
-        settings.set("privacy", "clear_on_exit", self.clear_on_exit.isChecked())
-        settings.set("privacy", "do_not_track", self.do_not_track.isChecked())
-        settings.set("privacy", "block_ads", self.block_ads.isChecked())
-        
-        # Salvar configurações de aparência
-        settings.set("appearance", "theme", self.theme.currentText())
-        settings.set("appearance", "font_size", self.font_size.value())
-        settings.set("appearance", "show_bookmarks_bar", self.show_bookmarks_bar.isChecked())
-        settings.set("appearance", "show_status_bar", self.show_status_bar.isChecked())
-        
-        # Salvar configurações avançadas
-        settings.set("advanced", "hardware_acceleration", self.hardware_acceleration.isChecked())
-        settings.set("advanced", "proxy_enabled", self.proxy_enabled.isChecked())
-        settings.set("advanced", "proxy_address", self.proxy_address.text())
-        settings.set("advanced", "proxy_port", self.proxy_port.text())
-        settings.set("advanced", "user_agent", self.user_agent.text())
-        
-        settings.save_settings()
+        self.store_settings()
         self.accept()
     
+    def store_settings(self):
+        # Uma única gravação (em segundo plano) e um aviso por configuração alterada:
+        # o navegador reaplica só o que mudou
+        with settings.batch():
+            # Salvar configurações gerais
+            settings.set("general", "home_page", self.home_page.text())
+            settings.set("general", "download_path", self.download_path.text())
+            settings.set("general", "save_session", self.save_session.isChecked())
+        
+            # Salvar configurações de privacidade
+            settings.set("privacy", "clear_on_exit", self.clear_on_exit.isChecked())
+            settings.set("privacy", "do_not_track", self.do_not_track.isChecked())
+            settings.set("privacy", "block_ads", self.block_ads.isChecked())
+        
+            # Salvar configurações de aparência
+            settings.set("appearance", "theme", self.theme.currentText())
+            settings.set("appearance", "font_size", self.font_size.value())
+            settings.set("appearance", "show_bookmarks_bar", self.show_bookmarks_bar.isChecked())
+            settings.set("appearance", "show_status_bar", self.show_status_bar.isChecked())
+        
+            # Salvar configurações avançadas
+            settings.set("advanced", "hardware_acceleration", self.hardware_acceleration.isChecked())
+            settings.set("advanced", "proxy_enabled", self.proxy_enabled.isChecked())
+            settings.set("advanced", "proxy_address", self.proxy_address.text())
+            settings.set("advanced", "proxy_port", self.proxy_port.text())
+            settings.set("advanced", "user_agent", self.user_agent.text())
+            settings.set("tabs", "max_live_tabs", self.max_live_tabs.value())
+            settings.set("tabs", "memory_budget_mb", self.memory_budget.value())
+    
     def apply_settings(self):
         """Aplica as configurações sem fechar o diálogo"""
-        self.save_settings()
-        if self.parent():
-            self.parent().apply_settings()
+        self.store_settings()
     
     def choose_download_path(self):
         path = QFileDialog.getExistingDirectory(
@@ -0,0 +1,188 @@
+import json
+import threading
+from collections import OrderedDict
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtWebEngineCore import QWebEngineScript
+from adblock.cosmetic import CosmeticFilter
+from adblock.engine import url_host
+
+# Hosts com script próprio registrado no perfil ao mesmo tempo
+MAX_HOST_SCRIPTS = 128
+SCRIPT_PREFIX = "naveg-style:"
+
+# Aplica a folha como adoptedStyleSheet (sem nó no DOM, antes do primeiro
+# layout); navegadores sem suporte recebem um <style> assim que houver <html>
+ADD_STYLE_JS = """(function() {
+    var name = %s, css = %s;
+    var styles = window.__navegStyles = window.__navegStyles || {};
+    if (styles[name]) return;
+    try {
+        var sheet = new CSSStyleSheet();
+        sheet.replaceSync(css);
+        document.adoptedStyleSheets = document.adoptedStyleSheets.concat([sheet]);
+        styles[name] = sheet;
+    } catch (e) {
+        var style = document.createElement('style');
+        style.textContent = css;
+        styles[name] = style;
+        var attach = function() { (document.head || document.documentElement).appendChild(style); };
+        if (document.documentElement) attach();
+        else document.addEventListener('DOMContentLoaded', attach);
+    }
+})();"""
+
+REMOVE_STYLE_JS = """(function() {
+    var styles = window.__navegStyles || {};
+    var item = styles[%s];
+    if (!item) return;
+    delete styles[%s];
+    if (item instanceof CSSStyleSheet) {
+        document.adoptedStyleSheets = document.adoptedStyleSheets.filter(function(s) { return s !== item; });
+    } else {
+        item.remove();
+    }
+})();"""
+
+def host_patterns(host):
+    """Globs de @exclude que cobrem o domínio e seus subdomínios"""
+    return [f"*://{host}/*", f"*://*.{host}/*"]
+
+
+class CosmeticLoadSignals(QObject):
+    # filtro cosmético carregado em segundo plano
+    loaded = pyqtSignal(object)
+
+
+class StyleInjector:
+    """Injeta folhas de estilo nas páginas no momento da criação do documento.
+
+    Cada folha vira um QWebEngineScript com ponto de injeção
+    DocumentCreation na coleção de scripts do perfil: o CSS já está aplicado
+    quando o primeiro elemento é criado, sem flashes nem recálculo de
+    layout depois do carregamento. Os cabeçalhos Greasemonkey (@match,
+    @exclude) limitam cada script aos hosts certos.
+
+    - Regras cosméticas genéricas: um script para todos os sites, exceto os
+      que liberam algum seletor genérico.
+    - Regras específicas: um script por host, criado na primeira navegação
+      para ele (`prepare_url`) e mantido em um LRU.
+    - Estilos nomeados (`set_style`): usados pelas extensões, valem para
+      todos os sites.
+    """
+    def __init__(self, profile, filter_paths=None):
+        self.profile = profile
+        self.cosmetic = None
+        self.enabled = False
+        self.filter_paths = filter_paths
+        self._loader = None
+        self._host_scripts = OrderedDict()
+        self._styles = {}
+        self.signals = CosmeticLoadSignals()
+        self.signals.loaded.connect(self._cosmetic_loaded)
+
+    # Estilos nomeados (extensões)
+
+    def set_style(self, name, css, enabled=True, pages=()):
+        """Registra ou remove um estilo global; `pages` recebem a mudança já"""
+        self._remove_script(SCRIPT_PREFIX + name)
+        self._styles.pop(name, None)
+        for page in pages:
+            # Documentos já carregados não passam de novo pela criação
+            page.runJavaScript(REMOVE_STYLE_JS % (json.dumps(name), json.dumps(name)),
+                               QWebEngineScript.ScriptWorldId.ApplicationWorld)
+        if not enabled:
+            return
+        self._styles[name] = css
+        self._insert_script(name, css)
+        for page in pages:
+            page.runJavaScript(ADD_STYLE_JS % (json.dumps(name), json.dumps(css)),
+                               QWebEngineScript.ScriptWorldId.ApplicationWorld)
+
+    def has_style(self, name):
+        return name in self._styles
+
+    # Regras cosméticas das listas de filtros
+
+    def set_enabled(self, enabled):
+        """Liga/desliga a ocultação cosmética, lendo as listas na primeira vez"""
+        self.enabled = enabled
+        if not enabled:
+            self._clear_cosmetic_scripts()
+            return
+        if self.cosmetic is not None:
+            self._register_generic()
+        elif self._loader is None and self.filter_paths:
+            self._loader = threading.Thread(target=self._load_cosmetic, daemon=True)
+            self._loader.start()
+
+    def _load_cosmetic(self):
+        try:
+            cosmetic = CosmeticFilter.from_files(self.filter_paths)
+        except Exception as e:
+            print(f"Erro ao carregar regras cosméticas: {e}")
+            return
+        # Entregue na thread da interface: a coleção de scripts não é thread-safe
+        self.signals.loaded.emit(cosmetic)
+
+    def _cosmetic_loaded(self, cosmetic):
+        self.cosmetic = cosmetic
+        self._loader = None
+        if self.enabled:
+            self._register_generic()
+
+    def _register_generic(self):
+        self._remove_script(SCRIPT_PREFIX + "cosmetic")
+        css = self.cosmetic.generic_css()
+        if css:
+            exclude = [p for host in self.cosmetic.generic_excluded_hosts()
+                       for p in host_patterns(host)]
+            self._insert_script("cosmetic", css, exclude=exclude)
+
+    def prepare_url(self, qurl):
+        """Garante o script específico do host antes de a navegação criar o documento"""
+        if not self.enabled or self.cosmetic is None:
+            return
+        host = url_host(qurl.toString())
+        if not host:
+            return
+        if host in self._host_scripts:
+            self._host_scripts.move_to_end(host)
+            return
+        css = self.cosmetic.css_for_host(host)
+        # Hosts sem regras também entram: evita recalcular a cada navegação
+        self._host_scripts[host] = bool(css)
+        if css:
+            self._insert_script("host:" + host, css, match=[f"*://{host}/*"])
+        while len(self._host_scripts) > MAX_HOST_SCRIPTS:
+            old_host, registered = self._host_scripts.popitem(last=False)
+            if registered:
+                self._remove_script(SCRIPT_PREFIX + "host:" + old_host)
+
+    def _clear_cosmetic_scripts(self):
+        self._remove_script(SCRIPT_PREFIX + "cosmetic")
+        for host, registered in self._host_scripts.items():
+            if registered:
+                self._remove_script(SCRIPT_PREFIX + "host:" + host)
+        self._host_scripts.clear()
+
+    # Coleção de scripts do perfil
+
+    def _insert_script(self, name, css, match=None, exclude=None):
+        header = ["// ==UserScript==", f"// @name {SCRIPT_PREFIX}{name}",
+                  "// @run-at document-start"]
+        header += [f"// @match {pattern}" for pattern in (match or ())]
+        header += [f"// @exclude {pattern}" for pattern in (exclude or ())]
+        header.append("// ==/UserScript==")
+        script = QWebEngineScript()
+        script.setName(SCRIPT_PREFIX + name)
+        script.setSourceCode("\n".join(header) + "\n" +
+                             ADD_STYLE_JS % (json.dumps(name), json.dumps(css)))
+        script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentCreation)
+        script.setWorldId(QWebEngineScript.ScriptWorldId.ApplicationWorld)
+        script.setRunsOnSubFrames(True)
+        self.profile.scripts().insert(script)
+
+    def _remove_script(self, name):
+        scripts = self.profile.scripts()
+        for script in scripts.find(name):
+            scripts.remove(script)
@@ -0,0 +1,170 @@
+import time
+from PyQt6.QtCore import QObject, QTimer, QByteArray, QDataStream, QIODevice
+from PyQt6.QtWebEngineCore import QWebEnginePage
+
+# Intervalo entre verificações periódicas das abas em segundo plano
+CHECK_INTERVAL_MS = 30 * 1000
+# Estados da página: Active, Frozen (sem JavaScript) e Discarded (sem processo)
+LifecycleState = QWebEnginePage.LifecycleState
+
+def process_rss_kb(pid):
+    """Memória residente de um processo em KiB (só Linux; 0 se indisponível)"""
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+def save_history(page):
+    """Histórico de navegação da página serializado (QDataStream), ou None"""
+    try:
+        data = QByteArray()
+        stream = QDataStream(data, QIODevice.OpenModeFlag.WriteOnly)
+        stream << page.history()
+        return bytes(data)
+    except Exception as e:
+        print(f"Erro ao salvar histórico da aba: {e}")
+        return None
+
+def restore_history(page, data):
+    """Restaura o histórico salvo por save_history (carrega a entrada atual)"""
+    try:
+        stream = QDataStream(QByteArray(data), QIODevice.OpenModeFlag.ReadOnly)
+        stream >> page.history()
+        return True
+    except Exception as e:
+        print(f"Erro ao restaurar histórico da aba: {e}")
+        return False
+
+
+class TabLifecycleManager(QObject):
+    """Hiberna as abas em segundo plano usadas há mais tempo.
+
+    Cada BrowserTab guarda `last_active` (time.monotonic da última
+    ativação). Abas paradas há mais de `freeze_after` segundos são
+    congeladas (sem JavaScript nem timers). Quando há mais de
+    `max_live_tabs` abas com página viva, ou quando os processos de
+    renderização passam de `memory_budget_mb`, as menos usadas recentemente
+    são descartadas: posição de rolagem e histórico ficam salvos na aba e a
+    página volta onde estava ao ser reativada.
+
+    Congelar e descartar usam QWebEnginePage.LifecycleState (Frozen e
+    Discarded): o widget continua na aba e o Qt recarrega a página ao
+    reativá-la. Abas tocando áudio nunca são congeladas nem descartadas.
+    """
+    def __init__(self, tabs, max_live_tabs=12, memory_budget_mb=0, freeze_after=600, parent=None):
+        super().__init__(parent)
+        self.tabs = tabs
+        self.max_live_tabs = max_live_tabs
+        self.memory_budget_mb = memory_budget_mb
+        self.freeze_after = freeze_after
+        self.discarded = 0
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.check)
+        self.timer.start(CHECK_INTERVAL_MS)
+        # Verificação logo após abrir/ativar abas, agrupando rajadas
+        self.pending_check = QTimer(self)
+        self.pending_check.setSingleShot(True)
+        self.pending_check.timeout.connect(self.check)
+
+    def configure(self, max_live_tabs=None, memory_budget_mb=None, freeze_after=None):
+        if max_live_tabs is not None:
+            self.max_live_tabs = max_live_tabs
+        if memory_budget_mb is not None:
+            self.memory_budget_mb = memory_budget_mb
+        if freeze_after is not None:
+            self.freeze_after = freeze_after
+        self.schedule_check()
+
+    def schedule_check(self):
+        self.pending_check.start(1000)
+
+    def activated(self, tab):
+        """Aba passou a ser a atual: acorda a página e atualiza o LRU"""
+        tab.last_active = time.monotonic()
+        if tab.browser is not None:
+            page = tab.browser.page()
+            state = page.lifecycleState()
+            if state != LifecycleState.Active:
+                if state == LifecycleState.Discarded:
+                    # A página é recarregada: volta à rolagem salva no descarte
+                    tab.restore_scroll_on_load()
+                page.setLifecycleState(LifecycleState.Active)
+        self.tabs.setTabToolTip(self.tabs.indexOf(tab), "")
+        self.schedule_check()
+
+    # Estado das abas
+
+    def background_tabs(self):
+        current = self.tabs.currentWidget()
+        return [self.tabs.widget(i) for i in range(self.tabs.count())
+                if self.tabs.widget(i) is not current]
+
+    def is_live(self, tab):
+        """A aba tem página com processo de renderização (não descartada)"""
+        if tab.browser is None:
+            return False
+        return tab.browser.page().lifecycleState() != LifecycleState.Discarded
+
+    def can_hibernate(self, tab):
+        page = tab.browser.page()
+        return not page.recentlyAudible()
+
+    def renderer_memory_kb(self, tabs):
+        """Memória somada dos processos de renderização (páginas do mesmo site dividem processo)"""
+        pids = set()
+        for tab in tabs:
+            try:
+                pid = tab.browser.page().renderProcessPid()
+            except AttributeError:
+                return 0
+            if pid > 0:
+                pids.add(pid)
+        return sum(process_rss_kb(pid) for pid in pids)
+
+    # Política
+
+    def check(self):
+        current = self.tabs.currentWidget()
+        live = [tab for tab in self.background_tabs() if self.is_live(tab)]
+        # Menos usadas recentemente primeiro
+        live.sort(key=lambda tab: tab.last_active)
+        now = time.monotonic()
+
+        over_count = len(live) + (1 if current is not None else 0) - self.max_live_tabs
+        over_memory = False
+        if self.memory_budget_mb:
+            tabs = live + ([current] if current is not None and current.browser is not None else [])
+            over_memory = self.renderer_memory_kb(tabs) > self.memory_budget_mb * 1024
+
+        for tab in list(live):
+            if over_count <= 0 and not over_memory:
+                break
+            if not self.can_hibernate(tab):
+                continue
+            self.discard(tab)
+            live.remove(tab)
+            over_count -= 1
+            if over_memory and over_count <= 0:
+                # Mede de novo: descartar uma aba pode não liberar o processo (compartilhado)
+                tabs = live + ([current] if current is not None and current.browser is not None else [])
+                over_memory = self.renderer_memory_kb(tabs) > self.memory_budget_mb * 1024
+
+        if self.freeze_after:
+            for tab in live:
+                page = tab.browser.page()
+                if (now - tab.last_active > self.freeze_after and self.can_hibernate(tab)
+                        and page.lifecycleState() == LifecycleState.Active):
+                    page.setLifecycleState(LifecycleState.Frozen)
+
+    def discard(self, tab):
+        """Libera a página de uma aba em segundo plano, guardando onde ela estava"""
+        tab.save_state()
+        tab.browser.page().setLifecycleState(LifecycleState.Discarded)
+        self.discarded += 1
+        index = self.tabs.indexOf(tab)
+        if index >= 0:
+            self.tabs.setTabToolTip(index, f"Aba suspensa: {tab.pending_url}")
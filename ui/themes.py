@@ -126,7 +126,7 @@ def apply_theme(app, theme_name):
         QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
             background: none;
         }}
-        QTableWidget {{
+        QTableView {{
             background: {theme["window"]};
             color: {theme["text"]};
             gridline-color: {theme["border"]};